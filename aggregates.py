@@ -0,0 +1,91 @@
+from schema import parse_date
+
+# Rollup dimension -> listings table column it groups on
+DIMENSIONS = {
+    'city': 'city',
+    'county': 'county',
+    'structure_type': 'structure_type',
+    'status': 'status',
+    # List date and the day a listing was first scraped (new listings per day), as YYYY-MM-DD
+    'list_date': 'list_date',
+    'first_seen': 'first_seen',
+}
+# Measures kept per (dimension, value); all of them can be added to and taken away from
+MEASURES = ('listings', 'priced', 'price_sum', 'price_drops', 'price_increases')
+# Groups per dimension shown in the chat summary
+SUMMARY_TOP = 15
+# Most recent days shown for the date dimensions in the chat summary
+SUMMARY_DAYS = 14
+
+
+def _bucket(dimension, value):
+    if dimension == 'list_date':
+        parsed = parse_date(value)
+        return parsed.isoformat() if parsed else ''
+    if dimension == 'first_seen':
+        return (value or '')[:10]
+    return value or ''
+
+
+def contribution(record):
+    """((dimension, value) keys, measures) that one listing adds to the rollups.
+
+    record is a listings row (or a dict with the same columns); None contributes nothing.
+    """
+    if record is None:
+        return (), ()
+    price = record['price_value']
+    change = record['price_change_type']
+    measures = (1, 1 if price is not None else 0, price or 0,
+                1 if change == 'down' else 0, 1 if change == 'up' else 0)
+    keys = (('all', ''),) + tuple((dimension, _bucket(dimension, record[column]))
+                                  for dimension, column in DIMENSIONS.items())
+    return keys, measures
+
+
+def add_deltas(deltas, old, new):
+    """Fold the move of one listing from record old to record new into deltas."""
+    before = contribution(old)
+    after = contribution(new)
+    if before == after:
+        return
+    for (keys, measures), sign in ((before, -1), (after, 1)):
+        signed = [sign * value for value in measures]
+        for key in keys:
+            current = deltas.get(key)
+            if current is None:
+                deltas[key] = list(signed)
+            else:
+                for i, value in enumerate(signed):
+                    current[i] += value
+
+
+def group_stats(row):
+    """API shape of one rollup row."""
+    stats = {'value': row['value']}
+    stats.update({measure: row[measure] for measure in MEASURES if measure != 'price_sum'})
+    stats['avg_price'] = round(row['price_sum'] / row['priced']) if row['priced'] else None
+    return stats
+
+
+def format_summary(stats, top=SUMMARY_TOP, days=SUMMARY_DAYS):
+    """Compact text of the precomputed rollups for the chat context."""
+    total = stats.get('all', [{}])[0] if stats.get('all') else {}
+    parts = [f"Listings: {total.get('listings', 0)}"]
+    if total.get('avg_price') is not None:
+        parts.append(f"Average price: ${total['avg_price']:,} ({total['priced']} priced)")
+    parts.append(f"Price drops: {total.get('price_drops', 0)}, price increases: {total.get('price_increases', 0)}")
+    for dimension in DIMENSIONS:
+        groups = stats.get(dimension) or []
+        if dimension in ('list_date', 'first_seen'):
+            groups = sorted((g for g in groups if g['value']), key=lambda g: g['value'], reverse=True)[:days]
+        else:
+            groups = groups[:top]
+        if not groups:
+            continue
+        lines = [f"{dimension},listings,avg_price,price_drops,price_increases"]
+        for g in groups:
+            avg = '' if g['avg_price'] is None else g['avg_price']
+            lines.append(f"\"{g['value']}\",{g['listings']},{avg},{g['price_drops']},{g['price_increases']}")
+        parts.append(f"By {dimension}:\n" + "\n".join(lines))
+    return "\n\n".join(parts)
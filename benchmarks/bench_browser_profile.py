@@ -0,0 +1,88 @@
+"""Compare the full and lite browser profiles: bytes transferred, blocked requests, peak browser memory and speed.
+
+Scrapes the local Matrix stand-in with its page resources (stylesheet, font, images and a
+third-party script) turned on. Needs Chrome/chromedriver. Run from the repo root:
+
+    python -m benchmarks.bench_browser_profile --pages 40 --delay 0.05 --save
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+import brightmls
+import browser_profile
+import metrics
+import store
+from benchmarks.mock_matrix import LOGIN_PATH, SEARCH_PATH, THIRD_PARTY_HOST, start_mock_server
+from benchmarks.results import save_result
+from benchmarks.synthetic import synthetic_rows
+from waits import Readiness
+
+
+def run_profile(profile, pages):
+    browser_profile.BROWSER_PROFILE = profile
+    # Bytes are only counted with Chrome's performance log on
+    browser_profile.TRACK_BYTES = True
+    driver = browser_profile.apply(webdriver.Chrome(options=brightmls.build_chrome_options()))
+    ready = Readiness(driver)
+    wait = WebDriverWait(driver, ready.timeout)
+    metrics.registry.start_run()
+    try:
+        start = time.perf_counter()
+        brightmls.login(driver, ready)
+        assert brightmls.perform_search(driver, wait, ready), "search failed against the stand-in"
+        data, _ = brightmls.scrape_all_pages(driver, wait, max_pages=pages, ready=ready)
+        elapsed = time.perf_counter() - start
+        browser_profile.finish_run(driver)
+    finally:
+        report = metrics.registry.finish_run()
+        driver.quit()
+    resources = browser_profile.resources_report(report)
+    scraped = report['page_seconds']['count']
+    return {
+        'total_s': elapsed,
+        'pages_per_s': scraped / elapsed,
+        'rows': len(data),
+        'mb_transferred': resources['bytes_transferred'] / 1e6,
+        'kb_per_page': resources['bytes_transferred'] / 1e3 / max(scraped, 1),
+        'requests_blocked': resources['requests_blocked'],
+        'peak_browser_rss_mb': resources['peak_browser_rss_mb'] or 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", default=list(browser_profile.BROWSER_PROFILES))
+    parser.add_argument("--rows", type=int, default=2500, help="synthetic rows served by the stand-in")
+    parser.add_argument("--pages", type=int, default=20, help="result pages to scrape")
+    parser.add_argument("--delay", type=float, default=0.0, help="mock server latency per request")
+    parser.add_argument("--save", action="store_true", help="append results to benchmarks/results")
+    args = parser.parse_args()
+
+    server, base_url, _ = start_mock_server(rows=list(synthetic_rows(args.rows)), delay=args.delay, assets=True)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    # The stand-in's "third-party" script is served from another origin of the same server
+    browser_profile.BLOCKED_HOSTS.append(THIRD_PARTY_HOST)
+    workdir = tempfile.mkdtemp(prefix="bench_browser_profile_")
+    os.chdir(workdir)
+    store.DB_FILE = os.path.join(workdir, "profile.db")
+    try:
+        for profile in args.profiles:
+            results = run_profile(profile, args.pages)
+            print(f"\n{profile} profile")
+            for name, value in results.items():
+                print(f"  {name:22s} {value:12.2f}")
+            if args.save:
+                save_result('browser_profile', {'profile': profile, 'rows': args.rows, 'pages': args.pages,
+                                                'delay': args.delay}, results)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
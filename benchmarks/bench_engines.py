@@ -0,0 +1,81 @@
+"""Compare the Selenium and HTTP page engines against the local Matrix stand-in.
+
+The HTTP engine needs no browser; add --selenium to also time the Selenium
+path (needs Chrome/chromedriver). Run from the repo root:
+
+    python -m benchmarks.bench_engines --pages 20 --delay 0.1 --selenium
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import requests
+from selenium.webdriver.support.ui import WebDriverWait
+
+import brightmls
+import store
+from benchmarks.mock_matrix import LOGIN_PATH, RESULTS_PATH, SEARCH_PATH, start_mock_server
+from http_engine import HttpPageFetcher, scrape_all_pages_http
+from waits import Readiness
+
+
+def http_cookies(base_url):
+    """Log in to the stand-in with plain requests and return the session cookies."""
+    session = requests.Session()
+    session.post(base_url + LOGIN_PATH, data={"username": "bench", "password": "bench"}, allow_redirects=False)
+    return [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path} for c in session.cookies]
+
+
+def run_http(base_url, pages):
+    fetcher = HttpPageFetcher(http_cookies(base_url))
+    start = time.time()
+    fetcher.get(base_url + RESULTS_PATH)
+    data, _, failed_page = scrape_all_pages_http(fetcher, max_pages=pages)
+    assert failed_page is None, f"HTTP engine failed on page {failed_page}"
+    return time.time() - start, len(data)
+
+
+def run_selenium(pages):
+    driver = brightmls.create_driver()
+    ready = Readiness(driver)
+    wait = WebDriverWait(driver, ready.timeout)
+    try:
+        brightmls.login(driver, ready)
+        assert brightmls.perform_search(driver, wait, ready), "search failed against the stand-in"
+        start = time.time()
+        data, _ = brightmls.scrape_all_pages(driver, wait, max_pages=pages, ready=ready)
+        return time.time() - start, len(data)
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.1, help="mock server latency per request")
+    parser.add_argument("--selenium", action="store_true", help="also time the Selenium engine")
+    args = parser.parse_args()
+
+    server, base_url, mock = start_mock_server(delay=args.delay)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    # Scraped pages go to a scratch listing store and CSV, never the real ones
+    workdir = tempfile.mkdtemp(prefix="bench_engines_")
+    os.chdir(workdir)
+    store.DB_FILE = os.path.join(workdir, "bench_engines.db")
+    brightmls.CSV_FILE = os.path.join(workdir, "bench_engines.csv")
+    pages = min(args.pages, len(mock.pages))
+    try:
+        runs = [("http", lambda: run_http(base_url, pages))]
+        if args.selenium:
+            runs.append(("selenium", lambda: run_selenium(pages)))
+        for name, run in runs:
+            elapsed, rows = run()
+            print(f"{name:9s} {pages} pages, {rows} rows in {elapsed:.2f}s -> {pages / elapsed:.2f} pages/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
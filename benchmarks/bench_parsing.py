@@ -0,0 +1,96 @@
+"""Compare the legacy per-row BeautifulSoup extraction with the single-pass parser.
+
+Replays the saved result pages in benchmarks/fixtures (regenerate them with
+``python -m benchmarks.matrix_pages``). Run from the repo root:
+
+    python -m benchmarks.bench_parsing --repeat 50
+"""
+import argparse
+import glob
+import os
+import time
+
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+from benchmarks.matrix_pages import FIXTURES_DIR
+from parsing import RESULTS_TABLE_XPATH, parse_results_table
+
+
+def legacy_parse(table_html):
+    """The pre-parsing.py scrape_data path: one soup for the table plus one soup per row."""
+    soup = BeautifulSoup(table_html, 'html.parser')
+    thead = soup.find('thead', class_='mtx-sticky-top')
+    header_row = thead.find('tr', class_='singleLineTableHeader') if thead else None
+    headers = []
+    if header_row:
+        for th in header_row.find_all('th'):
+            span = th.find('span')
+            headers.append(span.get_text(strip=True) if span else th.get_text(strip=True))
+    rows = []
+    tbody = soup.find('tbody')
+    if tbody:
+        for tr in tbody.find_all('tr'):
+            # scrape_data fetched each row's outerHTML over WebDriver and re-parsed it
+            tr_soup = BeautifulSoup(str(tr), 'html.parser')
+            row_data = [cell.get_text(strip=True) for cell in tr_soup.find_all(['td', 'th'])]
+            price_change = ['', '']
+            for cell in tr_soup.find_all(['td', 'th']):
+                img = cell.find('img')
+                if img and img.get('src'):
+                    if 'pricedown' in img['src']:
+                        price_change = ['down', img.get('title') or 'Price Decrease']
+                    elif 'priceup' in img['src']:
+                        price_change = ['up', img.get('title') or 'Price Increase']
+            rows.append(row_data + price_change)
+    if headers:
+        headers = headers + ['PriceChangeType', 'PriceChangeTitle']
+    return [dict(zip(headers, row)) for row in rows], headers
+
+
+def load_tables(fixtures_dir):
+    """Return the results table outerHTML of every saved fixture page."""
+    tables = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+        with open(path, encoding='utf-8') as f:
+            root = lxml_html.fromstring(f.read())
+        for table in root.xpath(RESULTS_TABLE_XPATH):
+            tables.append(lxml_html.tostring(table, encoding='unicode'))
+    return tables
+
+
+def time_parser(parse, tables, repeat):
+    start = time.perf_counter()
+    rows = 0
+    for _ in range(repeat):
+        for table_html in tables:
+            data, _ = parse(table_html)
+            rows += len(data)
+    elapsed = time.perf_counter() - start
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tables = load_tables(args.fixtures)
+    if not tables:
+        print(f"❌ No result tables found in {args.fixtures}")
+        return
+    new_data, _ = parse_results_table(tables[0])
+    old_data, _ = legacy_parse(tables[0])
+    assert new_data == old_data, "single-pass parser output differs from legacy path"
+
+    for name, parse in (("legacy (bs4 per row)", legacy_parse), ("single pass (lxml)", parse_results_table)):
+        elapsed, rows = time_parser(parse, tables, args.repeat)
+        pages = len(tables) * args.repeat
+        print(f"{name:22s} {pages / elapsed:9.1f} pages/s {rows / elapsed:11.1f} rows/s "
+              f"({elapsed * 1000 / pages:.2f} ms/page)")
+    print("Note: legacy timings exclude the per-row WebDriver get_attribute round-trips it also paid for.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark parsing, the listing store and the API on synthetic datasets of 10k to 1M rows.
+
+No browser needed. Run from the repo root (add --save to record the results for this version):
+
+    python -m benchmarks.bench_pipeline --sizes 10000 100000 1000000 --save
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+import store
+from benchmarks.matrix_pages import ROWS_PER_PAGE, paginate, results_table_html
+from benchmarks.results import save_result
+from benchmarks.synthetic import synthetic_rows
+from dataset import DatasetCache
+from parsing import parse_results_table
+from retrieval import ChatRetriever
+
+# Result pages rendered at a time for the parsing benchmark (bounds memory at 1M rows)
+RENDER_CHUNK_PAGES = 500
+QUERY_COUNT = 200
+LISTINGS_PAGE_LIMIT = 1000
+CHAT_QUESTIONS = [
+    "What is the average price by city?",
+    "Show active detached homes in Fairfax under $800k with 4 beds",
+    "How many listings had a price drop?",
+]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far (ru_maxrss is in KB on Linux)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_parsing(rows):
+    """Render the rows as result pages in chunks and time only the parsing."""
+    pages = paginate(rows, ROWS_PER_PAGE)
+    elapsed = 0.0
+    parsed = 0
+    for i in range(0, len(pages), RENDER_CHUNK_PAGES):
+        tables = [results_table_html(page) for page in pages[i:i + RENDER_CHUNK_PAGES]]
+        start = time.perf_counter()
+        for table_html in tables:
+            data, _ = parse_results_table(table_html)
+            parsed += len(data)
+        elapsed += time.perf_counter() - start
+    assert parsed == len(rows), f"parsed {parsed} of {len(rows)} rows"
+    return {'parse_rows_per_s': parsed / elapsed, 'parse_ms_per_page': elapsed * 1000 / len(pages)}
+
+
+def bench_store(rows, listing_store, rng):
+    pages = paginate(rows, ROWS_PER_PAGE)
+    _, upsert = timed(lambda: [listing_store.upsert_page(page, '2025-07-01 12:00:00') for page in pages])
+    cities = sorted({row['City'] for row in rows})
+    statuses = sorted({row['Status'] for row in rows})
+
+    def queries():
+        for _ in range(QUERY_COUNT):
+            listing_store.query(city=rng.choice(cities), status=rng.choice(statuses),
+                                max_price=rng.randrange(300_000, 2_000_000, 50_000), limit=100)
+
+    _, query = timed(queries)
+    _, export_csv = timed(lambda: listing_store.export_csv(main.CSV_FILE))
+    _, export_parquet = timed(lambda: listing_store.export_parquet(main.PARQUET_FILE))
+    return {
+        'store_upsert_rows_per_s': len(rows) / upsert,
+        'store_query_ms': query * 1000 / QUERY_COUNT,
+        'export_csv_s': export_csv,
+        'export_parquet_s': export_parquet,
+        'csv_mb': os.path.getsize(main.CSV_FILE) / 1e6,
+    }
+
+
+def bench_chat_context():
+    cache = DatasetCache(main.CSV_FILE)
+    df, load = timed(cache.get)
+    retriever = ChatRetriever(client_factory=None)
+    start = time.perf_counter()
+    for question in CHAT_QUESTIONS:
+        retriever.build_context(df, cache.version(), question)
+    context = (time.perf_counter() - start) / len(CHAT_QUESTIONS)
+    return {'chat_csv_load_s': load, 'chat_context_ms': context * 1000}
+
+
+def bench_api(client):
+    response, csv_seconds = timed(lambda: client.get("/csv"))
+    assert response.status_code == 200, response.status_code
+    pages = 0
+    cursor = None
+    start = time.perf_counter()
+    while True:
+        params = {'limit': LISTINGS_PAGE_LIMIT}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get("/listings", params=params).json()
+        pages += 1
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    listings = time.perf_counter() - start
+    return {
+        'api_csv_mb_per_s': len(response.content) / 1e6 / csv_seconds,
+        'api_listings_ms_per_page': listings * 1000 / pages,
+    }
+
+
+def run_size(size, workdir, seed):
+    for path in (main.CSV_FILE, main.PARQUET_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+    store.DB_FILE = os.path.join(workdir, f"bench_{size}.db")
+    rows, generate = timed(lambda: list(synthetic_rows(size, seed)))
+    rng = random.Random(seed)
+    results = {'generate_s': generate}
+    results.update(bench_parsing(rows))
+    results.update(bench_store(rows, store.get_store(), rng))
+    del rows
+    results.update(bench_chat_context())
+    main.dataset_cache = DatasetCache(main.CSV_FILE)
+    results.update(bench_api(TestClient(main.app)))
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", action="store_true", help="append results to benchmarks/results")
+    args = parser.parse_args()
+
+    # Work in a scratch directory so the store and exports never touch the real data
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    os.chdir(workdir)
+    for size in args.sizes:
+        print(f"\n{size:,} rows")
+        results = run_size(size, workdir, args.seed)
+        for name, value in results.items():
+            print(f"  {name:28s} {value:12.3f}")
+        if args.save:
+            save_result('pipeline', {'rows': size}, results)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,59 @@
+"""Measure pages/minute of the session pool against the local Matrix stand-in.
+
+Needs Chrome/chromedriver. Run from the repo root:
+
+    python -m benchmarks.bench_pool --workers 1 2 4 --pages 20 --delay 0.5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import brightmls
+from benchmarks.mock_matrix import LOGIN_PATH, SEARCH_PATH, start_mock_server
+from session_pool import OrderedPageWriter, PagePool, SessionFactory, export_cookies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--pages-per-task", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.5, help="mock server latency per request")
+    parser.add_argument("--session-mode", choices=["login", "cookies"], default="login")
+    args = parser.parse_args()
+
+    server, base_url, mock = start_mock_server(delay=args.delay)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    brightmls.CSV_FILE = os.path.join(tempfile.mkdtemp(), "bench_pool.csv")
+    pages = min(args.pages, len(mock.pages))
+
+    cookies = None
+    if args.session_mode == "cookies":
+        factory = SessionFactory()
+        driver, _, _ = factory.open()
+        driver.get(base_url + SEARCH_PATH)
+        cookies = export_cookies(driver)
+        driver.quit()
+
+    try:
+        baseline = None
+        for workers in args.workers:
+            rows = []
+            writer = OrderedPageWriter(save_page=lambda data, timestamp, page=None: rows.extend(data))
+            pool = PagePool(SessionFactory(cookies=cookies), workers=workers,
+                            pages_per_task=args.pages_per_task, writer=writer)
+            start = time.time()
+            _, _, stats = pool.run(pages)
+            elapsed = time.time() - start
+            rate = stats['pages_written'] / elapsed * 60
+            baseline = baseline or rate
+            print(f"{workers} workers: {stats['pages_written']} pages, {len(rows)} rows in {elapsed:.1f}s "
+                  f"-> {rate:.1f} pages/min ({rate / baseline:.2f}x), failed pages {stats['failed_pages']}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
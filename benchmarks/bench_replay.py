@@ -0,0 +1,84 @@
+"""Replay the scraping flow end to end in headless Chromium against the local Matrix stand-in.
+
+Drives login, perform_search, scrape_all_pages and scrape_data, with rows saved to a
+scratch listing store. Needs Chrome/chromedriver. Run from the repo root:
+
+    python -m benchmarks.bench_replay --rows 5000 --pages 40 --delay 0.05 --save
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+import brightmls
+import browser_profile
+import metrics
+import store
+from benchmarks.mock_matrix import LOGIN_PATH, SEARCH_PATH, start_mock_server
+from benchmarks.results import save_result
+from benchmarks.synthetic import synthetic_rows
+from waits import Readiness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2500, help="synthetic rows served by the stand-in")
+    parser.add_argument("--pages", type=int, default=20, help="result pages to scrape")
+    parser.add_argument("--delay", type=float, default=0.0, help="mock server latency per request")
+    parser.add_argument("--recorded", action="store_true", help="serve brightmls_data.csv instead of synthetic rows")
+    parser.add_argument("--save", action="store_true", help="append results to benchmarks/results")
+    args = parser.parse_args()
+
+    rows = None if args.recorded else list(synthetic_rows(args.rows))
+    server, base_url, mock = start_mock_server(rows=rows, delay=args.delay)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    workdir = tempfile.mkdtemp(prefix="bench_replay_")
+    os.chdir(workdir)
+    store.DB_FILE = os.path.join(workdir, "replay.db")
+
+    driver = browser_profile.apply(webdriver.Chrome(options=brightmls.build_chrome_options()))
+    ready = Readiness(driver)
+    wait = WebDriverWait(driver, ready.timeout)
+    metrics.registry.start_run()
+    try:
+        start = time.perf_counter()
+        brightmls.login(driver, ready)
+        assert brightmls.perform_search(driver, wait, ready), "search failed against the stand-in"
+        search_done = time.perf_counter()
+        data, _ = brightmls.scrape_all_pages(driver, wait, max_pages=args.pages, ready=ready)
+        elapsed = time.perf_counter() - start
+        paging = time.perf_counter() - search_done
+    finally:
+        report = metrics.registry.finish_run()
+        driver.quit()
+        server.shutdown()
+
+    pages = report['page_seconds']['count']
+    price_changes = sum(1 for row in data if row.get('PriceChangeType'))
+    results = {
+        'total_s': elapsed,
+        'login_search_s': elapsed - paging,
+        'pages_per_s': pages / paging if paging else 0.0,
+        'rows_per_s': len(data) / paging if paging else 0.0,
+        'page_p50_s': report['page_seconds']['p50'] or 0.0,
+        'page_p95_s': report['page_seconds']['p95'] or 0.0,
+        'wait_s': ready.total(),
+        'rows': len(data),
+        'price_change_rows': price_changes,
+        'stored_listings': store.get_store().count(),
+    }
+    for stage, entry in report['stages'].items():
+        results[f'stage_{stage}_s'] = entry['seconds']
+    print(f"Scraped {len(data)} rows from {pages} pages of {len(mock.pages)}")
+    for name, value in results.items():
+        print(f"  {name:28s} {value:12.3f}")
+    if args.save:
+        save_result('replay', {'rows': len(mock.rows), 'pages': args.pages, 'delay': args.delay}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Run saved searches through the scheduler against the local Matrix stand-in and report throughput and queueing.
+
+Each county of the stand-in becomes a saved search with its own priority; every search is
+requested twice to exercise merging. Needs Chrome/chromedriver. Run from the repo root:
+
+    python -m benchmarks.bench_scheduler --workers 1 2 4 --delay 0.05 --save
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import brightmls
+from benchmarks.mock_matrix import LOGIN_PATH, SEARCH_PATH, start_mock_server
+from benchmarks.results import save_result
+from benchmarks.synthetic import synthetic_rows
+from scheduler import SavedSearch, Scheduler
+
+
+def run_workers(workers, counties, max_pages, data_dir):
+    searches = [SavedSearch(f"county-{i}", {'county': county}, priority=len(counties) - i,
+                            max_pages=max_pages, data_dir=os.path.join(data_dir, f"w{workers}"))
+                for i, county in enumerate(counties)]
+    scheduler = Scheduler(searches, workers=workers)
+    start = time.perf_counter()
+    scheduler.start(periodic=False)
+    runs = []
+    merged = 0
+    for search in searches:
+        run, _ = scheduler.request(search.name)
+        runs.append(run)
+    for search in searches:
+        merged += scheduler.request(search.name)[1]
+    for run in runs:
+        run.wait()
+    elapsed = time.perf_counter() - start
+    scheduler.shutdown()
+    succeeded = [run for run in runs if run.status == 'succeeded']
+    pages = sum(run.result['pages'] for run in succeeded)
+    queue_seconds = sorted(run.started - run.queued for run in runs)
+    return {
+        'seconds': elapsed,
+        'searches_per_min': len(succeeded) / elapsed * 60,
+        'pages_per_min': pages / elapsed * 60,
+        'queue_p50_s': queue_seconds[len(queue_seconds) // 2],
+        'queue_max_s': queue_seconds[-1],
+        'merged_requests': merged,
+        'failed_runs': len(runs) - len(succeeded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--rows", type=int, default=2500, help="synthetic rows served by the stand-in")
+    parser.add_argument("--searches", type=int, default=4, help="saved searches (one per county)")
+    parser.add_argument("--pages", type=int, default=10, help="max pages per search")
+    parser.add_argument("--delay", type=float, default=0.0, help="mock server latency per request")
+    parser.add_argument("--save", action="store_true", help="append results to benchmarks/results")
+    args = parser.parse_args()
+
+    server, base_url, mock = start_mock_server(rows=list(synthetic_rows(args.rows)), delay=args.delay)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    counties = mock.counties[:args.searches]
+    data_dir = tempfile.mkdtemp(prefix="bench_scheduler_")
+    try:
+        for workers in args.workers:
+            results = run_workers(workers, counties, args.pages, data_dir)
+            print(f"\n{workers} session(s), {len(counties)} searches")
+            for name, value in results.items():
+                print(f"  {name:20s} {value:10.2f}")
+            if args.save:
+                save_result('scheduler', {'workers': workers, 'searches': len(counties), 'rows': args.rows,
+                                          'pages': args.pages, 'delay': args.delay}, results)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare memory and throughput of raw row dicts against the typed listing representations.
+
+Run from the repo root (--scale repeats brightmls_data.csv N times):
+
+    python -m benchmarks.bench_schema --scale 100
+"""
+import argparse
+import csv
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.matrix_pages import DATA_CSV
+from schema import Listing, ListingBatch, parse_price
+
+
+def load_rows(scale):
+    with open(DATA_CSV, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return [dict(row) for _ in range(scale) for row in rows]
+
+
+def measure(build):
+    """Return (result, seconds, bytes retained) for build(); memory is traced in a second, untimed run."""
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    retained = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return result, elapsed, size
+
+
+def mean_price_by_city_dicts(rows):
+    totals = {}
+    for row in rows:
+        price = parse_price(row.get('Price'))
+        if price is not None:
+            total, count = totals.get(row['City'], (0, 0))
+            totals[row['City']] = (total + price, count + 1)
+    return {city: total / count for city, (total, count) in totals.items()}
+
+
+def mean_price_by_city_batch(batch):
+    prices = batch.columns['price']
+    valid = prices >= 0
+    codes = batch.columns['city'][valid]
+    sums = np.bincount(codes, weights=prices[valid])
+    counts = np.bincount(codes)
+    cities = batch.dictionaries['city']
+    return {cities[i]: sums[i] / counts[i] for i in range(len(counts)) if counts[i]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=50)
+    args = parser.parse_args()
+
+    source = load_rows(args.scale)
+    print(f"{len(source)} rows")
+    dicts, dict_build, dict_peak = measure(lambda: [dict(row) for row in source])
+    records, record_build, record_peak = measure(lambda: [Listing.from_row(row) for row in source])
+    batch, batch_build, batch_peak = measure(lambda: ListingBatch.from_rows(source))
+
+    print(f"{'representation':16s} {'build s':>9s} {'memory MB':>10s} {'mean price/city s':>18s}")
+    start = time.perf_counter()
+    expected = mean_price_by_city_dicts(dicts)
+    dict_query = time.perf_counter() - start
+    start = time.perf_counter()
+    totals = {}
+    for record in records:
+        if record.price is not None:
+            total, count = totals.get(record.city, (0, 0))
+            totals[record.city] = (total + record.price, count + 1)
+    record_query = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = mean_price_by_city_batch(batch)
+    batch_query = time.perf_counter() - start
+    assert set(actual) == set(expected), "batch aggregation disagrees with the dict path"
+
+    for name, build, peak, query in (("list of dicts", dict_build, dict_peak, dict_query),
+                                     ("Listing slots", record_build, record_peak, record_query),
+                                     ("ListingBatch", batch_build, batch_peak, batch_query)):
+        print(f"{name:16s} {build:9.3f} {peak / 1e6:10.1f} {query:18.4f}")
+
+
+if __name__ == "__main__":
+    main()
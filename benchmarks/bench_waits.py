@@ -0,0 +1,62 @@
+"""Drive login, search and paging against the local Matrix stand-in and report readiness waits.
+
+Needs Chrome/chromedriver. Run from the repo root:
+
+    python -m benchmarks.bench_waits --pages 5 --delay 0.3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+import brightmls
+import browser_profile
+import store
+from benchmarks.mock_matrix import LOGIN_PATH, SEARCH_PATH, start_mock_server
+from waits import Readiness
+
+# Fixed sleeps the scraper used before the readiness layer
+LEGACY_SLEEP_BEFORE_FIRST_ROW = 40
+LEGACY_SLEEP_PER_PAGE = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.3, help="mock server latency per request")
+    args = parser.parse_args()
+
+    server, base_url, mock = start_mock_server(delay=args.delay)
+    brightmls.LOGIN_URL = base_url + LOGIN_PATH
+    brightmls.SEARCH_URL = base_url + SEARCH_PATH
+    # Scraped pages go to a scratch listing store and CSV, never the real ones
+    workdir = tempfile.mkdtemp(prefix="bench_waits_")
+    os.chdir(workdir)
+    store.DB_FILE = os.path.join(workdir, "bench_waits.db")
+    brightmls.CSV_FILE = os.path.join(workdir, "bench_waits.csv")
+
+    driver = browser_profile.apply(webdriver.Chrome(options=brightmls.build_chrome_options()))
+    ready = Readiness(driver)
+    wait = WebDriverWait(driver, ready.timeout)
+    try:
+        start = time.time()
+        brightmls.login(driver, ready)
+        assert brightmls.perform_search(driver, wait, ready), "search failed against the stand-in"
+        data, _ = brightmls.scrape_all_pages(driver, wait, max_pages=args.pages, ready=ready)
+        elapsed = time.time() - start
+    finally:
+        driver.quit()
+        server.shutdown()
+
+    legacy = LEGACY_SLEEP_BEFORE_FIRST_ROW + LEGACY_SLEEP_PER_PAGE * (args.pages - 1)
+    print(f"Scraped {len(data)} rows from {args.pages} pages in {elapsed:.2f}s")
+    for step, seconds in ready.timings.items():
+        print(f"  {step:16s} {seconds:7.3f}s")
+    print(f"Waited {ready.total():.2f}s in total; the fixed sleeps alone were {legacy}s")
+
+
+if __name__ == "__main__":
+    main()
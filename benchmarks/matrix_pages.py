@@ -0,0 +1,160 @@
+"""Build Matrix-like result pages from brightmls_data.csv for offline replay."""
+import csv
+import html
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_CSV = os.path.join(ROOT_DIR, "brightmls_data.csv")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+GRID_HEADERS = ['', 'MLS #', 'Type', 'Status', 'Address', 'City', 'County', 'Beds', 'Baths',
+                'Structure Type', 'Date', 'List Office Name', 'Price']
+ROWS_PER_PAGE = 25
+
+# ASP.NET WebForms postback helper that Matrix pages define
+POSTBACK_SCRIPT = (
+    '<script>function __doPostBack(target, argument) {'
+    'var form = document.forms[0];'
+    'form.__EVENTTARGET.value = target; form.__EVENTARGUMENT.value = argument; form.submit();'
+    '}</script>'
+)
+
+
+def load_listing_rows(path=DATA_CSV):
+    """Load the grid columns (plus price change info) from a scraped CSV."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [row for row in csv.DictReader(f)]
+
+
+def _price_cell(row):
+    price = html.escape(row.get('Price', ''))
+    change = row.get('PriceChangeType')
+    if change in ('down', 'up'):
+        title = html.escape(row.get('PriceChangeTitle') or '')
+        return (f'<td class="d-textRight"><img src="/Matrix/Images/price{change}.png" '
+                f'title="{title}" alt="">{price}</td>')
+    return f'<td class="d-textRight">{price}</td>'
+
+
+def _row_html(row):
+    cells = ['<td><input type="checkbox" name="m_DisplayCore$chk"></td>']
+    for header in GRID_HEADERS[1:-1]:
+        value = html.escape(row.get(header, ''))
+        if header == 'MLS #':
+            cells.append(f'<td><a href="#" data-mlsnum="{value}">{value}</a></td>')
+        else:
+            cells.append(f'<td>{value}</td>')
+    cells.append(_price_cell(row))
+    return '<tr class="d-row">' + ''.join(cells) + '</tr>'
+
+
+def results_table_html(rows):
+    """Render the results grid table the way Matrix does."""
+    # Column headers sort the grid through a postback, like Matrix's
+    header_cells = ''.join(
+        f'<th><a href="javascript:__doPostBack(\'m_DisplayCore\',\'Sort|,,{i}\')">'
+        f'<span class="d-fontSize--small">{html.escape(h)}</span></a></th>' if h else '<th><span></span></th>'
+        for i, h in enumerate(GRID_HEADERS))
+    body = '\n'.join(_row_html(row) for row in rows)
+    return (
+        '<table class="d-table">'
+        f'<thead class="mtx-sticky-top"><tr class="singleLineTableHeader">{header_cells}</tr></thead>'
+        f'<tbody>\n{body}\n</tbody></table>'
+    )
+
+
+def pager_html(page_num, total_pages, total_rows, per_page=ROWS_PER_PAGE):
+    """Render the span.pagingLinks pager with Matrix-style __doPostBack links."""
+    first = (page_num - 1) * per_page + 1
+    last = min(page_num * per_page, total_rows)
+    links = []
+    if page_num > 1:
+        links.append(f"<a href=\"javascript:__doPostBack('m_DisplayCore','Redisplay|,,{page_num - 2}')\">Prev</a>")
+    for n in range(max(1, page_num - 4), min(total_pages, page_num + 5) + 1):
+        if n == page_num:
+            links.append(f'<span class="pagingCurrent">{n}</span>')
+        else:
+            links.append(f"<a href=\"javascript:__doPostBack('m_DisplayCore','Redisplay|,,{n - 1}')\">{n}</a>")
+    if page_num < total_pages:
+        links.append(f"<a href=\"javascript:__doPostBack('m_DisplayCore','Redisplay|,,{page_num}')\">Next</a>")
+    return (f'<span class="pagingLinks">{" ".join(links)}</span>'
+            f'<span class="pagingCount">{first} - {last} of {total_rows:,}</span>')
+
+
+def results_page_html(rows, page_num=1, total_pages=1, total_rows=None, action="/Matrix/Results.aspx"):
+    """Render a full result page whose grid sits at the XPath scrape_data looks for."""
+    total_rows = len(rows) if total_rows is None else total_rows
+    filler = '<div></div>'
+    # /html/body/form/div[3]/div[7]/table/tbody/tr/td/div[2]/div[3]/div[3]/div/div/div[1]/table
+    grid = (
+        f'<table><tbody><tr><td>{filler}<div>{filler * 2}<div>{filler * 2}<div><div><div>'
+        f'<div>{results_table_html(rows)}</div>'
+        f'<div>{pager_html(page_num, total_pages, total_rows)}</div>'
+        '</div></div></div></div></div></td></tr></tbody></table>'
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Matrix</title></head><body>'
+        f'<form method="post" action="{action}" id="Form1">'
+        '<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="replay">'
+        '<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="replay">'
+        '<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="">'
+        '<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="">'
+        f'{filler * 2}<div>{filler * 6}<div>{grid}</div></div>'
+        f'</form>{POSTBACK_SCRIPT}</body></html>'
+    )
+
+
+def login_page_html(action="/login"):
+    """Render a stand-in for the BrightMLS login form."""
+    return (
+        '<!DOCTYPE html><html><head><title>Bright MLS Login</title></head><body>'
+        f'<form method="post" action="{action}">'
+        '<input id="username" name="username" type="text">'
+        '<input id="password" name="password" type="password">'
+        '<button type="submit">LOG IN</button>'
+        '</form></body></html>'
+    )
+
+
+def search_page_html(action="/Matrix/Results.aspx", counties=()):
+    """Render a stand-in for the Matrix residential search form, with county and list price filters."""
+    county_options = ''.join(f'<option value="{html.escape(c)}">{html.escape(c)}</option>' for c in counties)
+    return (
+        '<!DOCTYPE html><html><head><title>Matrix Search</title></head><body>'
+        f'<form method="post" action="{action}" id="Form1">'
+        '<input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="">'
+        '<input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="">'
+        '<a href="javascript:void(0)" onclick="for (const o of document.querySelectorAll(\'#Fm_Status option\')) o.selected = true;">Select All</a>'
+        '<select id="Fm_Status" name="Fm_Status" multiple>'
+        '<option value="1">Active</option><option value="2">Coming Soon</option></select>'
+        '<select id="Fm_StructureType" name="Fm_StructureType" multiple>'
+        '<option value="27007" title="Detached">Detached</option>'
+        '<option value="27008" title="Interior Row/Townhouse">Interior Row/Townhouse</option></select>'
+        f'<select id="Fm_County" name="Fm_County" multiple>{county_options}</select>'
+        '<input id="Fm_ListPrice_Min" name="Fm_ListPrice_Min" type="text">'
+        '<input id="Fm_ListPrice_Max" name="Fm_ListPrice_Max" type="text">'
+        '<div style="height: 1500px"></div>'
+        '<a id="m_ucSearchButtons_m_lbSearch" href="javascript:__doPostBack(\'m_ucSearchButtons$m_lbSearch\',\'\')">Results</a>'
+        f'</form>{POSTBACK_SCRIPT}</body></html>'
+    )
+
+
+def paginate(rows, per_page=ROWS_PER_PAGE):
+    """Split rows into result pages."""
+    return [rows[i:i + per_page] for i in range(0, len(rows), per_page)]
+
+
+def write_fixtures(pages=4, per_page=ROWS_PER_PAGE, out_dir=FIXTURES_DIR):
+    """Write the first few result pages to benchmarks/fixtures as replayable HTML."""
+    rows = load_listing_rows()
+    chunks = paginate(rows, per_page)
+    os.makedirs(out_dir, exist_ok=True)
+    for page_num, chunk in enumerate(chunks[:pages], start=1):
+        path = os.path.join(out_dir, f"results_page_{page_num}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(results_page_html(chunk, page_num, len(chunks), len(rows)))
+    return out_dir
+
+
+if __name__ == "__main__":
+    print(f"✅ Fixtures written to {write_fixtures()}")
@@ -0,0 +1,245 @@
+"""Local static-HTML stand-in for the BrightMLS login and Matrix search/result pages.
+
+Point the scraper at it with:
+
+    python -m benchmarks.mock_matrix --port 8765 --delay 0.5
+    BRIGHTMLS_LOGIN_URL=http://127.0.0.1:8765/login \\
+    BRIGHTMLS_SEARCH_URL=http://127.0.0.1:8765/Matrix/Search/ResidentialSale/Residential ...
+"""
+import argparse
+import re
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.matrix_pages import (GRID_HEADERS, ROWS_PER_PAGE, load_listing_rows, login_page_html,
+                                     paginate, results_page_html, search_page_html)
+from schema import parse_date, parse_price
+
+SESSION_COOKIE = "mock_session"
+LOGIN_PATH = "/login"
+SEARCH_PATH = "/Matrix/Search/ResidentialSale/Residential"
+RESULTS_PATH = "/Matrix/Results.aspx"
+SEARCH_TARGET = "m_ucSearchButtons$m_lbSearch"
+REDISPLAY_RE = re.compile(r"Redisplay\|,,(\d+)")
+SORT_RE = re.compile(r"Sort\|,,(\d+)")
+# Page resources served with assets=True, like the stylesheets, fonts, images and widgets Matrix loads:
+# path -> (content type, size in bytes). They are sent uncached, so every page load fetches them again.
+ASSETS = {
+    "/Matrix/css/matrix.css": ("text/css", 180_000),
+    "/Matrix/fonts/matrix.woff2": ("font/woff2", 90_000),
+    "/Matrix/Images/logo.png": ("image/png", 40_000),
+    "/Matrix/Images/map_tile.png": ("image/png", 250_000),
+    "/thirdparty/analytics.js": ("application/javascript", 95_000),
+}
+# Third-party resources are requested from this host (same server, other origin); block it with
+# BRIGHTMLS_BLOCKED_HOSTS=localhost in benchmarks
+THIRD_PARTY_HOST = "localhost"
+
+
+def sort_key(column):
+    """Sort key for a grid column: dates and prices by value, everything else as text."""
+    if column == 'Date':
+        return lambda row: parse_date(row.get(column)) or parse_date('01/01/70')
+    if column == 'Price':
+        return lambda row: parse_price(row.get(column)) or 0
+    return lambda row: row.get(column) or ''
+
+
+class MockMatrix:
+    """Serve recorded-style result pages, with optional latency, for a fixed row set."""
+
+    def __init__(self, rows=None, per_page=ROWS_PER_PAGE, delay=0.0, assets=False):
+        self.rows = load_listing_rows() if rows is None else rows
+        self.assets = assets
+        self.port = None
+        self.per_page = per_page
+        self.pages = paginate(self.rows, per_page) or [[]]
+        self.delay = delay
+        self.sessions = set()
+        self.counties = sorted({row.get('County') for row in self.rows if row.get('County')})
+        # Per session: search filters (county, min price, max price) and the grid's (column, descending) sort
+        self.filters = {}
+        self.sorts = {}
+        self.result_pages = {}
+        self.lock = threading.Lock()
+        self.requests_served = 0
+
+    def search(self, session_id, form):
+        """Apply the search form's county and price filters to the session's results."""
+        def price(name):
+            value = (form.get(name) or '').replace(',', '').strip()
+            return int(value) if value.isdigit() else None
+        search = (form.get('Fm_County') or None, price('Fm_ListPrice_Min'), price('Fm_ListPrice_Max'))
+        self.filters[session_id] = search if any(v is not None for v in search) else None
+        self.sorts.pop(session_id, None)
+
+    def matches(self, row, search):
+        county, min_price, max_price = search
+        if county and row.get('County') != county:
+            return False
+        value = parse_price(row.get('Price'))
+        if min_price is not None and (value is None or value < min_price):
+            return False
+        if max_price is not None and (value is None or value > max_price):
+            return False
+        return True
+
+    def rows_for(self, session_id):
+        search = self.filters.get(session_id)
+        return self.rows if search is None else [row for row in self.rows if self.matches(row, search)]
+
+    def pages_for(self, session_id):
+        key = (self.filters.get(session_id), self.sorts.get(session_id))
+        if key == (None, None):
+            return self.pages
+        with self.lock:
+            if key not in self.result_pages:
+                rows = self.rows_for(session_id)
+                if key[1] is not None:
+                    column, descending = key[1]
+                    rows = sorted(rows, key=sort_key(column), reverse=descending)
+                self.result_pages[key] = paginate(rows, self.per_page) or [[]]
+            return self.result_pages[key]
+
+    def sort(self, session_id, column):
+        """Sort by column ascending, or flip the direction when it is already the sort column."""
+        current = self.sorts.get(session_id)
+        self.sorts[session_id] = (column, not current[1]) if current and current[0] == column else (column, False)
+
+    def page_html(self, page_index, session_id=None):
+        pages = self.pages_for(session_id)
+        page_index = max(0, min(page_index, len(pages) - 1))
+        total_rows = sum(len(page) for page in pages)
+        return results_page_html(pages[page_index], page_index + 1, len(pages), total_rows,
+                                 action=RESULTS_PATH)
+
+    def with_assets(self, body):
+        """Reference the stand-in page resources from an HTML page's head and body."""
+        if not self.assets:
+            return body
+        head = ('<link rel="stylesheet" href="/Matrix/css/matrix.css">'
+                '<link rel="preload" as="font" type="font/woff2" crossorigin href="/Matrix/fonts/matrix.woff2">'
+                f'<script async src="http://{THIRD_PARTY_HOST}:{self.port}/thirdparty/analytics.js"></script>')
+        widgets = '<img src="/Matrix/Images/logo.png" alt=""><img src="/Matrix/Images/map_tile.png" alt="">'
+        return body.replace('<head>', '<head>' + head, 1).replace('<body>', '<body>' + widgets, 1)
+
+    def new_session(self):
+        session_id = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(session_id)
+        return session_id
+
+    def handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _session(self):
+                cookie = SimpleCookie(self.headers.get("Cookie", ""))
+                morsel = cookie.get(SESSION_COOKIE)
+                return morsel.value if morsel and morsel.value in mock.sessions else None
+
+            def _send_html(self, body, status=200):
+                payload = mock.with_assets(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _redirect(self, location, cookie=None):
+                self.send_response(302)
+                self.send_header("Location", location)
+                if cookie:
+                    self.send_header("Set-Cookie", f"{SESSION_COOKIE}={cookie}; Path=/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _form(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return {k: v[-1] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+
+            def _serve(self, method):
+                with mock.lock:
+                    mock.requests_served += 1
+                if mock.delay:
+                    time.sleep(mock.delay)
+                url = urlparse(self.path)
+                if url.path in ASSETS:
+                    content_type, size = ASSETS[url.path]
+                    self.send_response(200)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(size))
+                    self.send_header("Cache-Control", "no-store")
+                    self.end_headers()
+                    self.wfile.write(b"\0" * size)
+                    return
+                if url.path == LOGIN_PATH:
+                    if method == "POST":
+                        self._form()
+                        return self._redirect("/Matrix/Home", cookie=mock.new_session())
+                    return self._send_html(login_page_html(LOGIN_PATH))
+                session_id = self._session()
+                if not session_id:
+                    return self._redirect(LOGIN_PATH)
+                if url.path == "/Matrix/Home":
+                    return self._send_html("<html><body><h1>Matrix Home</h1></body></html>")
+                if url.path == SEARCH_PATH:
+                    return self._send_html(search_page_html(RESULTS_PATH, mock.counties))
+                if url.path == RESULTS_PATH:
+                    page_index = 0
+                    if method == "POST":
+                        form = self._form()
+                        if form.get("__EVENTTARGET") == SEARCH_TARGET:
+                            mock.search(session_id, form)
+                        argument = form.get("__EVENTARGUMENT", "")
+                        match = REDISPLAY_RE.search(argument)
+                        page_index = int(match.group(1)) if match else 0
+                        match = SORT_RE.search(argument)
+                        if match:
+                            mock.sort(session_id, GRID_HEADERS[int(match.group(1))])
+                    else:
+                        page_index = int(parse_qs(url.query).get("page", ["1"])[0]) - 1
+                    return self._send_html(mock.page_html(page_index, session_id))
+                self._send_html("<html><body>Not found</body></html>", status=404)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
+
+
+def start_mock_server(port=0, **kwargs):
+    """Start a MockMatrix server on a background thread and return (server, base_url, mock)."""
+    mock = MockMatrix(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), mock.handler())
+    mock.port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Matrix stand-in.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds of latency per request")
+    parser.add_argument("--assets", action="store_true", help="load stylesheets, fonts, images and a third-party script")
+    args = parser.parse_args()
+    server, base_url, mock = start_mock_server(args.port, delay=args.delay, assets=args.assets)
+    print(f"✅ Mock Matrix serving {len(mock.rows)} rows over {len(mock.pages)} pages at {base_url}{LOGIN_PATH}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
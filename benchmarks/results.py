@@ -0,0 +1,90 @@
+"""Store benchmark results per code version and compare versions.
+
+Benchmarks run with --save append to benchmarks/results/results.jsonl. Compare with:
+
+    python -m benchmarks.results                 # latest result per version, every benchmark
+    python -m benchmarks.results --bench pipeline --versions 50bf59a 6826406
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULTS_FILE = os.path.join(RESULTS_DIR, "results.jsonl")
+
+
+def code_version():
+    """Short commit hash of the working tree, marked -dirty when it has local changes."""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_result(bench, params, metrics, path=RESULTS_FILE):
+    """Append one benchmark result (metrics is a flat dict of numbers) and return the record."""
+    record = {
+        'bench': bench,
+        'version': code_version(),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'params': params,
+        'metrics': metrics,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"✅ Saved {bench} results for {record['version']} to {path}")
+    return record
+
+
+def load_results(path=RESULTS_FILE, bench=None):
+    try:
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+    return [r for r in records if bench is None or r['bench'] == bench]
+
+
+def compare(records, versions=None):
+    """Print each metric side by side for the latest run of every (bench, params, version)."""
+    latest = {}
+    for record in records:
+        if versions and record['version'] not in versions:
+            continue
+        key = (record['bench'], json.dumps(record['params'], sort_keys=True))
+        latest.setdefault(key, {})[record['version']] = record
+    for (bench, params), by_version in latest.items():
+        order = [v for v in (versions or by_version) if v in by_version]
+        print(f"\n{bench} {params}")
+        print(f"  {'metric':34s}" + "".join(f"{v:>16s}" for v in order))
+        metric_names = sorted({m for r in by_version.values() for m in r['metrics']})
+        for name in metric_names:
+            cells = []
+            for version in order:
+                value = by_version[version]['metrics'].get(name)
+                cells.append(f"{value:16.3f}" if isinstance(value, (int, float)) else f"{'-':>16s}")
+            print(f"  {name:34s}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare saved benchmark results between versions.")
+    parser.add_argument("--bench")
+    parser.add_argument("--versions", nargs="*")
+    parser.add_argument("--file", default=RESULTS_FILE)
+    args = parser.parse_args()
+    records = load_results(args.file, args.bench)
+    if not records:
+        print(f"No results in {args.file}")
+        return
+    compare(records, args.versions)
+
+
+if __name__ == "__main__":
+    main()
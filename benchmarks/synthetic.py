@@ -0,0 +1,88 @@
+"""Generate synthetic listing rows with the columns and value mix of brightmls_data.csv.
+
+Run from the repo root:
+
+    python -m benchmarks.synthetic 100000 /tmp/listings_100k.csv
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+
+from benchmarks.matrix_pages import load_listing_rows
+from schema import parse_price
+from store import CSV_HEADERS
+
+STREETS = ['Oak', 'Maple', 'Cedar', 'Elm', 'Pine', 'Walnut', 'Chestnut', 'Hickory', 'Seminole', 'McKay',
+           'Lee', 'Jefferson', 'Washington', 'Madison', 'Monroe', 'Franklin', 'Lincoln', 'Chain Bridge']
+SUFFIXES = ['St', 'Rd', 'Ave', 'Ct', 'Dr', 'Ln', 'Way', 'Pl', 'Ter']
+# Share of rows that carry a priceup/pricedown icon
+PRICE_CHANGE_SHARE = 0.08
+
+
+class ValuePools:
+    """Observed values of each column, sampled with their real frequencies."""
+
+    def __init__(self, rows):
+        self.places = [(row['City'], row['County'], row['MLS #'][:4]) for row in rows]
+        self.types = [row['Type'] for row in rows]
+        self.statuses = [row['Status'] for row in rows]
+        self.beds = [row['Beds'] for row in rows]
+        self.baths = [row['Baths'] for row in rows]
+        self.structures = [row['Structure Type'] for row in rows]
+        self.offices = [row['List Office Name'] for row in rows]
+        self.prices = [p for p in (parse_price(row['Price']) for row in rows) if p]
+
+
+def synthetic_rows(count, seed=0, timestamp='2025-07-01 12:00:00'):
+    """Yield count rows with unique MLS #s, shaped like scraped rows."""
+    rng = random.Random(seed)
+    pools = ValuePools(load_listing_rows())
+    start = date(2025, 1, 1)
+    for i in range(count):
+        city, county, prefix = rng.choice(pools.places)
+        price = int(rng.choice(pools.prices) * rng.uniform(0.9, 1.1)) // 100 * 100
+        change_type = change_title = ''
+        if rng.random() < PRICE_CHANGE_SHARE:
+            change_type = rng.choice(['down', 'up'])
+            change_title = 'Price Decrease' if change_type == 'down' else 'Price Increase'
+        yield {
+            '': '',
+            'MLS #': f"{prefix}{2000000 + i}",
+            'Type': rng.choice(pools.types),
+            'Status': rng.choice(pools.statuses),
+            'Address': f"{rng.randint(100, 99999)} {rng.choice(STREETS)} {rng.choice(SUFFIXES)}",
+            'City': city,
+            'County': county,
+            'Beds': rng.choice(pools.beds),
+            'Baths': rng.choice(pools.baths),
+            'Structure Type': rng.choice(pools.structures),
+            'Date': (start + timedelta(days=rng.randrange(365))).strftime('%m/%d/%y'),
+            'List Office Name': rng.choice(pools.offices),
+            'Price': f"${price:,}",
+            'PriceChangeType': change_type,
+            'PriceChangeTitle': change_title,
+            'Timestamp': timestamp,
+        }
+
+
+def write_csv(path, count, seed=0):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+        writer.writeheader()
+        writer.writerows(synthetic_rows(count, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("count", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.path, args.count, args.seed)
+    print(f"✅ Wrote {args.count} synthetic rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 import time
-import csv
 import os
 import signal
 import sys
+import re
+import math
+import threading
 import pandas as pd
-import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -15,12 +16,33 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from bs4 import BeautifulSoup
 from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import StaleElementReferenceException
+from parsing import RESULTS_TABLE_XPATH, parse_results_table
+from changes import ChangeTracker
+from checkpoint import Checkpoint
+from csv_writer import CsvWriter
+from schema import parse_date
+import browser_profile
+import metrics
+from store import get_store
+from waits import (Readiness, login_complete, search_form_ready, results_ready,
+                   results_snapshot, results_replaced)
 
 # Global variable to track if scraper should stop
 scraper_should_stop = False
+# Change tracker for the run in progress; save_page feeds it every page
+change_tracker = None
+# Crawl checkpoint for the run in progress; save_page stores it with every page
+checkpoint = None
+# CSV snapshot writer for the run in progress; save_page feeds it every saved page
+csv_writer = None
+# Set by a job to cancel the run in progress between pages
+stop_event = None
+# Called with progress updates (total_rows, then page_rows per saved page) for the run in progress
+progress_listener = None
+# Only one run may write the store and CSV at a time
+run_lock = threading.Lock()
 
 def signal_handler(signum, frame):
     """Handle interrupt signals to gracefully stop the scraper"""
@@ -37,30 +59,52 @@ USERNAME = "najibm1983"
 PASSWORD = "Logar4life!"
 
 # === URLs ===
-LOGIN_URL = "https://login.brightmls.com/login"
-SEARCH_URL = "https://matrix.brightmls.com/Matrix/Search/ResidentialSale/Residential"
+LOGIN_URL = os.getenv("BRIGHTMLS_LOGIN_URL", "https://login.brightmls.com/login")
+SEARCH_URL = os.getenv("BRIGHTMLS_SEARCH_URL", "https://matrix.brightmls.com/Matrix/Search/ResidentialSale/Residential")
+
+# What perform_search selects; the checkpoint of a crawl is keyed on it
+SEARCH_CRITERIA = {
+    'url': SEARCH_URL,
+    'property_types': 'Select All',
+    'structure_type': 'Detached',
+}
+
+# Structure type options of the search form by title; other types are matched on the title alone
+STRUCTURE_TYPE_VALUES = {'Detached': '27007'}
+
+# Search form fields that narrow a search to one shard (county, list price band); see shards.py
+COUNTY_SELECT_ID = os.getenv("BRIGHTMLS_COUNTY_SELECT_ID", "Fm_County")
+MIN_PRICE_INPUT_ID = os.getenv("BRIGHTMLS_MIN_PRICE_INPUT_ID", "Fm_ListPrice_Min")
+MAX_PRICE_INPUT_ID = os.getenv("BRIGHTMLS_MAX_PRICE_INPUT_ID", "Fm_ListPrice_Max")
 
 # === File paths ===
 CSV_FILE = "brightmls_data.csv"
-DATA_HASH_FILE = "data_hash.txt"
 
-def get_data_hash(data):
-    """Generate a hash of the data to detect changes"""
-    data_str = str(data)
-    return hashlib.md5(data_str.encode()).hexdigest()
+# === Parallel scraping ===
+SCRAPE_WORKERS = int(os.getenv("BRIGHTMLS_SCRAPE_WORKERS", "1"))
+# "login" signs in every worker; "cookies" copies the first login's cookies into each worker
+SESSION_MODE = os.getenv("BRIGHTMLS_SESSION_MODE", "login")
 
-def save_data_hash(hash_value):
-    """Save the current data hash to file"""
-    with open(DATA_HASH_FILE, 'w') as f:
-        f.write(hash_value)
+# "selenium" renders every result page; "http" fetches pages with the login's cookies
+ENGINE = os.getenv("BRIGHTMLS_ENGINE", "selenium")
 
-def load_data_hash():
-    """Load the previous data hash from file"""
-    try:
-        with open(DATA_HASH_FILE, 'r') as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        return None
+# "full" pages through every result; "delta" sorts newest first and stops at the first page
+# whose listings are all unchanged; "auto" runs a delta refresh unless a full sweep is due
+SCRAPE_MODE = os.getenv("BRIGHTMLS_SCRAPE_MODE", "full")
+SCRAPE_MODES = ('full', 'delta', 'auto')
+FULL_SWEEP_HOURS = float(os.getenv("BRIGHTMLS_FULL_SWEEP_HOURS", "24"))
+# Grid columns delta refreshes sort on, first present wins. A modification date brings price and status
+# changes on older listings to the top; the list date (the default grid's only date) only brings new listings
+DELTA_SORT_COLUMNS = [c.strip() for c in os.getenv("BRIGHTMLS_DELTA_SORT_COLUMN",
+                                                   "Modified,Status Change Date,Date").split(",") if c.strip()]
+LIST_DATE_COLUMN = "Date"
+MAX_PAGES = 200
+
+# Keep one logged-in browser alive between runs instead of starting and logging in every time
+PERSISTENT_BROWSER = os.getenv("BRIGHTMLS_PERSISTENT_BROWSER", "1") == "1"
+
+# Pager summary such as "1 - 25 of 1,300"
+RESULT_COUNT_RE = re.compile(r"\d[\d,]*\s*-\s*\d[\d,]*\s+of\s+([\d,]+)")
 
 def load_existing_data():
     """Load existing data from XLSX file"""
@@ -74,115 +118,65 @@ def load_existing_data():
         print(f"Error loading existing data: {e}")
         return pd.DataFrame()
 
-def save_data_to_csv(data, timestamp):
-    """Save data to CSV file with timestamp, appending as new data is scraped."""
-    if not data:
-        return False
-    # Add timestamp to each row
-    for row in data:
-        row['Timestamp'] = timestamp
-    # Write header only if file does not exist
-    write_header = not os.path.exists(CSV_FILE)
+def should_stop():
+    """True when a signal or the run's job asked the scraper to stop, or the crawl caught up with the last one."""
+    return (scraper_should_stop or (stop_event is not None and stop_event.is_set())
+            or (checkpoint is not None and checkpoint.caught_up)
+            or (change_tracker is not None and change_tracker.caught_up))
+
+def report_progress(**update):
+    """Forward a progress update to the run's listener, if any."""
+    if progress_listener is not None:
+        progress_listener(update)
+
+def save_page(data, timestamp, page=None):
+    """Upsert one scraped page into the listing store and fold it into the run's change tracker.
+
+    When page is given, the run's checkpoint is written in the same transaction.
+    """
+    entry = checkpoint.entry(page, data) if checkpoint is not None and page is not None else None
     try:
-        with open(CSV_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=list(data[0].keys()))
-            if write_header:
-                writer.writeheader()
-            writer.writerows(data)
-        print(f"✅ Data appended to {CSV_FILE}")
-        return True
-    except PermissionError:
-        print(f"❌ Permission denied: Please close '{CSV_FILE}' if it is open in another program and try again.")
-        return False
+        with metrics.span('store_write'):
+            stored = get_store().upsert_page(data, timestamp, checkpoint=entry)
+        print(f"✅ Upserted {stored} listings into {get_store().path}")
+        saved = True
     except Exception as e:
         print(f"❌ Error saving data: {e}")
-        return False
+        metrics.inc('brightmls_save_errors_total')
+        saved = False
+    if saved and entry is not None:
+        checkpoint.saved(entry)
+    if saved and csv_writer is not None:
+        csv_writer.write_page(data)
+    if change_tracker is not None:
+        with metrics.span('change_tracking'):
+            change_tracker.update_page(data, timestamp)
+    report_progress(page_rows=len(data))
+    return saved
 
 def scrape_data(driver, wait, max_retries=3):
     """Scrape data from the results table, with retry for stale element errors and selective price icon extraction."""
     for attempt in range(max_retries):
         try:
-            specific_xpath = "/html/body/form/div[3]/div[7]/table/tbody/tr/td/div[2]/div[3]/div[3]/div/div/div[1]/table"
             try:
-                table_element = driver.find_element(By.XPATH, specific_xpath)
+                table_element = driver.find_element(By.XPATH, RESULTS_TABLE_XPATH)
                 print("✅ Found table using specific XPath")
             except Exception as e:
                 print(f"❌ Could not find table using specific XPath: {e}")
                 table_element = driver.find_element(By.TAG_NAME, "table")
                 print("✅ Found table using fallback method")
 
-            table_html = table_element.get_attribute('outerHTML')
-            soup = BeautifulSoup(table_html, 'html.parser')
-
-            thead = soup.find('thead', class_='mtx-sticky-top')
-            header_row = thead.find('tr', class_='singleLineTableHeader') if thead else None
-
-            headers = []
-            if header_row:
-                th_elements = header_row.find_all('th')
-                for th in th_elements:
-                    span = th.find('span')
-                    header_text = span.get_text(strip=True) if span else th.get_text(strip=True)
-                    headers.append(header_text)
-
+            # One outerHTML snapshot per page; headers, cells and price icons are all parsed from it
+            with metrics.span('get_attribute'):
+                table_html = table_element.get_attribute('outerHTML')
+            with metrics.span('parse'):
+                data, headers = parse_results_table(table_html)
             print(f"Extracted headers: {headers}")
-
-            tbody = soup.find('tbody')
-            rows = []
-            if tbody:
-                row_xpath = specific_xpath + "//tbody//tr"
-                tr_elements = driver.find_elements(By.XPATH, row_xpath)
-                for i, tr_elem in enumerate(tr_elements):
-                    try:
-                        tr_html = tr_elem.get_attribute('outerHTML')
-                    except StaleElementReferenceException:
-                        print("⚠️ Stale row element, skipping row.")
-                        continue
-                    tr_soup = BeautifulSoup(tr_html, 'html.parser')
-                    cells = tr_soup.find_all(['td', 'th'])
-                    if cells:
-                        row_data = []
-                        price_change_type = None
-                        price_change_title = None
-                        for cell in cells:
-                            text = cell.get_text(strip=True)
-                            # Only check for price up/down images
-                            img = cell.find('img')
-                            if img and img.get('src'):
-                                src = img['src']
-                                title = img.get('title') or img.get('data-original-title') or ''
-                                if 'pricedown' in src:
-                                    price_change_type = 'down'
-                                    price_change_title = title or 'Price Decrease'
-                                elif 'priceup' in src:
-                                    price_change_type = 'up'
-                                    price_change_title = title or 'Price Increase'
-                            row_data.append(text)
-                        # Add price change info as extra columns
-                        if price_change_type:
-                            row_data.append(price_change_type)
-                            row_data.append(price_change_title)
-                        else:
-                            row_data.append('')
-                            row_data.append('')
-                        if any(cell.strip() for cell in row_data):
-                            rows.append(row_data)
-            # Add extra headers for price change info
-            if headers:
-                headers = headers + ['PriceChangeType', 'PriceChangeTitle']
-            print(f"Extracted {len(rows)} rows.")
-            data = []
-            for row in rows:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    if i < len(headers):
-                        row_dict[headers[i]] = value
-                    else:
-                        row_dict[f'Column_{i}'] = value
-                data.append(row_dict)
+            print(f"Extracted {len(data)} rows.")
             return data, headers
         except StaleElementReferenceException as e:
             print(f"⚠️ StaleElementReferenceException on attempt {attempt+1}, retrying...")
+            metrics.inc('brightmls_stale_element_retries_total')
             time.sleep(2)
             continue
         except Exception as e:
@@ -192,9 +186,8 @@ def scrape_data(driver, wait, max_retries=3):
     return [], []
 
 def scroll_to_element(driver, element):
-    """Scroll to element and wait for it to be clickable"""
-    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-    time.sleep(2)
+    """Scroll element into the middle of the viewport without animating"""
+    driver.execute_script("arguments[0].scrollIntoView({behavior: 'instant', block: 'center'});", element)
 
 def safe_click(driver, wait, element):
     """Safely click element with scrolling and waiting"""
@@ -202,46 +195,125 @@ def safe_click(driver, wait, element):
     wait.until(EC.element_to_be_clickable(element))
     driver.execute_script("arguments[0].click();", element)
 
-def perform_search(driver, wait):
-    """Perform the search and get results"""
-    try:
-        # Step 1: Navigate to search page
-        driver.get(SEARCH_URL)
-        time.sleep(10)
-
-        # Step 2: Click "Select All" - with proper scrolling
-        select_all = wait.until(EC.presence_of_element_located((By.XPATH, "//a[contains(text(), 'Select All')]")))
-        safe_click(driver, wait, select_all)
-        time.sleep(2)
-
-        # Step 3: Select "Detached"
-        detached_option = wait.until(EC.presence_of_element_located((By.XPATH, "//option[@value='27007' and @title='Detached']")))
-        scroll_to_element(driver, detached_option)
-        driver.execute_script("arguments[0].click();", detached_option)
-        time.sleep(2)
-
-        # Step 4: Scroll to middle
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight / 2);")
-        time.sleep(2)
-
-        # Step 5: Click "Results" button
-        results_button = wait.until(EC.element_to_be_clickable((By.ID, "m_ucSearchButtons_m_lbSearch")))
-        safe_click(driver, wait, results_button)
-        time.sleep(10)
-
-        return True
+def apply_search_criteria(driver, criteria):
+    """Fill the shard filters (county, min_price, max_price) into the open search form."""
+    if criteria.get('county'):
+        Select(driver.find_element(By.ID, COUNTY_SELECT_ID)).select_by_visible_text(criteria['county'])
+    for key, field_id in (('min_price', MIN_PRICE_INPUT_ID), ('max_price', MAX_PRICE_INPUT_ID)):
+        if criteria.get(key) is not None:
+            field = driver.find_element(By.ID, field_id)
+            field.clear()
+            field.send_keys(str(criteria[key]))
+
+def structure_type_xpath(structure_type):
+    """XPath of a structure type option in the search form."""
+    value = STRUCTURE_TYPE_VALUES.get(structure_type)
+    if value:
+        return f"//option[@value='{value}' and @title='{structure_type}']"
+    return f"//option[@title='{structure_type}']"
+
+def perform_search(driver, wait, ready=None, criteria=None):
+    """Perform the search (optionally narrowed to a shard's or saved search's criteria) and get results"""
+    ready = ready or Readiness(driver)
+    structure_type = (criteria or {}).get('structure_type') or SEARCH_CRITERIA['structure_type']
+    with metrics.span('search'):
+        try:
+            # Step 1: Navigate to search page and wait for the form to render
+            driver.get(SEARCH_URL)
+            ready.until('search_form', search_form_ready)
+
+            # Step 2: Click "Select All" - with proper scrolling
+            select_all = wait.until(EC.presence_of_element_located((By.XPATH, "//a[contains(text(), 'Select All')]")))
+            safe_click(driver, wait, select_all)
+
+            # Step 3: Select the structure type ("Detached" unless the criteria name another)
+            structure_option = ready.until('search_criteria', EC.presence_of_element_located((By.XPATH, structure_type_xpath(structure_type))))
+            scroll_to_element(driver, structure_option)
+            driver.execute_script("arguments[0].click();", structure_option)
+            if criteria:
+                apply_search_criteria(driver, criteria)
+
+            # Step 4: Click "Results" button and wait for the grid
+            results_button = ready.until('search_criteria', EC.element_to_be_clickable((By.ID, "m_ucSearchButtons_m_lbSearch")))
+            safe_click(driver, wait, results_button)
+            ready.until('search_results', results_ready)
+
+            return True
         
+        except Exception as e:
+            print(f"❌ Error performing search: {e}")
+            return False
+
+def _first_page_order(driver, column):
+    """The first page's MLS numbers and its column dates (a timestamp counts by its date)."""
+    data, _ = scrape_data(driver, None)
+    dates = [parse_date((row.get(column) or '').split(' ')[0]) for row in data]
+    return [row.get('MLS #') for row in data], [d for d in dates if d is not None]
+
+def _sort_header(driver, columns):
+    """The first of columns with a sort link in the grid header, and that link."""
+    for column in columns:
+        links = driver.find_elements(By.XPATH, f"{RESULTS_TABLE_XPATH}/thead//th[normalize-space(.)='{column}']//a")
+        if links:
+            return column, links[0]
+    return None, None
+
+def sort_results(driver, ready, columns=DELTA_SORT_COLUMNS):
+    """Sort the results grid newest first by clicking a date column's header (Matrix toggles the direction).
+
+    Returns the column sorted on, or None when the sort could not be confirmed: the click has to change
+    the first page's row order, and its dates have to run down from the newest date seen so far.
+    """
+    column, link = _sort_header(driver, columns)
+    if column is None:
+        print(f"❌ No sortable date column among {columns}")
+        return None
+    try:
+        order, dates = _first_page_order(driver, column)
+        seen = set(dates)
+        for _ in range(2):
+            old_tbody, old_pager_text = results_snapshot(driver)
+            driver.execute_script("arguments[0].click();", link)
+            ready.until('sort_results', results_replaced(old_tbody, old_pager_text))
+            sorted_order, dates = _first_page_order(driver, column)
+            if sorted_order == order:
+                print(f"❌ Sorting by {column} did not change the row order")
+                return None
+            seen.update(dates)
+            if dates and dates[0] == max(seen) and all(a >= b for a, b in zip(dates, dates[1:])):
+                return column
+            order = sorted_order
+            link = _sort_header(driver, [column])[1]
+            if link is None:
+                break
     except Exception as e:
-        print(f"❌ Error performing search: {e}")
-        return False
+        print(f"❌ Could not sort results by {column}: {e}")
+    return None
+
+def choose_mode(mode):
+    """Resolve "auto" to a full sweep when none completed within FULL_SWEEP_HOURS, else a delta refresh."""
+    if mode != 'auto':
+        return mode
+    last = get_store().last_run('full')
+    if last is None:
+        return 'full'
+    finished = datetime.strptime(last['finished_at'], '%Y-%m-%d %H:%M:%S')
+    return 'full' if datetime.now() - finished > timedelta(hours=FULL_SWEEP_HOURS) else 'delta'
 
-def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30):
-    """Scrape up to max_pages of the results table and save each page's data in real time to CSV."""
+def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30, ready=None, start_page=1, save=None, stop=None):
+    """Scrape the results table from start_page (where the driver is) up to max_pages, saving each page in real time.
+
+    save and stop replace save_page and should_stop for searches that keep their own store (see scheduler.py).
+    """
+    ready = ready or Readiness(driver)
+    save = save or save_page
+    stop = stop or should_stop
     all_data = []
     headers = None
-    page_num = 1
+    page_num = start_page
     start_time = time.time()
     timeout_seconds = timeout_minutes * 60
+    page_clock = time.perf_counter()
     
     while page_num <= max_pages:
         # Check for timeout
@@ -250,7 +322,7 @@ def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30):
             break
             
         # Check for stop signal
-        if scraper_should_stop:
+        if stop():
             print("🛑 Stop signal received. Stopping scraper.")
             break
             
@@ -258,13 +330,18 @@ def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30):
         data, page_headers = scrape_data(driver, wait)
         if not data:
             print(f"❌ No data found on page {page_num}")
+            metrics.inc('brightmls_failed_pages_total', engine='selenium')
             break
         if headers is None:
             headers = page_headers
         all_data.extend(data)
         # Save this page's data immediately
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        save_data_to_csv(data, timestamp)
+        save(data, timestamp, page_num)
+        now = time.perf_counter()
+        metrics.page(page_num, now - page_clock, len(data), 'selenium')
+        browser_profile.page_loaded(driver)
+        page_clock = now
         # Find the pager and the Next link
         try:
             pager = driver.find_element(By.CSS_SELECTOR, 'span.pagingLinks')
@@ -274,13 +351,15 @@ def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30):
                     next_link = a
                     break
             if next_link and next_link.is_enabled() and page_num < max_pages:
+                old_tbody, old_pager_text = results_snapshot(driver)
                 try:
                     driver.execute_script("arguments[0].click();", next_link)
                 except StaleElementReferenceException:
                     print("⚠️ Stale pager element, retrying next page click...")
                     time.sleep(2)
                     continue
-                time.sleep(5)  # Wait for next page to load
+                # Wait for the postback to replace the grid rather than a fixed delay
+                ready.until('next_page', results_replaced(old_tbody, old_pager_text))
                 page_num += 1
             else:
                 print("✅ No more pages or reached max page limit.")
@@ -291,12 +370,12 @@ def scrape_all_pages(driver, wait, max_pages=200, timeout_minutes=30):
             continue
         except Exception as e:
             print(f"❌ Pager navigation error: {e}")
+            metrics.inc('brightmls_failed_pages_total', engine='selenium')
             break
     return all_data, headers
 
-def run_brightmls_scraper():
-    """Run the scraping process and return a result dictionary."""
-    # Setup Chrome driver with enhanced headless options
+def build_chrome_options():
+    """Chrome options for the headless scraping browser."""
     options = Options()
     options.add_argument("--headless=new")  # Use new headless mode
     options.add_argument("--no-sandbox")  # Disable sandbox for better compatibility
@@ -305,7 +384,6 @@ def run_brightmls_scraper():
     options.add_argument("--window-size=1920,1080")  # Set window size for consistent rendering
     options.add_argument("--disable-extensions")  # Disable extensions
     options.add_argument("--disable-plugins")  # Disable plugins
-    options.add_argument("--disable-images")  # Disable images for faster loading
     options.add_argument("--disable-blink-features=AutomationControlled")  # Hide automation
     options.add_argument("--disable-web-security")  # Disable web security
     options.add_argument("--allow-running-insecure-content")  # Allow insecure content
@@ -316,57 +394,234 @@ def run_brightmls_scraper():
         "profile.default_content_setting_values.notifications": 2,  # Disable notifications
         "profile.default_content_settings.popups": 0,  # Disable popups
     })
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    wait = WebDriverWait(driver, 20)
+    # Request blocking, renderer limits and network accounting (BRIGHTMLS_BROWSER_PROFILE)
+    return browser_profile.configure_options(options)
+
+def create_driver(driver_path=None):
+    """Start a headless Chrome, resolving the chromedriver binary unless a path is given."""
+    service = Service(driver_path or ChromeDriverManager().install())
+    return browser_profile.apply(webdriver.Chrome(service=service, options=build_chrome_options()))
+
+def get_result_count(driver):
+    """Return the total number of search results shown next to the pager, or None."""
+    try:
+        body_text = driver.find_element(By.TAG_NAME, "body").text
+    except Exception:
+        return None
+    match = RESULT_COUNT_RE.search(body_text)
+    return int(match.group(1).replace(',', '')) if match else None
+
+def login(driver, ready):
+    """Log in to BrightMLS and wait for the post-login redirect to finish."""
+    with metrics.span('login'):
+        driver.get(LOGIN_URL)
+        ready.until('login_form', EC.presence_of_element_located((By.ID, "username"))).send_keys(USERNAME)
+        driver.find_element(By.ID, "password").send_keys(PASSWORD)
+        driver.find_element(By.ID, "password").send_keys(Keys.TAB)
+        login_button = ready.until('login_form', EC.element_to_be_clickable((By.XPATH, "//button[@type='submit' and text()='LOG IN']")))
+        login_button.click()
+        ready.until('login_redirect', login_complete(LOGIN_URL))
+
+def run_brightmls_scraper(workers=SCRAPE_WORKERS, engine=ENGINE, mode=None, shard_by=None, stop=None, on_progress=None):
+    """Run the scraping process and return a result dictionary.
+
+    mode is "full", "delta" or "auto" (default SCRAPE_MODE). shard_by ("county" or "price",
+    default shards.SHARD_BY) splits full sweeps into shards. stop is a threading.Event
+    checked between pages; on_progress receives progress update dicts.
+    """
+    if not run_lock.acquire(blocking=False):
+        return {
+            'success': False,
+            'message': "❌ A scrape is already running",
+            'row_count': 0,
+            'changes': None,
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'wait_seconds': {},
+        }
+    global change_tracker, checkpoint, csv_writer, stop_event, progress_listener
+    stop_event, progress_listener = stop, on_progress
+    metrics.start_run()
+    result = None
+    try:
+        if shard_by is None:
+            from shards import SHARD_BY as shard_by
+        result = _run_scraper(workers, engine, mode or SCRAPE_MODE, shard_by)
+        return result
+    finally:
+        # Per-stage spans, counters and page latencies of this run
+        report = metrics.finish_run()
+        if result is not None:
+            result['report'] = report
+            result['resources'] = browser_profile.resources_report(report)
+            metrics.inc('brightmls_runs_total', status='succeeded' if result['success'] else 'failed')
+        # Keep what an interrupted or failed run saw, so its pages are not reported as changes again
+        if change_tracker is not None:
+            change_tracker.save()
+        if csv_writer is not None:
+            csv_writer.stop()
+        change_tracker = checkpoint = csv_writer = stop_event = progress_listener = None
+        run_lock.release()
+
+def export_csv_for_readers():
+    """Bring the CSV export up to date for /csv and /chat; return True when it was rewritten.
+
+    During a run its CsvWriter snapshots the store every FLUSH_SECONDS, so readers take
+    the latest snapshot instead of re-exporting the whole store on every request.
+    """
+    if csv_writer is not None and os.path.exists(CSV_FILE):
+        return False
+    return get_store().export_csv_if_stale(CSV_FILE)
+
+def _start_browser():
+    """Return (driver, ready, driver_path, manager, browser info) with a logged-in browser."""
+    if PERSISTENT_BROWSER:
+        from driver_manager import get_driver_manager
+        manager = get_driver_manager()
+        driver, ready, browser = manager.acquire()
+        print(f"✅ {browser['start'].capitalize()} browser ready in {browser['startup_seconds']}s"
+              f"{' (logged in)' if browser['login'] else ' (session reused)'}")
+        return driver, ready, manager.driver_path, manager, browser
+    start = time.time()
+    driver_path = ChromeDriverManager().install()
+    driver = create_driver(driver_path)
+    ready = Readiness(driver)
+    print("🔄 Logging in...")
+    login(driver, ready)
+    print("✅ Login successful")
+    browser = {'start': 'cold', 'login': True, 'restarts': 0, 'startup_seconds': round(time.time() - start, 2)}
+    return driver, ready, driver_path, None, browser
+
+
+def _scrape_pages(driver, wait, ready, driver_path, workers, engine, start_page, result):
+    """Scrape from start_page with the configured engine; return (data, headers)."""
+    pooled = None
+    if workers > 1:
+        from session_pool import scrape_all_pages_parallel
+        pooled = scrape_all_pages_parallel(driver, workers, driver_path=driver_path, start_page=start_page)
+    if pooled:
+        data, headers, result['pool'] = pooled
+        return data, headers
+    if engine == 'http':
+        from http_engine import scrape_all_pages_with_http
+        return scrape_all_pages_with_http(driver, wait, ready, start_page=start_page)
+    return scrape_all_pages(driver, wait, ready=ready, start_page=start_page)
+
+def _refresh_report(mode, started_at, seconds, completed, sort_column=None):
+    """Record the run and, for delta refreshes, estimate pages skipped and time saved against a full sweep."""
+    store = get_store()
+    pages, rows = change_tracker.pages_seen, change_tracker.rows_seen
+    report = {'mode': mode, 'pages_scraped': pages, 'seconds': round(seconds, 1)}
+    if mode == 'delta':
+        report['sort_column'] = sort_column
+    if mode == 'delta' and pages and change_tracker.expected_rows:
+        # Pages the full result set spans at this run's rows per page; without rows, only the pages seen
+        total_pages = min(MAX_PAGES, math.ceil(change_tracker.expected_rows / (rows / pages))) if rows else pages
+        # Seconds per page of the last full sweep, or of this run when there is none yet
+        full = store.last_run('full')
+        per_page = full['seconds'] / full['pages'] if full and full['pages'] else seconds / pages
+        skipped = max(0, total_pages - pages)
+        report.update(pages_skipped=skipped,
+                      estimated_full_sweep_seconds=round(total_pages * per_page, 1),
+                      time_saved_seconds=round(skipped * per_page, 1))
+    store.record_run(mode, started_at, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                     pages, rows, round(seconds, 2), completed)
+    return report
+
+def _run_scraper(workers, engine, mode, shard_by=''):
     result = {
         'success': False,
         'message': '',
         'row_count': 0,
-        'new_data': False,
+        'changes': None,
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'wait_seconds': {},
+        'browser': None,
     }
     try:
-        # Initial login
-        print("🔄 Logging in...")
-        driver.get(LOGIN_URL)
-        time.sleep(3)
-        driver.find_element(By.ID, "username").send_keys(USERNAME)
-        time.sleep(1)
-        driver.find_element(By.ID, "password").send_keys(PASSWORD)
-        time.sleep(1)
-        driver.find_element(By.ID, "password").send_keys(Keys.TAB)
-        time.sleep(2)
-        login_button = driver.find_element(By.XPATH, "//button[@type='submit' and text()='LOG IN']")
-        login_button.click()
-        time.sleep(10)
-        print("✅ Login successful")
-
+        with metrics.span('browser_start'):
+            driver, ready, driver_path, manager, result['browser'] = _start_browser()
+    except Exception as e:
+        print(f"❌ Could not start browser: {e}")
+        result['message'] = f"❌ Could not start browser: {e}"
+        return result
+    wait = WebDriverWait(driver, ready.timeout)
+    result['wait_seconds'] = ready.timings
+    global change_tracker, checkpoint, csv_writer
+    change_tracker = ChangeTracker()
+    csv_writer = CsvWriter(get_store(), CSV_FILE)
+    healthy = False
+    try:
         print(f"\n🔄 Starting data collection at {result['timestamp']}")
         # Perform search
-        if not perform_search(driver, wait):
+        if not perform_search(driver, wait, ready):
             result['message'] = "❌ Search failed"
             return result
-        # Scrape all pages and save in real time
-        data, headers = scrape_all_pages(driver, wait)
+        # Removed listings are only reported when every result gets scraped
+        change_tracker.expected_rows = get_result_count(driver)
+        report_progress(total_rows=change_tracker.expected_rows)
+        mode = choose_mode(mode)
+        sort_column = sort_results(driver, ready) if mode == 'delta' else None
+        if mode == 'delta' and sort_column is None:
+            print("⚠️ Could not sort results newest first; running a full sweep instead")
+            mode = 'full'
+            if not perform_search(driver, wait, ready):
+                result['message'] = "❌ Search failed"
+                return result
+        elif sort_column == LIST_DATE_COLUMN:
+            print("⚠️ Sorted by list date: changes to older listings wait for the next full sweep")
+        print(f"🔄 Running a {mode} {'refresh' if mode == 'delta' else 'sweep'}")
+        scrape_started = time.time()
+        if mode == 'delta':
+            # Newest pages first, one session, until a page has nothing new
+            change_tracker.stop_when_unchanged = True
+            data, headers = _scrape_pages(driver, wait, ready, driver_path, 1, engine, 1, result)
+            completed = change_tracker.caught_up
+        elif shard_by:
+            # Shards each stay under the page cap and run on SHARD_WORKERS sessions; rows are
+            # deduplicated by MLS # across shards
+            from shards import SHARD_WORKERS, scrape_sharded
+            data, headers, result['shards'] = scrape_sharded(driver, ready, shard_by, SHARD_WORKERS,
+                                                             driver_path=driver_path)
+            completed = not result['shards']['failed_shards']
+        else:
+            # Continue an interrupted crawl of the same results from its next unfinished page
+            checkpoint = Checkpoint(get_store(), SEARCH_CRITERIA, change_tracker.expected_rows, MAX_PAGES)
+            start_page = checkpoint.resume_page()
+            if start_page > 1:
+                from session_pool import go_to_page
+                print(f"🔄 Resuming the previous crawl at page {start_page}...")
+                try:
+                    go_to_page(driver, ready, start_page)
+                except Exception as e:
+                    print(f"⚠️ Could not reach page {start_page}, starting over: {e}")
+                    start_page = 1
+                    if not perform_search(driver, wait, ready):
+                        result['message'] = "❌ Search failed"
+                        return result
+            checkpoint.start(start_page)
+            data, headers = _scrape_pages(driver, wait, ready, driver_path, workers, engine, start_page, result)
+            result['checkpoint'] = checkpoint.finish()
+            completed = result['checkpoint']['completed']
+        result['refresh'] = _refresh_report(mode, result['timestamp'], time.time() - scrape_started, completed,
+                                            sort_column)
+        # The CSV download is an export of the store (latest row per MLS #), snapshotted during the run
+        result['csv'] = csv_writer.close()
         if not data:
             result['message'] = "❌ No data found"
             return result
-        # Generate hash of current data
-        current_hash = get_data_hash(data)
-        previous_hash = load_data_hash()
-        if current_hash == previous_hash:
-            result['message'] = "ℹ️ No new data found - data unchanged"
-            result['row_count'] = len(data)
-        else:
+        summary = change_tracker.finish()
+        result['changes'] = summary
+        result['row_count'] = len(data)
+        if change_tracker.has_changes():
             print("🆕 New data detected!")
-            # Save new hash
-            save_data_hash(current_hash)
-            print(f"✅ New data saved with {len(data)} rows")
-            result['message'] = f"✅ New data saved with {len(data)} rows"
-            result['row_count'] = len(data)
-            result['new_data'] = True
+            result['message'] = (f"✅ {len(data)} rows scraped: {summary['added']} added, "
+                                 f"{summary['changed']} changed, {summary['removed']} removed")
+        else:
+            result['message'] = "ℹ️ No new data found - data unchanged"
+        print(result['message'])
+        print(f"⏱️ Waited {ready.total()}s on page readiness: {ready.timings}")
         result['success'] = True
+        healthy = True
         return result
     except KeyboardInterrupt:
         print("\n🛑 Script interrupted by user")
@@ -381,4 +636,9 @@ def run_brightmls_scraper():
         result['message'] = f"❌ Fatal error: {e}"
         return result
     finally:
-        driver.quit()
+        browser_profile.finish_run(driver)
+        # A warm browser is kept for the next run unless this run failed part-way
+        if manager is None:
+            driver.quit()
+        elif not healthy:
+            manager.discard()
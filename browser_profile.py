@@ -0,0 +1,198 @@
+import json
+import os
+
+import psutil
+
+import metrics
+from parsing import RESULTS_TABLE_XPATH
+
+# "full" loads Matrix pages as they are; "lite" blocks images, fonts, media, stylesheets and
+# third-party hosts, caps the renderer's JS heap and trims the browser during long crawls
+BROWSER_PROFILE = os.getenv("BRIGHTMLS_BROWSER_PROFILE", "full")
+BROWSER_PROFILES = ('full', 'lite')
+# Resource file types the lite profile never downloads
+BLOCKED_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp',
+                      'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp4', 'webm', 'mp3', 'css']
+# Analytics, tag manager, map and web font hosts the lite profile blocks
+BLOCKED_HOSTS = [host.strip() for host in os.getenv(
+    "BRIGHTMLS_BLOCKED_HOSTS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+    "maps.googleapis.com,maps.gstatic.com,fonts.googleapis.com,fonts.gstatic.com,"
+    "api.mapbox.com,bing.com,hotjar.com,newrelic.com,nr-data.net").split(',') if host.strip()]
+# V8 heap ceiling per renderer in the lite profile
+RENDERER_HEAP_MB = int(os.getenv("BRIGHTMLS_RENDERER_HEAP_MB", "256"))
+# Clear the DOM and cache, collect garbage and close stray tabs every this many pages (lite profile)
+TRIM_EVERY_PAGES = int(os.getenv("BRIGHTMLS_TRIM_EVERY_PAGES", "25"))
+# Count bytes transferred from Chrome's network log (either profile); off by default since
+# performance logging costs memory and time on every page, the benchmarks turn it on
+TRACK_BYTES = os.getenv("BRIGHTMLS_TRACK_BYTES", "0") == "1"
+
+# Drop the media, frames and widgets outside the results grid that earlier pages left in the DOM;
+# the grid and its pager stay, so paging carries on. Returns the number of nodes removed.
+CLEAR_DOM_SCRIPT = """
+const grid = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+let removed = 0;
+for (const node of document.querySelectorAll('iframe, canvas, video, audio, object, embed, img, svg')) {
+    if (grid && grid.contains(node)) continue;
+    node.remove();
+    removed++;
+}
+return removed;
+"""
+
+LITE_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    f"--js-flags=--max-old-space-size={RENDERER_HEAP_MB}",
+    "--renderer-process-limit=1",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+]
+
+
+def blocked_url_patterns(extensions=None, hosts=None):
+    """Network.setBlockedURLs patterns for the blocked file types (with or without a query) and hosts."""
+    extensions = BLOCKED_EXTENSIONS if extensions is None else extensions
+    hosts = BLOCKED_HOSTS if hosts is None else hosts
+    patterns = []
+    for extension in extensions:
+        patterns += [f"*.{extension}", f"*.{extension}?*"]
+    for host in hosts:
+        patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+    return patterns
+
+
+def browser_rss_mb(driver):
+    """Resident memory of chromedriver, Chrome and all their child processes, in MB."""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (psutil.Error, AttributeError):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return round(total / (1024 * 1024), 1)
+
+
+def configure_options(options, profile=None):
+    """Add the profile's Chrome arguments and network logging to options."""
+    profile = profile or BROWSER_PROFILE
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile {profile!r}; use one of {', '.join(BROWSER_PROFILES)}")
+    if profile == 'lite':
+        for argument in LITE_ARGUMENTS:
+            options.add_argument(argument)
+    if TRACK_BYTES:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    return options
+
+
+class ProfileSession:
+    """Per-browser state of the profile: pages since the last trim and the tab to keep."""
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.pages = 0
+        self.main_window = None
+
+
+def apply(driver, profile=None):
+    """Turn on request blocking for a new browser and attach its profile state."""
+    profile = profile or BROWSER_PROFILE
+    driver.brightmls_profile = ProfileSession(profile)
+    if profile != 'lite':
+        return driver
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns()})
+        driver.brightmls_profile.main_window = driver.current_window_handle
+    except Exception as e:
+        print(f"⚠️ Could not enable request blocking: {e}")
+    return driver
+
+
+def drain_network_log(driver):
+    """Count the bytes received and requests blocked since the last drain, from the performance log."""
+    if not TRACK_BYTES:
+        return 0, 0
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        return 0, 0
+    received = blocked = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+        method = message.get('method')
+        if method == 'Network.loadingFinished':
+            received += int(message['params'].get('encodedDataLength') or 0)
+        elif method == 'Network.loadingFailed' and message['params'].get('blockedReason'):
+            blocked += 1
+    session = getattr(driver, 'brightmls_profile', None)
+    profile = session.profile if session else BROWSER_PROFILE
+    if received:
+        metrics.inc('brightmls_bytes_transferred_total', received, profile=profile)
+    if blocked:
+        metrics.inc('brightmls_requests_blocked_total', blocked, profile=profile)
+    return received, blocked
+
+
+def trim(driver):
+    """Close stray tabs and drop the DOM leftovers, HTTP cache and garbage of pages already scraped."""
+    session = getattr(driver, 'brightmls_profile', None)
+    try:
+        if session is not None and session.main_window is not None:
+            for handle in driver.window_handles:
+                if handle != session.main_window:
+                    driver.switch_to.window(handle)
+                    driver.close()
+            driver.switch_to.window(session.main_window)
+        driver.execute_script(CLEAR_DOM_SCRIPT, RESULTS_TABLE_XPATH)
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+    except Exception as e:
+        print(f"⚠️ Could not trim the browser: {e}")
+
+
+def page_loaded(driver):
+    """Account one scraped page: network bytes, peak browser memory and, in the lite profile, periodic trims."""
+    session = getattr(driver, 'brightmls_profile', None)
+    if session is None:
+        return
+    session.pages += 1
+    drain_network_log(driver)
+    rss = browser_rss_mb(driver)
+    if rss is not None:
+        metrics.peak('browser_rss_mb', rss)
+    if session.profile == 'lite' and TRIM_EVERY_PAGES and session.pages % TRIM_EVERY_PAGES == 0:
+        trim(driver)
+
+
+def finish_run(driver):
+    """Account the browser's remaining network log and memory at the end of a run."""
+    drain_network_log(driver)
+    rss = browser_rss_mb(driver)
+    if rss is not None:
+        metrics.peak('browser_rss_mb', rss)
+
+
+def resources_report(report):
+    """Bytes transferred, requests blocked and peak browser memory of a run, from its run report."""
+    counters = report.get('counters', {}) if report else {}
+    peaks = report.get('peaks', {}) if report else {}
+    return {
+        'profile': BROWSER_PROFILE,
+        'bytes_transferred': counters.get('brightmls_bytes_transferred_total', 0),
+        'requests_blocked': counters.get('brightmls_requests_blocked_total', 0),
+        'peak_browser_rss_mb': peaks.get('browser_rss_mb'),
+    }
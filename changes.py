@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+# === File paths ===
+INDEX_FILE = "listing_index.json"
+CHANGES_FILE = "listing_changes.jsonl"
+
+KEY_FIELD = 'MLS #'
+# Columns that do not describe the listing itself
+IGNORED_FIELDS = {'', 'Timestamp'}
+TRACKED_TRANSITIONS = ('Price', 'Status')
+
+
+def listing_fields(row):
+    """Return the columns of a scraped row that describe the listing."""
+    return {k: v for k, v in row.items() if k not in IGNORED_FIELDS}
+
+
+def fingerprint(row):
+    """Stable hash of a listing's fields, independent of column order."""
+    payload = json.dumps(listing_fields(row), sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def write_json_atomic(path, payload):
+    """Write JSON to a temp file and rename it over path so readers never see a torn file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_index(path=INDEX_FILE):
+    """Load the per-listing fingerprint index, keyed by MLS #."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Could not read {path}, starting a fresh index: {e}")
+        return {}
+
+
+class ChangeTracker:
+    """Diff each scraped page against the stored index and record added/changed/removed listings.
+
+    Change events are appended as each page arrives; the index is written once, by save()
+    (finish() calls it), so a page costs O(rows) rather than a rewrite of the whole index.
+    """
+
+    def __init__(self, index_file=INDEX_FILE, changes_file=CHANGES_FILE):
+        self.index_file = index_file
+        self.changes_file = changes_file
+        self.index = load_index(index_file)
+        self.seen = set()
+        self.rows_seen = 0
+        self.pages_seen = 0
+        self.expected_rows = None
+        # Delta refreshes stop at the first page whose listings all match the index
+        self.stop_when_unchanged = False
+        self.caught_up = False
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.transitions = {field: 0 for field in TRACKED_TRANSITIONS}
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def _append_events(self, events):
+        if not events:
+            return
+        with open(self.changes_file, 'a', encoding='utf-8') as f:
+            for event in events:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def update_page(self, rows, timestamp):
+        """Fold one page into the index, append its change events and return them."""
+        events = []
+        with self.lock:
+            self.pages_seen += 1
+            known = 0
+            for row in rows:
+                mls = row.get(KEY_FIELD)
+                if not mls:
+                    continue
+                self.rows_seen += 1
+                self.seen.add(mls)
+                fields = listing_fields(row)
+                fp = fingerprint(row)
+                entry = self.index.get(mls)
+                if entry is None:
+                    self.index[mls] = {'fp': fp, 'fields': fields, 'first_seen': timestamp, 'last_seen': timestamp}
+                    self.added.append(mls)
+                    events.append({'timestamp': timestamp, 'mls': mls, 'change': 'added', 'fields': fields})
+                    continue
+                entry['last_seen'] = timestamp
+                if entry['fp'] == fp:
+                    known += 1
+                    continue
+                diff = {k: [entry['fields'].get(k), v] for k, v in fields.items() if entry['fields'].get(k) != v}
+                for field in TRACKED_TRANSITIONS:
+                    if field in diff:
+                        self.transitions[field] += 1
+                entry.update(fp=fp, fields=fields)
+                self.changed.append(mls)
+                events.append({'timestamp': timestamp, 'mls': mls, 'change': 'changed', 'fields': diff})
+            if self.stop_when_unchanged and known and known == len(rows) and not self.caught_up:
+                print(f"✅ Every listing on page {self.pages_seen} is unchanged; stopping the delta refresh")
+                self.caught_up = True
+            self._append_events(events)
+            if rows:
+                self.dirty = True
+        return events
+
+    def save(self):
+        """Write the index if pages were folded in since the last save."""
+        with self.lock:
+            if self.dirty:
+                write_json_atomic(self.index_file, self.index)
+                self.dirty = False
+
+    def finish(self, timestamp=None):
+        """Close the run; listings not seen are only marked removed when every result was scraped."""
+        timestamp = timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            complete = self.expected_rows is not None and self.rows_seen >= self.expected_rows
+            if complete:
+                events = []
+                for mls in [m for m in self.index if m not in self.seen]:
+                    entry = self.index.pop(mls)
+                    self.removed.append(mls)
+                    events.append({'timestamp': timestamp, 'mls': mls, 'change': 'removed', 'fields': entry['fields']})
+                self._append_events(events)
+                self.dirty = True
+            summary = self.summary(complete)
+        self.save()
+        return summary
+
+    def summary(self, complete=False):
+        return {
+            'added': len(self.added),
+            'changed': len(self.changed),
+            'removed': len(self.removed),
+            'price_changes': self.transitions['Price'],
+            'status_changes': self.transitions['Status'],
+            'added_mls': self.added,
+            'changed_mls': self.changed,
+            'removed_mls': self.removed,
+            'complete': complete,
+        }
+
+    def has_changes(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+def load_changes_since(since, limit=None, path=CHANGES_FILE):
+    """Return change events newer than since (a datetime), oldest first.
+
+    Events are stamped in naive local time, so an aware since is converted to local time first.
+    """
+    if since.tzinfo is not None:
+        since = since.astimezone().replace(tzinfo=None)
+    events = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if datetime.fromisoformat(event['timestamp']) > since:
+                    events.append(event)
+    except FileNotFoundError:
+        return []
+    if limit is not None:
+        events = events[:limit]
+    return events
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+from changes import fingerprint
+
+# A crawl interrupted longer ago than this starts over from page 1
+RESUME_MAX_AGE_HOURS = float(os.getenv("BRIGHTMLS_RESUME_MAX_AGE_HOURS", "12"))
+# Stop once this many pages in a row hash the same as in the previous crawl (0, the default, disables).
+# A run that stops early leaves its checkpoint open, so the next run carries on from the next page.
+UNCHANGED_PAGES_STOP = int(os.getenv("BRIGHTMLS_UNCHANGED_PAGES_STOP", "0"))
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def search_key(criteria):
+    """Stable id for a set of search criteria."""
+    payload = json.dumps(criteria, sort_keys=True)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def page_hash(rows):
+    """Hash of a page's listings, in page order."""
+    digest = hashlib.md5()
+    for row in rows:
+        digest.update(fingerprint(row).encode('ascii'))
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Progress of one search's crawl, saved with each page so an interrupted run can resume.
+
+    last_page is the highest page with every page before it saved. Pages saved after a gap
+    (a page that failed in the pool) do not move it, so a resumed crawl starts at the gap.
+    """
+
+    def __init__(self, store, criteria, expected_rows=None, max_pages=200,
+                 max_age_hours=RESUME_MAX_AGE_HOURS, unchanged_stop=UNCHANGED_PAGES_STOP):
+        self.store = store
+        self.criteria = criteria
+        self.key = search_key(criteria)
+        self.expected_rows = expected_rows
+        self.max_pages = max_pages
+        self.max_age_hours = max_age_hours
+        self.unchanged_stop = unchanged_stop
+        self.previous = store.load_checkpoint(self.key)
+        # Page hashes from the previous crawl, compared against this run's pages
+        self.previous_hashes = self.previous['pages'] if self.previous else {}
+        self.start_page = 1
+        self.last_page = 0
+        self.row_count = 0
+        # Rows of the pages this run saved beyond last_page, waiting for the gap before them
+        self.ahead = {}
+        self.unchanged_streak = 0
+        self.unchanged_pages = 0
+        self.caught_up = False
+
+    def resume_page(self):
+        """First page to scrape: after the last saved page of an unfinished, recent crawl of the same results, else 1."""
+        previous = self.previous
+        if not previous or previous['completed'] or not previous['last_page']:
+            return 1
+        if previous['last_page'] >= self.max_pages:
+            return 1
+        if self.expected_rows is None or previous['expected_rows'] != self.expected_rows:
+            return 1
+        updated = datetime.strptime(previous['updated_at'], TIMESTAMP_FORMAT)
+        if datetime.now() - updated > timedelta(hours=self.max_age_hours):
+            return 1
+        return previous['last_page'] + 1
+
+    def start(self, start_page):
+        """Begin (or continue) the crawl at start_page; starting at page 1 resets the saved progress."""
+        self.start_page = start_page
+        if start_page > 1:
+            self.last_page = self.previous['last_page']
+            self.row_count = self.previous['row_count']
+        else:
+            self.store.start_checkpoint(self.key, self.criteria, self.expected_rows,
+                                        datetime.now().strftime(TIMESTAMP_FORMAT))
+
+    def _advance(self, page, rows):
+        """(last_page, row_count) once page is saved: the frontier moves over every page without a gap."""
+        ahead = dict(self.ahead)
+        ahead[page] = rows
+        last_page, row_count = self.last_page, self.row_count
+        while last_page + 1 in ahead:
+            last_page += 1
+            row_count += ahead[last_page]
+        return last_page, row_count
+
+    def entry(self, page, rows):
+        """Checkpoint fields written by upsert_page in the same transaction as the page's rows."""
+        last_page, row_count = self._advance(page, len(rows))
+        return {'key': self.key, 'page': page, 'hash': page_hash(rows), 'rows': len(rows),
+                'last_page': last_page, 'row_count': row_count}
+
+    def saved(self, entry):
+        """Note a saved page and check whether the crawl has caught up with the previous one."""
+        if entry['page'] > self.last_page:
+            self.ahead[entry['page']] = entry['rows']
+        self.last_page, self.row_count = entry['last_page'], entry['row_count']
+        self.ahead = {page: rows for page, rows in self.ahead.items() if page > self.last_page}
+        same_results = self.previous is not None and self.previous['expected_rows'] == self.expected_rows
+        if same_results and self.previous_hashes.get(entry['page']) == entry['hash']:
+            self.unchanged_streak += 1
+            self.unchanged_pages += 1
+        else:
+            self.unchanged_streak = 0
+        if self.unchanged_stop and self.unchanged_streak >= self.unchanged_stop and not self.caught_up:
+            print(f"✅ {self.unchanged_streak} unchanged pages in a row; stopping early")
+            self.caught_up = True
+
+    def finish(self):
+        """Mark the crawl completed when it reached the last result or hit max_pages.
+
+        A crawl that stopped early on unchanged pages has not covered every page, so it is not
+        a completed sweep.
+        """
+        completed = not self.caught_up and (
+            self.last_page >= self.max_pages
+            or (self.expected_rows is not None and self.row_count >= self.expected_rows))
+        self.store.finish_checkpoint(self.key, completed, datetime.now().strftime(TIMESTAMP_FORMAT))
+        return {
+            'resumed_from_page': self.start_page if self.start_page > 1 else None,
+            'last_page': self.last_page,
+            'row_count': self.row_count,
+            # Pages saved after a gap; a resumed crawl scrapes them again from the gap
+            'pages_after_gap': sorted(self.ahead),
+            'unchanged_pages': self.unchanged_pages,
+            'stopped_early': self.caught_up,
+            'completed': completed,
+        }
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+
+import metrics
+
+# Rows saved since the last snapshot that trigger a new one
+FLUSH_ROWS = int(os.getenv("BRIGHTMLS_CSV_FLUSH_ROWS", "2000"))
+# Seconds after which saved rows are written out even below FLUSH_ROWS
+FLUSH_SECONDS = float(os.getenv("BRIGHTMLS_CSV_FLUSH_SECONDS", "30"))
+
+
+class CsvWriter:
+    """Keep the CSV export current while a run saves pages to the store.
+
+    Each page is durable once its store transaction commits (the store fsyncs
+    every commit), so the buffer here is only a count of rows not yet in the CSV.
+    Once FLUSH_ROWS rows have accumulated, or every FLUSH_SECONDS on a timer
+    thread (a slow page does not hold the export back), the CSV is compacted:
+    rewritten from the store with the latest row per MLS # and the fixed
+    CSV_HEADERS schema, fsynced and renamed over the old file. Readers therefore
+    only ever see a complete snapshot, never a page that is half written.
+    """
+
+    def __init__(self, store, path, flush_rows=FLUSH_ROWS, flush_seconds=FLUSH_SECONDS):
+        self.store = store
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.snapshots = 0
+        self.exported = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.timer = threading.Thread(target=self._flush_periodically, name='csv-writer', daemon=True)
+        self.timer.start()
+
+    def write_page(self, rows):
+        """Count a saved page towards the next snapshot; compact when the buffer is full."""
+        with self.lock:
+            self.pending += len(rows)
+            due = self.pending >= self.flush_rows
+        if due:
+            self.flush()
+
+    def _flush_periodically(self):
+        while not self.stopped.wait(self.flush_seconds):
+            with self.lock:
+                due = self.pending and time.monotonic() - self.last_flush >= self.flush_seconds
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"⚠️ Could not export {self.path}: {e}")
+
+    def flush(self):
+        """Compact the store's listings into a new CSV snapshot now."""
+        with self.lock:
+            with metrics.span('csv_export'):
+                self.exported = self.store.export_csv(self.path)
+            self.pending = 0
+            self.last_flush = time.monotonic()
+            self.snapshots += 1
+        print(f"✅ Exported {self.exported} listings to {self.path}")
+
+    def stop(self):
+        """Stop the timer thread without a final snapshot."""
+        self.stopped.set()
+        if self.timer is not threading.current_thread():
+            self.timer.join()
+
+    def close(self):
+        """Write the final snapshot of the run and return a summary."""
+        self.stop()
+        self.flush()
+        return {'snapshots': self.snapshots, 'listings': self.exported}
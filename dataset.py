@@ -0,0 +1,77 @@
+import os
+import threading
+import pandas as pd
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_signature(path):
+    """(mtime_ns, size) of path; changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def make_etag(signature):
+    mtime_ns, size = signature
+    return f'"{mtime_ns:x}-{size:x}"'
+
+
+class DatasetCache:
+    """Keep a parsed copy of a CSV in memory and reload it only when the file's mtime or size changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._df = None
+        self._signature = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Return the cached DataFrame, re-reading the file if it changed since the last load."""
+        with self.lock:
+            signature = file_signature(self.path)
+            if self._df is None or signature != self._signature:
+                self._df = pd.read_csv(self.path)
+                self._signature = signature
+            return self._df
+
+    def version(self):
+        """Identifier of the currently cached file contents."""
+        with self.lock:
+            return make_etag(self._signature) if self._signature else None
+
+
+def parse_range(header, size):
+    """Parse a single "bytes=start-end" Range header into inclusive (start, end), or None if unsatisfiable."""
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].split(",")[0].strip()
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def iter_file(f, start, length, chunk_size=CHUNK_SIZE):
+    """Yield length bytes of an open file from start, chunk by chunk, then close it."""
+    try:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
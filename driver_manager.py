@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+from webdriver_manager.chrome import ChromeDriverManager
+
+import brightmls
+from browser_profile import browser_rss_mb
+from session_pool import export_cookies, import_cookies
+from waits import Readiness, document_ready
+
+# === File paths ===
+SESSION_COOKIE_FILE = "session_cookies.json"
+
+# Restart the browser once Chrome and its children use more than this much memory
+MAX_BROWSER_RSS_MB = int(os.getenv("BRIGHTMLS_MAX_BROWSER_RSS_MB", "1500"))
+
+
+class DriverManager:
+    """Keep one warm, authenticated Chrome between scrape runs and log in again only when needed."""
+
+    def __init__(self, max_rss_mb=MAX_BROWSER_RSS_MB, cookie_file=SESSION_COOKIE_FILE):
+        self.max_rss_mb = max_rss_mb
+        self.cookie_file = cookie_file
+        self.driver_path = None
+        self.driver = None
+        self.restarts = 0
+        self.runs = 0
+        self.lock = threading.Lock()
+
+    def resolve(self):
+        """Resolve the chromedriver binary once; later runs reuse the path."""
+        if self.driver_path is None:
+            start = time.time()
+            self.driver_path = ChromeDriverManager().install()
+            print(f"✅ Resolved chromedriver in {time.time() - start:.1f}s: {self.driver_path}")
+        return self.driver_path
+
+    def healthy(self):
+        """The browser answers commands and is under the memory ceiling."""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+        except Exception as e:
+            print(f"⚠️ Browser is not responding, restarting: {e}")
+            return False
+        rss = browser_rss_mb(self.driver)
+        if rss is not None and rss > self.max_rss_mb:
+            print(f"⚠️ Browser is using {rss} MB (limit {self.max_rss_mb} MB), restarting")
+            return False
+        return True
+
+    def _save_cookies(self):
+        try:
+            with open(self.cookie_file, 'w', encoding='utf-8') as f:
+                json.dump(export_cookies(self.driver), f)
+        except Exception as e:
+            print(f"⚠️ Could not save session cookies: {e}")
+
+    def _load_cookies(self):
+        try:
+            with open(self.cookie_file, 'r', encoding='utf-8') as f:
+                import_cookies(self.driver, json.load(f))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️ Could not restore session cookies: {e}")
+            return False
+
+    def session_valid(self, ready):
+        """Open the search page; an expired session gets redirected to the login page."""
+        self.driver.get(brightmls.SEARCH_URL)
+        ready.until('session_check', document_ready)
+        return not self.driver.current_url.startswith(brightmls.LOGIN_URL)
+
+    def acquire(self, ready_factory=Readiness):
+        """Return (driver, ready, info) with an authenticated browser, starting or logging in only if needed."""
+        with self.lock:
+            start = time.time()
+            info = {'start': 'warm', 'login': False, 'restarts': self.restarts}
+            if self.driver is not None and not self.healthy():
+                self.discard()
+                self.restarts += 1
+                info['restarts'] = self.restarts
+            if self.driver is None:
+                info['start'] = 'cold'
+                self.driver = brightmls.create_driver(self.resolve())
+                self._load_cookies()
+            ready = ready_factory(self.driver)
+            if not self.session_valid(ready):
+                print("🔄 Session expired or missing, logging in...")
+                brightmls.login(self.driver, ready)
+                self._save_cookies()
+                info['login'] = True
+            self.runs += 1
+            info['startup_seconds'] = round(time.time() - start, 2)
+            info['browser_rss_mb'] = browser_rss_mb(self.driver)
+            return self.driver, ready, info
+
+    def discard(self):
+        """Quit the browser (after a crash or a failed run); the next acquire starts a fresh one."""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+
+    def shutdown(self):
+        with self.lock:
+            self.discard()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_driver_manager():
+    """Return the process-wide DriverManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = DriverManager()
+        return _manager
@@ -0,0 +1,148 @@
+import re
+import time
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+import brightmls
+import metrics
+from parsing import parse_results_page
+from session_pool import export_cookies, go_to_page
+
+POOL_SIZE = 4
+REQUEST_TIMEOUT = 30
+PAGER_LINKS_XPATH = "//span[contains(concat(' ', normalize-space(@class), ' '), ' pagingLinks ')]//a"
+POSTBACK_RE = re.compile(r"__doPostBack\('([^']*)','([^']*)'\)")
+
+
+class HttpPageFetcher:
+    """Fetch Matrix result pages over a pooled requests.Session using a browser login's cookies."""
+
+    def __init__(self, cookies, user_agent=None, pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        self.timeout = timeout
+        self.url = None
+        self.html = None
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """Build a fetcher from the cookies and user agent of a logged-in Selenium driver."""
+        user_agent = driver.execute_script("return navigator.userAgent")
+        fetcher = cls(export_cookies(driver), user_agent=user_agent, **kwargs)
+        fetcher.url = driver.current_url
+        fetcher.html = driver.page_source
+        return fetcher
+
+    def _load(self, response):
+        response.raise_for_status()
+        self.url = response.url
+        self.html = response.text
+        return self.html
+
+    def get(self, url):
+        return self._load(self.session.get(url, timeout=self.timeout))
+
+    def next_page(self):
+        """Replay the pager's Next postback with the current page's form state and return the new HTML."""
+        root = lxml_html.fromstring(self.html)
+        forms = root.forms
+        if not forms:
+            raise RuntimeError("No form on the current page")
+        form = forms[0]
+        target = argument = None
+        for a in root.xpath(PAGER_LINKS_XPATH):
+            if a.text_content().strip().lower() == 'next':
+                match = POSTBACK_RE.search(a.get('href', ''))
+                if match:
+                    target, argument = match.groups()
+                break
+        if target is None:
+            return None
+        fields = {name: value or '' for name, value in form.form_values()}
+        fields['__EVENTTARGET'] = target
+        fields['__EVENTARGUMENT'] = argument
+        action = form.action or self.url
+        action = requests.compat.urljoin(self.url, action)
+        return self._load(self.session.post(action, data=fields, timeout=self.timeout))
+
+
+def scrape_all_pages_http(fetcher, max_pages=200, timeout_minutes=30, start_page=1):
+    """Scrape the search held by fetcher by replaying pager postbacks over HTTP.
+
+    Pages are parsed with the same row extraction as scrape_data and saved as they
+    arrive. Returns (data, headers, failed_page); failed_page is None unless an HTTP
+    or parse error stopped the run, in which case it is the first page not scraped.
+    start_page is the page the fetcher's current HTML shows.
+    """
+    all_data = []
+    headers = None
+    page_num = start_page
+    start_time = time.time()
+    page_clock = time.perf_counter()
+    page_html = fetcher.html
+    try:
+        while page_num <= max_pages:
+            if time.time() - start_time > timeout_minutes * 60:
+                print(f"⏰ Timeout reached ({timeout_minutes} minutes). Stopping scraper.")
+                break
+            if brightmls.should_stop():
+                print("🛑 Stop signal received. Stopping scraper.")
+                break
+            with metrics.span('parse'):
+                data, page_headers = parse_results_page(page_html)
+            if not data:
+                raise RuntimeError(f"No rows parsed from page {page_num} over HTTP")
+            if headers is None:
+                headers = page_headers
+            all_data.extend(data)
+            brightmls.save_page(data, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), page_num)
+            print(f"✅ Page {page_num}: {len(data)} rows over HTTP")
+            now = time.perf_counter()
+            metrics.page(page_num, now - page_clock, len(data), 'http')
+            page_clock = now
+            if page_num >= max_pages:
+                break
+            # Page page_num is saved; a failed fetch leaves the next one as the first page not scraped
+            page_num += 1
+            with metrics.span('http_fetch'):
+                page_html = fetcher.next_page()
+            if page_html is None:
+                print("✅ No more pages or reached max page limit.")
+                break
+    except Exception as e:
+        print(f"❌ HTTP engine failed on page {page_num}: {e}")
+        metrics.inc('brightmls_failed_pages_total', engine='http')
+        return all_data, headers, page_num
+    return all_data, headers, None
+
+
+def scrape_all_pages_with_http(driver, wait, ready, max_pages=200, timeout_minutes=30, start_page=1):
+    """Scrape over HTTP after the Selenium search, falling back to Selenium from the page that failed."""
+    start_time = time.time()
+    try:
+        fetcher = HttpPageFetcher.from_driver(driver)
+    except Exception as e:
+        print(f"❌ Could not set up the HTTP engine: {e}")
+        return brightmls.scrape_all_pages(driver, wait, max_pages, timeout_minutes, ready=ready, start_page=start_page)
+    data, headers, failed_page = scrape_all_pages_http(fetcher, max_pages, timeout_minutes, start_page)
+    if failed_page is None:
+        return data, headers
+    print(f"🔄 Falling back to Selenium from page {failed_page}...")
+    try:
+        go_to_page(driver, ready, failed_page, start_page)
+    except Exception as e:
+        print(f"❌ Selenium fallback could not reach page {failed_page}: {e}")
+        return data, headers
+    remaining_minutes = max(0.0, timeout_minutes - (time.time() - start_time) / 60)
+    more, more_headers = brightmls.scrape_all_pages(driver, wait, max_pages, remaining_minutes,
+                                                    ready=ready, start_page=failed_page)
+    return data + more, headers or more_headers
@@ -0,0 +1,163 @@
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from metrics import write_run_report
+
+# How many finished jobs /jobs keeps around
+MAX_FINISHED_JOBS = 50
+
+
+class JobConflict(Exception):
+    """Raised when a scrape is requested while another one is still running."""
+
+    def __init__(self, job):
+        super().__init__(f"Job {job.id} is already running")
+        self.job = job
+
+
+class ScrapeJob:
+    """A scrape running on a worker thread, with progress and cooperative cancellation."""
+
+    def __init__(self, target, max_pages=None, options=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.target = target
+        self.options = options or {}
+        self.status = 'queued'
+        self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.started = None
+        self.finished = None
+        self.pages_done = 0
+        self.rows = 0
+        self.total_rows = None
+        self.max_pages = max_pages
+        self.result = None
+        self.error = None
+        self.report_path = None
+        self.cancel_event = threading.Event()
+        self.updated = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name=f"scrape-{self.id}", daemon=True)
+
+    def _notify(self):
+        with self.updated:
+            self.updated.notify_all()
+
+    def on_progress(self, update):
+        """Progress listener passed to run_brightmls_scraper."""
+        if 'total_rows' in update:
+            self.total_rows = update['total_rows']
+        if 'page_rows' in update:
+            self.pages_done += 1
+            self.rows += update['page_rows']
+        self._notify()
+
+    def _run(self):
+        self.status = 'running'
+        self.started = time.time()
+        self._notify()
+        try:
+            self.result = self.target(stop=self.cancel_event, on_progress=self.on_progress, **self.options)
+            if self.cancel_event.is_set():
+                self.status = 'cancelled'
+            else:
+                self.status = 'succeeded' if self.result.get('success') else 'failed'
+        except Exception as e:
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            self.finished = time.time()
+            try:
+                self.report_path = write_run_report(self.id, self.snapshot())
+            except OSError as e:
+                print(f"⚠️ Could not write the run report for job {self.id}: {e}")
+            self._notify()
+
+    @property
+    def done(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
+
+    def cancel(self):
+        """Ask the scraper to stop after the page it is on."""
+        self.cancel_event.set()
+        self._notify()
+
+    def eta_seconds(self, elapsed):
+        if self.done or not self.rows or not self.total_rows:
+            return None
+        remaining = max(0, self.total_rows - self.rows)
+        return round(elapsed / self.rows * remaining, 1)
+
+    def snapshot(self):
+        elapsed = 0.0
+        if self.started:
+            elapsed = (self.finished or time.time()) - self.started
+        total_pages = None
+        if self.total_rows and self.pages_done:
+            total_pages = math.ceil(self.total_rows / (self.rows / self.pages_done))
+            if self.max_pages:
+                total_pages = min(total_pages, self.max_pages)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'created_at': self.created_at,
+            'options': self.options,
+            'cancel_requested': self.cancel_event.is_set(),
+            'pages_done': self.pages_done,
+            'total_pages': total_pages,
+            'rows': self.rows,
+            'total_rows': self.total_rows,
+            'elapsed_seconds': round(elapsed, 1),
+            'eta_seconds': self.eta_seconds(elapsed),
+            'result': self.result,
+            'error': self.error,
+            'report_path': self.report_path,
+        }
+
+    def wait_for_update(self, timeout):
+        """Block until progress changes or timeout passes."""
+        with self.updated:
+            self.updated.wait(timeout)
+
+
+class JobManager:
+    """Run at most one scrape job at a time and keep recent jobs for progress queries."""
+
+    def __init__(self, target, max_pages=None):
+        self.target = target
+        self.max_pages = max_pages
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def active(self):
+        with self.lock:
+            for job in self.jobs.values():
+                if not job.done:
+                    return job
+        return None
+
+    def start(self, **options):
+        """Start a new scrape job (options go to the target), or raise JobConflict if one is still running."""
+        with self.lock:
+            for job in self.jobs.values():
+                if not job.done:
+                    raise JobConflict(job)
+            job = ScrapeJob(self.target, self.max_pages, options)
+            self.jobs[job.id] = job
+            self._prune()
+        job.thread.start()
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return [job.snapshot() for job in self.jobs.values()]
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
@@ -1,18 +1,82 @@
-from fastapi import FastAPI, HTTPException
-from brightmls import run_brightmls_scraper
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from brightmls import run_brightmls_scraper, export_csv_for_readers, PERSISTENT_BROWSER
+from aggregates import DIMENSIONS, format_summary
+from changes import load_changes_since
+from store import get_store
+from dataset import DatasetCache, make_etag, parse_range, iter_file
+from jobs import JobManager, JobConflict
+from retrieval import ChatRetriever
+import metrics
 import os
+import json
+import asyncio
+import base64
 import openai
-import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 from pydantic import BaseModel
-
-app = FastAPI(title="BrightMLS Minimal API", version="1.0.0")
+from typing import Optional
+from contextlib import asynccontextmanager
 
 # Load environment variables
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 CSV_FILE = "brightmls_data.csv"
+PARQUET_FILE = "brightmls_data.parquet"
+LISTINGS_MAX_LIMIT = 1000
+
+# Seconds between progress events on /jobs/{id}?stream=true
+JOB_STREAM_INTERVAL = 1.0
+
+# Background scrape jobs; at most one runs at a time
+scrape_jobs = JobManager(run_brightmls_scraper, max_pages=200)
+
+# Parsed CSV for /chat, reloaded only when the export changes
+dataset_cache = DatasetCache(CSV_FILE)
+
+def get_openai_client():
+    return openai.OpenAI(api_key=OPENAI_API_KEY)
+
+# Token-budgeted context and per-dataset-version answer cache for /chat
+chat_retriever = ChatRetriever(lambda: get_openai_client())
+
+def resolve_browser_driver():
+    """Resolve chromedriver once at startup so scrape runs don't pay for it."""
+    if not PERSISTENT_BROWSER:
+        return
+    from driver_manager import get_driver_manager
+    try:
+        get_driver_manager().resolve()
+    except Exception as e:
+        print(f"⚠️ Could not resolve chromedriver at startup: {e}")
+
+def close_browser():
+    if not PERSISTENT_BROWSER:
+        return
+    from driver_manager import get_driver_manager
+    get_driver_manager().shutdown()
+
+def start_scheduler():
+    """Start running the saved searches on their intervals when BRIGHTMLS_SCHEDULER=1."""
+    from scheduler import SCHEDULER_ENABLED, get_scheduler
+    if SCHEDULER_ENABLED:
+        get_scheduler()
+
+def stop_scheduler():
+    from scheduler import shutdown_scheduler
+    shutdown_scheduler()
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm up the browser driver and the saved search scheduler; close both on shutdown."""
+    await asyncio.to_thread(resolve_browser_driver)
+    await asyncio.to_thread(start_scheduler)
+    yield
+    await asyncio.to_thread(close_browser)
+    await asyncio.to_thread(stop_scheduler)
+
+app = FastAPI(title="BrightMLS Minimal API", version="1.0.0", lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     message: str
@@ -21,95 +85,260 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     response: str
-    csv_sample: str = None
+    csv_sample: Optional[str] = None
     row_count: int
+    context_rows: Optional[int] = None
+    matching_rows: Optional[int] = None
+    cached: bool = False
+
+@app.post("/scrape", status_code=202)
+async def start_scrape(mode: Optional[str] = Query(None, pattern="^(full|delta|auto)$"),
+                       shard_by: Optional[str] = Query(None, pattern="^(county|price)$")):
+    """Start the BrightMLS scraper in the background and return its job id.
 
-@app.post("/scrape")
-async def start_scrape():
-    """Run the BrightMLS scraper and save CSV."""
+    mode picks a full sweep, a delta refresh of the newest pages, or auto (delta unless a full sweep is due).
+    shard_by splits a full sweep into county or price band searches.
+    """
     try:
-        print("🚀 Starting BrightMLS scraper...")
-        result = run_brightmls_scraper()
-        
-        if result['success']:
-            print(f"✅ Scraper completed successfully: {result['message']}")
-            return {
-                "status": "success",
-                "message": result['message'],
-                "row_count": result['row_count'],
-                "new_data": result['new_data'],
-                "timestamp": result['timestamp']
-            }
-        else:
-            print(f"❌ Scraper failed: {result['message']}")
-            return {
-                "status": "error",
-                "message": result['message'],
-                "row_count": result['row_count'],
-                "new_data": result['new_data'],
-                "timestamp": result['timestamp']
-            }
-    except KeyboardInterrupt:
-        print("🛑 Scraper interrupted by user")
-        return {
-            "status": "interrupted",
-            "message": "Scraper was interrupted by user",
-            "row_count": 0,
-            "new_data": False,
-            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-    except Exception as e:
-        print(f"❌ Fatal scraper error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Scraper error: {str(e)}")
+        job = scrape_jobs.start(mode=mode, shard_by=shard_by)
+    except JobConflict as e:
+        raise HTTPException(status_code=409, detail={"message": "A scrape is already running", "job_id": e.job.id})
+    print(f"🚀 Started BrightMLS scrape job {job.id}")
+    return {
+        "status": "started",
+        "job_id": job.id,
+        "progress_url": f"/jobs/{job.id}",
+        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Scrape stage timings, page latencies and counters in the Prometheus text format."""
+    return Response(content=metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/jobs")
+async def list_jobs():
+    """List recent scrape jobs with their progress."""
+    return {"jobs": scrape_jobs.list()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request, stream: bool = False):
+    """Return a job's progress; with ?stream=true (or Accept: text/event-stream) stream it as server-sent events."""
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not stream and "text/event-stream" not in request.headers.get("accept", ""):
+        return job.snapshot()
+
+    async def events():
+        while True:
+            snapshot = job.snapshot()
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if job.done or await request.is_disconnected():
+                break
+            await asyncio.to_thread(job.wait_for_update, JOB_STREAM_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @app.post("/stop")
 async def stop_scraper():
-    """Stop the running scraper process."""
-    try:
-        # This is a placeholder - in a real implementation you'd need to track the scraper process
-        # For now, we'll just return a message indicating the endpoint exists
+    """Cancel the running scrape job; it stops cleanly after the page it is on."""
+    job = scrape_jobs.active()
+    if job is None:
         return {
-            "status": "stopped",
-            "message": "Scraper stop requested. Note: This endpoint is a placeholder - implement process tracking for full functionality.",
+            "status": "idle",
+            "message": "No scrape is running.",
             "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error stopping scraper: {str(e)}")
+    job.cancel()
+    return {
+        "status": "stopping",
+        "job_id": job.id,
+        "message": "Stop requested. The scraper will stop after the current page.",
+        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+@app.get("/csv")
+async def download_csv(request: Request):
+    """Stream the current listings CSV (latest row per MLS #) with ETag and Range support."""
+    store = await asyncio.to_thread(get_store)
+    if await asyncio.to_thread(store.count) == 0:
+        raise HTTPException(status_code=404, detail="No listings stored. Please run the scraper first.")
+    await asyncio.to_thread(export_csv_for_readers)
+    # Hold the file open so a concurrent re-export (atomic rename) cannot change it mid-stream
+    f = open(CSV_FILE, 'rb')
+    st = os.fstat(f.fileno())
+    size = st.st_size
+    etag = make_etag((st.st_mtime_ns, size))
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{CSV_FILE}"',
+    }
+    if request.headers.get("if-none-match") == etag:
+        f.close()
+        return Response(status_code=304, headers=headers)
+    range_header = request.headers.get("range")
+    # Ranges in units other than bytes are ignored and answered with the whole file (RFC 9110)
+    if range_header and range_header.startswith("bytes="):
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            f.close()
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(iter_file(f, start, end - start + 1), status_code=206,
+                                 media_type="text/csv", headers=headers)
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(iter_file(f, 0, size), media_type="text/csv", headers=headers)
+
+@app.get("/parquet")
+async def download_parquet():
+    """Download the current listings as Parquet with typed, dictionary-encoded columns."""
+    store = await asyncio.to_thread(get_store)
+    if await asyncio.to_thread(store.count) == 0:
+        raise HTTPException(status_code=404, detail="No listings stored. Please run the scraper first.")
+    if not os.path.exists(PARQUET_FILE) or os.path.getmtime(PARQUET_FILE) < store.last_modified():
+        await asyncio.to_thread(store.export_parquet, PARQUET_FILE)
+    return FileResponse(PARQUET_FILE, media_type="application/vnd.apache.parquet", filename=PARQUET_FILE)
+
+@app.get("/listings")
+async def get_listings(city: str = None, county: str = None, status: str = None,
+                       min_price: int = None, max_price: int = None, beds: int = None,
+                       cursor: str = None, limit: int = Query(100, ge=1, le=LISTINGS_MAX_LIMIT)):
+    """Return listings matching the filters, one page at a time; pass `next_cursor` back to continue."""
+    after = None
+    if cursor:
+        try:
+            after = base64.urlsafe_b64decode(cursor.encode()).decode()
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    store = await asyncio.to_thread(get_store)
+    rows = await asyncio.to_thread(store.query, city=city, county=county, status=status, min_price=min_price,
+                                   max_price=max_price, beds=beds, after=after, limit=limit)
+    next_cursor = None
+    if len(rows) == limit:
+        next_cursor = base64.urlsafe_b64encode(rows[-1]['MLS #'].encode()).decode()
+    return {
+        "count": len(rows),
+        "listings": rows,
+        "next_cursor": next_cursor,
+    }
+
+@app.get("/stats")
+async def get_stats(dimension: str = None, top: int = Query(None, ge=1)):
+    """Return market rollups (listings, average price, price drops and increases) kept up to date as pages are saved."""
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension. Use one of: {', '.join(DIMENSIONS)}")
+    store = await asyncio.to_thread(get_store)
+    stats = await asyncio.to_thread(store.stats, dimension, top)
+    totals = stats.pop('all', [None])[0]
+    return {
+        "totals": totals,
+        "by": stats,
+    }
+
+def parse_since(since):
+    """Parse the `since` query parameter; an offset (e.g. Z or +02:00) is converted to local time."""
+    try:
+        return datetime.fromisoformat(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'since' timestamp. Use e.g. 2025-07-01 11:27:28, 2025-07-01T11:27:28 or 2025-07-01T11:27:28Z")
+
+@app.get("/changes")
+async def get_changes(since: str, limit: int = None):
+    """Return listing changes (added, changed, removed) recorded after `since`."""
+    since_dt = parse_since(since)
+    changes = await asyncio.to_thread(load_changes_since, since_dt, limit)
+    return {
+        "since": since,
+        "count": len(changes),
+        "changes": changes,
+    }
+
+def get_saved_search(name):
+    from scheduler import get_scheduler
+    scheduler = get_scheduler()
+    search = scheduler.searches.get(name)
+    if search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return scheduler, search
+
+@app.get("/searches")
+async def list_searches():
+    """List the saved searches with their schedule, run in progress and last run, and the run queue."""
+    from scheduler import get_scheduler
+    return get_scheduler().snapshot()
+
+@app.post("/searches/{name}/run", status_code=202)
+async def run_search(name: str):
+    """Queue a run of a saved search; a request while it is already queued or running joins that run."""
+    scheduler, search = get_saved_search(name)
+    run, merged = scheduler.request(name)
+    return {
+        "status": "merged" if merged else "queued",
+        **run.snapshot(),
+    }
+
+@app.get("/searches/{name}/changes")
+async def get_search_changes(name: str, since: str, limit: int = None):
+    """Return the saved search's listing changes recorded after `since`."""
+    _, search = get_saved_search(name)
+    since_dt = parse_since(since)
+    changes = await asyncio.to_thread(load_changes_since, since_dt, limit, path=search.changes_file)
+    return {
+        "search": name,
+        "since": since,
+        "count": len(changes),
+        "changes": changes,
+    }
+
+@app.get("/searches/{name}/stats")
+async def get_search_stats(name: str, dimension: str = None, top: int = Query(None, ge=1)):
+    """Return the market rollups of the saved search's own listings."""
+    _, search = get_saved_search(name)
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown dimension. Use one of: {', '.join(DIMENSIONS)}")
+    stats = await asyncio.to_thread(lambda: search.store.stats(dimension, top))
+    totals = stats.pop('all', [None])[0]
+    return {
+        "search": name,
+        "totals": totals,
+        "by": stats,
+    }
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_csv(request: ChatRequest):
     """Chat with CSV data using OpenAI."""
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-    if not os.path.exists(CSV_FILE):
+    store = await asyncio.to_thread(get_store)
+    if await asyncio.to_thread(store.count) == 0:
         raise HTTPException(status_code=404, detail="CSV file not found. Please run the scraper first.")
     try:
-        df = pd.read_csv(CSV_FILE)
+        await asyncio.to_thread(export_csv_for_readers)
+        df = await asyncio.to_thread(dataset_cache.get)
+        version = dataset_cache.version()
         csv_sample = None
+        context_info = {}
         if request.include_csv_sample:
             sample_df = df.head(request.max_rows)
             csv_sample = sample_df.to_csv(index=False)
             csv_data = f"Sample data (first {request.max_rows} rows):\n{csv_sample}\n\nTotal rows in dataset: {len(df)}"
         else:
-            csv_data = df.to_csv(index=False)
-        prompt = f"""
-You are a helpful assistant that analyzes real estate data from BrightMLS.\n\nUser Question: {request.message}\n\nHere is the CSV data to analyze:\n{csv_data}\n\nPlease provide a detailed, helpful response based on the data above. If the question cannot be answered from the available data, please say so explicitly and suggest what additional information might be needed.\n\nFormat your response in a clear, professional manner with proper formatting where appropriate.
-"""
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a real estate data analyst assistant. Provide clear, accurate analysis based on the provided CSV data."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.3
-        )
-        ai_response = response.choices[0].message.content
+            # Only the rows and summaries relevant to the question, within the token budget
+            market_summary = format_summary(await asyncio.to_thread(store.stats))
+            csv_data, context_info = await asyncio.to_thread(chat_retriever.build_context, df, version,
+                                                             request.message, market_summary=market_summary)
+        ai_response, cached = await asyncio.to_thread(chat_retriever.answer, request.message, csv_data, version)
         return ChatResponse(
             response=ai_response,
             csv_sample=csv_sample,
-            row_count=len(df)
+            row_count=len(df),
+            context_rows=context_info.get('context_rows'),
+            matching_rows=context_info.get('matching_rows'),
+            cached=cached
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from changes import write_json_atomic
+
+# Folder for the JSON report written for every scrape job
+RUN_REPORT_DIR = os.getenv("BRIGHTMLS_RUN_REPORT_DIR", "run_reports")
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# name -> (type, help) for the Prometheus exposition
+METRICS = {
+    'brightmls_stage_seconds': ('histogram', 'Time spent per scrape stage.'),
+    'brightmls_page_seconds': ('histogram', 'Time per result page: navigation, extraction and saving.'),
+    'brightmls_wait_seconds': ('histogram', 'Time spent waiting on page readiness, per step.'),
+    'brightmls_pages_scraped_total': ('counter', 'Result pages scraped and saved.'),
+    'brightmls_rows_scraped_total': ('counter', 'Rows scraped from result pages.'),
+    'brightmls_stale_element_retries_total': ('counter', 'Table reads retried after a stale element.'),
+    'brightmls_failed_pages_total': ('counter', 'Result pages that could not be scraped.'),
+    'brightmls_save_errors_total': ('counter', 'Pages that failed to save to the store.'),
+    'brightmls_runs_total': ('counter', 'Finished scrape runs by outcome.'),
+    'brightmls_bytes_transferred_total': ('counter', 'Bytes the browser received, by browser profile.'),
+    'brightmls_requests_blocked_total': ('counter', 'Browser requests blocked by the lite profile.'),
+    'brightmls_search_runs_total': ('counter', 'Finished saved search runs by search and outcome.'),
+    'brightmls_search_queue_seconds': ('histogram', 'Time saved search runs waited for a browser session.'),
+}
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape_label(value):
+    """Escape a label value per the text exposition format: backslash, double quote and newline."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count, as Prometheus histograms keep them."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RunReport:
+    """Spans, counters and page latencies of one scrape run."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.peaks = {}
+        self.pages = []
+
+    def add_span(self, stage, seconds):
+        entry = self.stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max': 0.0})
+        entry['count'] += 1
+        entry['seconds'] += seconds
+        entry['max'] = max(entry['max'], seconds)
+
+    def summary(self):
+        latencies = sorted(page['seconds'] for page in self.pages)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            'seconds': round(time.time() - self.started, 2),
+            'stages': {stage: {'count': e['count'], 'seconds': round(e['seconds'], 3), 'max': round(e['max'], 3)}
+                       for stage, e in self.stages.items()},
+            'counters': dict(self.counters),
+            'peaks': dict(self.peaks),
+            'page_seconds': {
+                'count': len(latencies),
+                'mean': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': round(latencies[-1], 3) if latencies else None,
+            },
+            'pages': self.pages,
+        }
+
+
+class Registry:
+    """Process-wide counters and histograms, plus the report of the run in progress.
+
+    A thread inside run_report() records into a report of its own instead, so saved search
+    runs do not mix with the scrape job's report.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.run = None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def _report(self):
+        return getattr(self.local, 'run', self.run)
+
+    def inc(self, name, amount=1, **labels):
+        with self.lock:
+            key = (name, _labels(labels))
+            self.counters[key] = self.counters.get(key, 0) + amount
+            report = self._report()
+            if report is not None:
+                report.counters[name] = report.counters.get(name, 0) + amount
+
+    def observe(self, name, value, **labels):
+        with self.lock:
+            key = (name, _labels(labels))
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage):
+        """Time a block as one occurrence of stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe('brightmls_stage_seconds', elapsed, stage=stage)
+            with self.lock:
+                report = self._report()
+                if report is not None:
+                    report.add_span(stage, elapsed)
+
+    def page(self, page_num, seconds, rows, engine):
+        """Record one scraped page: latency histogram, page and row counters, per-page report entry."""
+        self.observe('brightmls_page_seconds', seconds, engine=engine)
+        self.inc('brightmls_pages_scraped_total', engine=engine)
+        self.inc('brightmls_rows_scraped_total', rows, engine=engine)
+        with self.lock:
+            report = self._report()
+            if report is not None:
+                report.pages.append({'page': page_num, 'seconds': round(seconds, 3), 'rows': rows, 'engine': engine})
+
+    def peak(self, name, value):
+        """Keep the highest value of name seen during the run (e.g. browser memory)."""
+        with self.lock:
+            report = self._report()
+            if report is not None and value > report.peaks.get(name, float('-inf')):
+                report.peaks[name] = value
+
+    def start_run(self):
+        with self.lock:
+            self.run = RunReport()
+
+    def finish_run(self):
+        with self.lock:
+            run, self.run = self.run, None
+        return run.summary() if run is not None else None
+
+    @contextmanager
+    def run_report(self):
+        """Record this thread's spans, counters, pages and peaks into a new report, yielded."""
+        report = RunReport()
+        self.local.run = report
+        try:
+            yield report
+        finally:
+            del self.local.run
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            lines = []
+            for name, (kind, help_text) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'counter':
+                    for (metric, labels), value in counters:
+                        if metric == name:
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                for (metric, labels), histogram in histograms:
+                    if metric != name:
+                        continue
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+span = registry.span
+page = registry.page
+peak = registry.peak
+start_run = registry.start_run
+finish_run = registry.finish_run
+run_report = registry.run_report
+
+
+def write_run_report(job_id, report, report_dir=RUN_REPORT_DIR):
+    """Write a job's run report to report_dir/<job_id>.json and return the path."""
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"{job_id}.json")
+    write_json_atomic(path, report)
+    return path
@@ -0,0 +1,99 @@
+from lxml import html as lxml_html
+
+# Class tokens Matrix puts on the results grid header
+HEADER_THEAD_XPATH = ".//thead[contains(concat(' ', normalize-space(@class), ' '), ' mtx-sticky-top ')]"
+RESULTS_TABLE_XPATH = "//table[thead[contains(concat(' ', normalize-space(@class), ' '), ' mtx-sticky-top ')]]"
+HEADER_ROW_XPATH = ".//tr[contains(concat(' ', normalize-space(@class), ' '), ' singleLineTableHeader ')]"
+
+PRICE_CHANGE_HEADERS = ['PriceChangeType', 'PriceChangeTitle']
+
+
+def _text(element):
+    """Return the element text the way BeautifulSoup's get_text(strip=True) does."""
+    return ''.join(part.strip() for part in element.itertext())
+
+
+def _price_change(cell):
+    """Return (type, title) for a pricedown/priceup icon in the cell, or (None, None)."""
+    img = cell.find('.//img')
+    if img is None:
+        return None, None
+    src = img.get('src')
+    if not src:
+        return None, None
+    title = img.get('title') or img.get('data-original-title') or ''
+    if 'pricedown' in src:
+        return 'down', title or 'Price Decrease'
+    if 'priceup' in src:
+        return 'up', title or 'Price Increase'
+    return None, None
+
+
+def parse_headers(root):
+    """Extract the column headers from the sticky results table header."""
+    thead = root.xpath(HEADER_THEAD_XPATH)
+    header_row = thead[0].xpath(HEADER_ROW_XPATH) if thead else []
+    headers = []
+    if header_row:
+        for th in header_row[0].iter('th'):
+            span = th.find('.//span')
+            headers.append(_text(span) if span is not None else _text(th))
+    return headers
+
+
+def parse_rows(root):
+    """Extract the cell text of every body row, with price change info appended."""
+    rows = []
+    for tr in root.xpath('.//tbody//tr'):
+        cells = tr.xpath('.//td | .//th')
+        if not cells:
+            continue
+        row_data = []
+        price_change_type = None
+        price_change_title = None
+        for cell in cells:
+            change_type, change_title = _price_change(cell)
+            if change_type:
+                price_change_type, price_change_title = change_type, change_title
+            row_data.append(_text(cell))
+        row_data.append(price_change_type or '')
+        row_data.append(price_change_title or '')
+        if any(cell.strip() for cell in row_data):
+            rows.append(row_data)
+    return rows
+
+
+def rows_to_dicts(rows, headers):
+    """Map row values onto headers, naming any overflow cells Column_N."""
+    data = []
+    for row in rows:
+        row_dict = {}
+        for i, value in enumerate(row):
+            if i < len(headers):
+                row_dict[headers[i]] = value
+            else:
+                row_dict[f'Column_{i}'] = value
+        data.append(row_dict)
+    return data
+
+
+def _parse_table(table):
+    headers = parse_headers(table)
+    rows = parse_rows(table)
+    if headers:
+        headers = headers + PRICE_CHANGE_HEADERS
+    return rows_to_dicts(rows, headers), headers
+
+
+def parse_results_table(table_html):
+    """Parse a results table's outerHTML in one pass and return (data, headers)."""
+    return _parse_table(lxml_html.fromstring(table_html))
+
+
+def parse_results_page(page_html):
+    """Locate the results grid in a full Matrix page and parse it like parse_results_table."""
+    root = lxml_html.fromstring(page_html)
+    tables = root.xpath(RESULTS_TABLE_XPATH)
+    if not tables:
+        return [], []
+    return _parse_table(tables[0])
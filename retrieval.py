@@ -0,0 +1,301 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from schema import parse_price
+
+# Approximate prompt budget for the dataset context sent to the model
+CHAT_TOKEN_BUDGET = int(os.getenv("CHAT_TOKEN_BUDGET", "6000"))
+ANSWER_CACHE_SIZE = 256
+GROUP_BY_FIELDS = ['City', 'County', 'Status', 'Structure Type']
+GROUP_BY_TOP = 15
+# Columns sent for raw rows (the checkbox column and scrape bookkeeping are dropped)
+CONTEXT_COLUMNS = ['MLS #', 'Status', 'Address', 'City', 'County', 'Beds', 'Baths', 'Structure Type',
+                   'Date', 'List Office Name', 'Price', 'PriceChangeType']
+
+SYSTEM_PROMPT = "You are a real estate data analyst assistant. Provide clear, accurate analysis based on the provided CSV data."
+PROMPT_TEMPLATE = """
+You are a helpful assistant that analyzes real estate data from BrightMLS.\n\nUser Question: {question}\n\nHere is the CSV data to analyze:\n{context}\n\nPlease provide a detailed, helpful response based on the data above. If the question cannot be answered from the available data, please say so explicitly and suggest what additional information might be needed.\n\nFormat your response in a clear, professional manner with proper formatting where appropriate.
+"""
+
+STATUS_WORDS = {
+    'active under contract': 'A/C',
+    'under contract': 'A/C',
+    'coming soon': 'C/S',
+    'temporarily off market': 'T/O',
+    'active': 'ACT',
+    'closed': 'CLS',
+    'sold': 'CLS',
+    'pending': 'PND',
+    'withdrawn': 'WTH',
+    'cancelled': 'CNL',
+    'canceled': 'CNL',
+    'expired': 'EXP',
+}
+AGGREGATE_RE = re.compile(
+    r"\b(average|avg|mean|median|how many|count|number of|total|sum|distribution|breakdown|"
+    r"by city|by county|by status|per city|per county|most|least|compare|trend|statistics|stats|"
+    r"percent|percentage|share|range)\b", re.IGNORECASE)
+# A bare number below this (no "$" and no k/m unit) is a count, not a price: "under 4", "over 2"
+MIN_BARE_PRICE = 1000
+ROOM_WORDS = r"(?:-\s*)?(?:bed|beds|bedroom|bedrooms|br|bd|bath|baths|bathroom|bathrooms|ba)\b"
+# A number followed by a bedroom or bathroom word is never read as an amount
+AMOUNT = r"(\$?)\s*(\d[\d,]*(?:\.\d+)?)\s*(k|m|mm|million|thousand)?\b(?!\s*\+?\s*" + ROOM_WORDS + ")"
+BETWEEN_RE = re.compile(r"between\s+" + AMOUNT + r"\s+and\s+" + AMOUNT, re.IGNORECASE)
+MAX_PRICE_RE = re.compile(r"(?:under|below|less than|cheaper than|at most|max(?:imum)?|up to)\s+" + AMOUNT, re.IGNORECASE)
+MIN_PRICE_RE = re.compile(r"(?:over|above|more than|at least|min(?:imum)?)\s+" + AMOUNT, re.IGNORECASE)
+BED_WORDS = r"\s*(?:-\s*)?(?:bed|beds|bedroom|bedrooms|br|bd)\b"
+BEDS_RE = re.compile(r"(\d+)\s*\+?" + BED_WORDS, re.IGNORECASE)
+# "up to 3 bedrooms" caps the bedrooms; "under 4 beds" caps them below 4
+MAX_BEDS_RE = re.compile(r"\b(up to|at most|no more than|max(?:imum)?(?: of)?|under|below|less than|fewer than)\s+"
+                         r"(\d+)" + BED_WORDS, re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English and CSV)."""
+    return len(text) // 4 + 1
+
+
+def _amount(dollar, number, unit):
+    """Dollars of a matched AMOUNT, or None for a bare number too small to be a price."""
+    value = float(number.replace(',', ''))
+    unit = (unit or '').lower()
+    if unit in ('k', 'thousand'):
+        value *= 1_000
+    elif unit in ('m', 'mm', 'million'):
+        value *= 1_000_000
+    if not dollar and not unit and value < MIN_BARE_PRICE:
+        return None
+    return int(value)
+
+
+def _first_amount(regex, question):
+    for match in regex.finditer(question):
+        value = _amount(*match.groups())
+        if value is not None:
+            return value
+    return None
+
+
+class DatasetIndex:
+    """Per-dataset lookup of row positions by city, county and status, plus a sorted price column."""
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.prices = np.full(len(self.df), np.nan)
+        if 'Price' in self.df:
+            parsed = [parse_price(p) if isinstance(p, str) else None for p in self.df['Price']]
+            self.prices = np.array([np.nan if p is None else p for p in parsed], dtype='float64')
+        self.beds = np.full(len(self.df), np.nan)
+        if 'Beds' in self.df:
+            self.beds = pd.to_numeric(self.df['Beds'], errors='coerce').to_numpy(dtype='float64')
+        self.price_order = np.argsort(self.prices, kind='stable')
+        self.values = {}
+        for field in ('City', 'County', 'Status'):
+            positions = {}
+            if field in self.df:
+                for value, rows in self.df.groupby(field, sort=False).indices.items():
+                    positions[str(value)] = rows
+            self.values[field] = positions
+
+    def positions(self, field, values):
+        rows = [self.values[field][v] for v in values if v in self.values[field]]
+        return np.unique(np.concatenate(rows)) if rows else np.array([], dtype=int)
+
+    def price_range(self, min_price=None, max_price=None):
+        """Row positions with a price inside [min_price, max_price], via the sorted price column."""
+        sorted_prices = self.prices[self.price_order]
+        lo = 0 if min_price is None else np.searchsorted(sorted_prices, min_price, side='left')
+        hi = np.searchsorted(sorted_prices, np.inf, side='left') if max_price is None else \
+            np.searchsorted(sorted_prices, max_price, side='right')
+        return np.sort(self.price_order[lo:hi])
+
+    def extract_filters(self, question):
+        """Read city, county, status, price and bedroom constraints from a question."""
+        text = question.lower()
+        filters = {}
+        counties = []
+        for county in self.values['County']:
+            name = county.split(',')[0].strip().lower()
+            if re.search(rf"\b{re.escape(name)}\s+county\b", text):
+                counties.append(county)
+        cities = [city for city in self.values['City']
+                  if re.search(rf"\b{re.escape(city.lower())}\b(?!\s+county)", text)]
+        if not cities and not counties:
+            counties = [county for county in self.values['County']
+                        if re.search(rf"\b{re.escape(county.split(',')[0].strip().lower())}\b", text)]
+        if cities:
+            filters['City'] = cities
+        if counties:
+            filters['County'] = counties
+        statuses = []
+        remaining = text
+        for words, code in STATUS_WORDS.items():
+            if re.search(rf"\b{words}\b", remaining) and code in self.values['Status']:
+                statuses.append(code)
+                remaining = re.sub(rf"\b{words}\b", " ", remaining)
+        if statuses:
+            filters['Status'] = sorted(set(statuses))
+        low = high = None
+        match = BETWEEN_RE.search(question)
+        if match:
+            dollar, number, unit, high_dollar, high_number, high_unit = match.groups()
+            # "between 300 and 500k": the low end takes the high end's unit
+            low = _amount(dollar or high_dollar, number, unit or high_unit)
+            high = _amount(high_dollar, high_number, high_unit)
+        if low is not None and high is not None:
+            filters['min_price'], filters['max_price'] = low, high
+        else:
+            max_price = _first_amount(MAX_PRICE_RE, question)
+            if max_price is not None:
+                filters['max_price'] = max_price
+            min_price = _first_amount(MIN_PRICE_RE, question)
+            if min_price is not None:
+                filters['min_price'] = min_price
+        match = MAX_BEDS_RE.search(question)
+        if match:
+            below = match.group(1).lower() in ('under', 'below', 'less than', 'fewer than')
+            filters['max_beds'] = int(match.group(2)) - (1 if below else 0)
+        else:
+            match = BEDS_RE.search(question)
+            if match:
+                filters['min_beds'] = int(match.group(1))
+        return filters
+
+    def select(self, filters):
+        """Return the DataFrame rows matching the filters."""
+        selected = np.arange(len(self.df))
+        for field in ('City', 'County', 'Status'):
+            if field in filters:
+                selected = np.intersect1d(selected, self.positions(field, filters[field]), assume_unique=True)
+        if 'min_price' in filters or 'max_price' in filters:
+            selected = np.intersect1d(selected, self.price_range(filters.get('min_price'), filters.get('max_price')))
+        if 'min_beds' in filters:
+            selected = selected[self.beds[selected] >= filters['min_beds']]
+        if 'max_beds' in filters:
+            selected = selected[self.beds[selected] <= filters['max_beds']]
+        return self.df.iloc[selected], self.prices[selected]
+
+
+def summarize(rows, prices):
+    """Compact aggregate tables (counts, price stats, group-bys) for the selected rows."""
+    parts = [f"Matching listings: {len(rows)}"]
+    valid = prices[~np.isnan(prices)]
+    if len(valid):
+        parts.append(f"Price: mean ${valid.mean():,.0f}, median ${np.median(valid):,.0f}, "
+                     f"min ${valid.min():,.0f}, max ${valid.max():,.0f} ({len(valid)} priced)")
+    if 'PriceChangeType' in rows:
+        changes = rows['PriceChangeType'].value_counts()
+        parts.append(f"Price drops: {int(changes.get('down', 0))}, price increases: {int(changes.get('up', 0))}")
+    frame = rows.assign(_price=prices)
+    for field in GROUP_BY_FIELDS:
+        if field not in frame or frame.empty:
+            continue
+        grouped = frame.groupby(field)['_price'].agg(['count', 'mean', 'median']).sort_values('count', ascending=False)
+        lines = [f"{field},count,mean_price,median_price"]
+        for value, stats in grouped.head(GROUP_BY_TOP).iterrows():
+            mean = '' if np.isnan(stats['mean']) else f"{stats['mean']:.0f}"
+            median = '' if np.isnan(stats['median']) else f"{stats['median']:.0f}"
+            lines.append(f"\"{value}\",{int(stats['count'])},{mean},{median}")
+        parts.append(f"By {field}:\n" + "\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def pack_rows(rows, budget):
+    """CSV of as many rows as fit in the token budget; returns (text, rows included)."""
+    columns = [c for c in CONTEXT_COLUMNS if c in rows]
+    header = ",".join(columns)
+    lines = [header]
+    used = estimate_tokens(header)
+    for line in rows[columns].to_csv(index=False, header=False).splitlines():
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines), len(lines) - 1
+
+
+class ChatRetriever:
+    """Build a token-budgeted context for a question and answer it, caching answers per dataset version."""
+
+    def __init__(self, client_factory, model="gpt-4", token_budget=CHAT_TOKEN_BUDGET, cache_size=ANSWER_CACHE_SIZE):
+        self.client_factory = client_factory
+        self.model = model
+        self.token_budget = token_budget
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self._index = None
+        self._index_version = None
+
+    def index(self, df, version):
+        with self.lock:
+            if self._index is None or version != self._index_version:
+                self._index = DatasetIndex(df)
+                self._index_version = version
+            return self._index
+
+    def build_context(self, df, version, question, market_summary=None):
+        """Return (context text, info) for the question: summaries for aggregate questions, then packed rows.
+
+        market_summary is the store's precomputed rollups (aggregates.format_summary); it
+        answers aggregate questions about the whole market without grouping the rows here.
+        """
+        index = self.index(df, version)
+        filters = index.extract_filters(question)
+        rows, prices = index.select(filters)
+        aggregate = bool(AGGREGATE_RE.search(question))
+        parts = []
+        budget = self.token_budget
+        if filters:
+            parts.append(f"Filters applied from the question: {filters}")
+        if aggregate and not filters and market_summary:
+            parts.append("Market summary precomputed over all listings:\n" + market_summary)
+        elif aggregate:
+            summary = summarize(rows, prices)
+            parts.append("Summary statistics computed over all matching rows:\n" + summary)
+        budget -= sum(estimate_tokens(p) for p in parts)
+        packed, included = pack_rows(rows, max(0, budget))
+        if included:
+            parts.append(f"Listing rows ({included} of {len(rows)} matching rows):\n{packed}")
+        parts.append(f"Total rows in dataset: {len(index.df)}")
+        info = {'filters': filters, 'aggregate': aggregate, 'matching_rows': len(rows), 'context_rows': included}
+        return "\n\n".join(parts), info
+
+    def _cache_get(self, key):
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        return None
+
+    def _cache_put(self, key, value):
+        with self.lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def answer(self, question, context, version):
+        """Ask the model; identical questions on the same dataset version are served from the cache."""
+        key = (version, self.model, ' '.join(question.lower().split()), context)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached, True
+        client = self.client_factory()
+        response = client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": PROMPT_TEMPLATE.format(question=question, context=context)}
+            ],
+            max_tokens=2000,
+            temperature=0.3
+        )
+        text = response.choices[0].message.content
+        self._cache_put(key, text)
+        return text, False
@@ -0,0 +1,347 @@
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import brightmls
+import metrics
+from changes import ChangeTracker
+from driver_manager import get_driver_manager
+from session_pool import SessionFactory
+from store import ListingStore
+
+# JSON list of saved searches: name, criteria, interval_minutes, priority, max_pages, enabled
+SEARCHES_FILE = os.getenv("BRIGHTMLS_SEARCHES_FILE", "searches.json")
+# Each saved search keeps its store and change history in SEARCHES_DIR/<name>/
+SEARCHES_DIR = os.getenv("BRIGHTMLS_SEARCHES_DIR", "searches")
+# Browser sessions shared by all saved searches
+SCHEDULER_WORKERS = int(os.getenv("BRIGHTMLS_SCHEDULER_WORKERS", "2"))
+# Run saved searches on their intervals from the API's startup (manual runs work either way)
+SCHEDULER_ENABLED = os.getenv("BRIGHTMLS_SCHEDULER", "0") == "1"
+# After the Nth failure in a row a search waits BACKOFF_MINUTES * 2**(N-1), capped at BACKOFF_MAX_MINUTES
+BACKOFF_MINUTES = float(os.getenv("BRIGHTMLS_SCHEDULER_BACKOFF_MINUTES", "5"))
+BACKOFF_MAX_MINUTES = float(os.getenv("BRIGHTMLS_SCHEDULER_BACKOFF_MAX_MINUTES", "240"))
+# Seconds between checks for searches that are due
+SCHEDULER_TICK = 1.0
+NAME_RE = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+class SavedSearch:
+    """A saved search definition with its own store, change history and schedule state."""
+
+    def __init__(self, name, criteria=None, interval_minutes=60, priority=0, max_pages=brightmls.MAX_PAGES,
+                 enabled=True, data_dir=SEARCHES_DIR):
+        if not NAME_RE.match(name or ''):
+            raise ValueError(f"Invalid search name {name!r}: use lowercase letters, digits, '-' and '_'")
+        self.name = name
+        self.criteria = criteria or {}
+        self.interval_minutes = interval_minutes
+        self.priority = priority
+        self.max_pages = max_pages
+        self.enabled = enabled
+        self.dir = os.path.join(data_dir, name)
+        self.index_file = os.path.join(self.dir, "listing_index.json")
+        self.changes_file = os.path.join(self.dir, "listing_changes.jsonl")
+        self.next_due = 0.0
+        self.failures = 0
+        self.runs = 0
+        self.run = None
+        self.last_run = None
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            os.makedirs(self.dir, exist_ok=True)
+            self._store = ListingStore(os.path.join(self.dir, "listings.db"))
+        return self._store
+
+    def tracker(self):
+        os.makedirs(self.dir, exist_ok=True)
+        return ChangeTracker(self.index_file, self.changes_file)
+
+    def backoff_seconds(self):
+        return min(BACKOFF_MAX_MINUTES, BACKOFF_MINUTES * 2 ** (self.failures - 1)) * 60
+
+    def snapshot(self):
+        return {
+            'name': self.name,
+            'criteria': self.criteria,
+            'interval_minutes': self.interval_minutes,
+            'priority': self.priority,
+            'enabled': self.enabled,
+            'runs': self.runs,
+            'failures': self.failures,
+            'next_due': datetime.fromtimestamp(self.next_due).strftime('%Y-%m-%d %H:%M:%S') if self.next_due else None,
+            'run': self.run.snapshot() if self.run is not None and not self.run.done.is_set() else None,
+            'last_run': self.last_run,
+        }
+
+
+def load_searches(path=SEARCHES_FILE, data_dir=SEARCHES_DIR):
+    """Read the saved search definitions; no file means no saved searches."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            definitions = json.load(f)
+    except FileNotFoundError:
+        return []
+    searches = [SavedSearch(data_dir=data_dir, **definition) for definition in definitions]
+    names = [search.name for search in searches]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate search names in {path}")
+    return searches
+
+
+class SearchRun:
+    """One run of a saved search; requests made while it is queued or running share it."""
+
+    def __init__(self, search, reason):
+        self.id = uuid.uuid4().hex[:12]
+        self.search = search
+        self.reason = reason
+        self.requests = 1
+        self.status = 'queued'
+        self.queued = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.report = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def snapshot(self):
+        return {
+            'run_id': self.id,
+            'search': self.search.name,
+            'reason': self.reason,
+            'status': self.status,
+            'requests': self.requests,
+            'queue_seconds': round((self.started or time.time()) - self.queued, 1),
+            'seconds': round(self.finished - self.started, 1) if self.finished and self.started else None,
+            'result': self.result,
+            'error': self.error,
+            'report': self.report,
+        }
+
+
+def run_search(session, search, should_stop):
+    """Run one saved search on a logged-in session, saving into the search's own store and change history."""
+    driver, ready, wait = session
+    store = search.store
+    tracker = search.tracker()
+
+    def save(data, timestamp, page=None):
+        with metrics.span('store_write'):
+            store.upsert_page(data, timestamp)
+        with metrics.span('change_tracking'):
+            tracker.update_page(data, timestamp)
+
+    try:
+        if not brightmls.perform_search(driver, wait, ready, search.criteria):
+            raise RuntimeError("Search failed")
+        tracker.expected_rows = brightmls.get_result_count(driver)
+        data, _ = brightmls.scrape_all_pages(driver, wait, max_pages=search.max_pages, ready=ready,
+                                             save=save, stop=should_stop)
+        if not data:
+            raise RuntimeError("No data found")
+        summary = tracker.finish()
+    finally:
+        tracker.save()
+    return {
+        'rows': len(data),
+        'pages': tracker.pages_seen,
+        'result_count': tracker.expected_rows,
+        'listings': store.count(),
+        'changes': {key: summary[key] for key in ('added', 'changed', 'removed', 'price_changes',
+                                                  'status_changes', 'complete')},
+    }
+
+
+class Scheduler:
+    """Run saved searches by priority on a bounded pool of browser sessions.
+
+    A search is queued when its interval is up or when requested; a request for a search
+    that is already queued or running joins that run. Failed runs back off exponentially.
+    """
+
+    def __init__(self, searches, workers=SCHEDULER_WORKERS, factory=None, runner=run_search, tick=SCHEDULER_TICK):
+        self.searches = {search.name: search for search in searches}
+        self.workers = workers
+        self.factory = factory
+        self.factory_lock = threading.Lock()
+        self.runner = runner
+        self.tick = tick
+        self.queue = []
+        self.order = itertools.count()
+        self.cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.sessions = []
+        self.periodic = False
+
+    def request(self, name, reason='manual'):
+        """Queue a run of the named search; return (run, merged) where merged means an existing run was joined."""
+        with self.cond:
+            search = self.searches[name]
+            if search.run is not None and not search.run.done.is_set():
+                search.run.requests += 1
+                return search.run, True
+            run = search.run = SearchRun(search, reason)
+            heapq.heappush(self.queue, (-search.priority, next(self.order), run))
+            self.cond.notify()
+            return run, False
+
+    def queued(self):
+        with self.cond:
+            return [run.search.name for _, _, run in sorted(self.queue)]
+
+    def _enqueue_due(self):
+        now = time.time()
+        for search in list(self.searches.values()):
+            idle = search.run is None or search.run.done.is_set()
+            if search.enabled and idle and now >= search.next_due:
+                self.request(search.name, 'scheduled')
+
+    def _next(self):
+        with self.cond:
+            while not self.queue and not self.stop_event.is_set():
+                self.cond.wait(self.tick)
+            if self.stop_event.is_set():
+                return None
+            _, _, run = heapq.heappop(self.queue)
+            run.status = 'running'
+            run.started = time.time()
+        metrics.observe('brightmls_search_queue_seconds', run.started - run.queued, search=run.search.name)
+        return run
+
+    def _finish(self, run, report, result=None, error=None):
+        search = run.search
+        metrics.inc('brightmls_search_runs_total', search=search.name, status='failed' if error else 'succeeded')
+        with self.cond:
+            run.finished = time.time()
+            run.report = report.summary()
+            run.result, run.error = result, error
+            run.status = 'failed' if error else 'succeeded'
+            search.runs += 1
+            if error:
+                search.failures += 1
+                search.next_due = run.finished + search.backoff_seconds()
+                print(f"❌ Search {search.name} failed ({error}); retrying in {search.backoff_seconds() / 60:.0f} min")
+            else:
+                search.failures = 0
+                search.next_due = run.finished + search.interval_minutes * 60
+                print(f"✅ Search {search.name}: {result['rows']} rows, {result['changes']['added']} added, "
+                      f"{result['changes']['changed']} changed")
+            search.last_run = run.snapshot()
+        run.done.set()
+
+    def _factory(self):
+        with self.factory_lock:
+            if self.factory is None:
+                # Resolve chromedriver once, when the first session opens, for every session after it
+                self.factory = SessionFactory(get_driver_manager().resolve())
+            return self.factory
+
+    def _worker(self):
+        session = None
+        try:
+            while True:
+                run = self._next()
+                if run is None:
+                    return
+                # The run's spans, counters and pages go to its own report, not the scrape job's
+                with metrics.run_report() as report:
+                    try:
+                        if session is None:
+                            session = self._factory().open()
+                            with self.cond:
+                                self.sessions.append(session)
+                        result = self.runner(session, run.search, self.stop_event.is_set)
+                    except Exception as e:
+                        self._finish(run, report, error=str(e))
+                        # A failed run may leave the browser anywhere; the next run gets a fresh session
+                        if session is not None:
+                            self._close(session)
+                            session = None
+                        continue
+                    self._finish(run, report, result=result)
+        finally:
+            if session is not None:
+                self._close(session)
+
+    def _close(self, session):
+        with self.cond:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        try:
+            session[0].quit()
+        except Exception:
+            pass
+
+    def _loop(self):
+        while not self.stop_event.wait(self.tick):
+            self._enqueue_due()
+
+    def start(self, periodic=True):
+        """Start the session workers and, when periodic, queue searches as their intervals come up."""
+        self.periodic = periodic
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"search-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        if periodic:
+            self._enqueue_due()
+            thread = threading.Thread(target=self._loop, name="search-scheduler", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"✅ Scheduler started: {len(self.searches)} saved searches, {self.workers} sessions"
+              f"{'' if periodic else ' (manual runs only)'}")
+
+    def shutdown(self, timeout=30):
+        """Stop after the pages in progress and close the sessions."""
+        self.stop_event.set()
+        with self.cond:
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    def snapshot(self):
+        with self.cond:
+            searches = sorted(self.searches.values(), key=lambda s: (-s.priority, s.name))
+            return {
+                'workers': self.workers,
+                'periodic': self.periodic,
+                'sessions': len(self.sessions),
+                'queue': [run.search.name for _, _, run in sorted(self.queue)],
+                'searches': [search.snapshot() for search in searches],
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler over SEARCHES_FILE, started on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(load_searches())
+            _scheduler.start(periodic=SCHEDULER_ENABLED)
+        return _scheduler
+
+
+def shutdown_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+            _scheduler = None
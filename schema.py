@@ -0,0 +1,200 @@
+import csv
+import re
+import sys
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# Columns stored dictionary-encoded in ListingBatch
+CATEGORICAL_FIELDS = [
+    ('City', 'city'),
+    ('County', 'county'),
+    ('Status', 'status'),
+    ('Structure Type', 'structure_type'),
+    ('List Office Name', 'list_office'),
+    ('Type', 'type'),
+    ('PriceChangeType', 'price_change'),
+]
+STRING_FIELDS = [
+    ('MLS #', 'mls'),
+    ('Address', 'address'),
+]
+# Sentinel for missing integers in the numeric columns
+MISSING = -1
+DATE_FORMAT = '%m/%d/%y'
+
+
+def parse_price(price):
+    """Turn a display price like "$1,049,000" into an integer, or None."""
+    digits = re.sub(r"[^\d]", "", price or "")
+    return int(digits) if digits else None
+
+
+def parse_int(value):
+    """Parse a plain integer cell such as Beds, or None."""
+    value = (value or '').strip()
+    return int(value) if value.isdigit() else None
+
+
+def parse_baths(baths):
+    """Split Matrix's "full/half" baths ("2/1", "3") into (full, half)."""
+    baths = (baths or '').strip()
+    if not baths:
+        return None, None
+    full, _, half = baths.partition('/')
+    return parse_int(full), parse_int(half) if half else 0
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    """Parse a "07/01/25" list date, or None (cached: a crawl only spans a few hundred dates)."""
+    try:
+        return datetime.strptime((value or '').strip(), DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+class Listing:
+    """One listing with typed fields, parsed from a scraped row."""
+
+    __slots__ = ('mls', 'type', 'status', 'address', 'city', 'county', 'beds', 'full_baths', 'half_baths',
+                 'structure_type', 'list_date', 'list_office', 'price', 'price_change', 'timestamp')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_row(cls, row):
+        full_baths, half_baths = parse_baths(row.get('Baths'))
+        return cls(
+            mls=row.get('MLS #') or None,
+            type=row.get('Type') or None,
+            status=row.get('Status') or None,
+            address=row.get('Address') or None,
+            city=row.get('City') or None,
+            county=row.get('County') or None,
+            beds=parse_int(row.get('Beds')),
+            full_baths=full_baths,
+            half_baths=half_baths,
+            structure_type=row.get('Structure Type') or None,
+            list_date=parse_date(row.get('Date')),
+            list_office=row.get('List Office Name') or None,
+            price=parse_price(row.get('Price')),
+            price_change=row.get('PriceChangeType') or None,
+            timestamp=row.get('Timestamp') or None,
+        )
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Listing(mls={self.mls!r}, price={self.price!r}, status={self.status!r})"
+
+
+class ListingBatch:
+    """Columnar listings: NumPy numeric/date columns and dictionary-encoded categorical columns."""
+
+    def __init__(self, columns, dictionaries):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def __len__(self):
+        return len(self.columns['price'])
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a batch from scraped row dicts (any iterable, consumed once)."""
+        strings = {name: [] for _, name in STRING_FIELDS}
+        codes = {name: [] for _, name in CATEGORICAL_FIELDS}
+        lookups = {name: {} for _, name in CATEGORICAL_FIELDS}
+        numbers = {'price': [], 'beds': [], 'full_baths': [], 'half_baths': []}
+        dates = []
+        timestamps = []
+        for row in rows:
+            for field, name in STRING_FIELDS:
+                strings[name].append(row.get(field) or '')
+            for field, name in CATEGORICAL_FIELDS:
+                value = row.get(field) or ''
+                lookup = lookups[name]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[name].append(code)
+            full_baths, half_baths = parse_baths(row.get('Baths'))
+            for name, value in (('price', parse_price(row.get('Price'))), ('beds', parse_int(row.get('Beds'))),
+                                ('full_baths', full_baths), ('half_baths', half_baths)):
+                numbers[name].append(MISSING if value is None else value)
+            list_date = parse_date(row.get('Date'))
+            dates.append(list_date.isoformat() if list_date else 'NaT')
+            timestamps.append(row.get('Timestamp') or 'NaT')
+        columns = {name: np.array(values, dtype=object) for name, values in strings.items()}
+        columns.update({name: np.array(values, dtype=np.int32) for name, values in codes.items()})
+        columns['price'] = np.array(numbers['price'], dtype=np.int64)
+        for name in ('beds', 'full_baths', 'half_baths'):
+            columns[name] = np.array(numbers[name], dtype=np.int16)
+        columns['list_date'] = np.array(dates, dtype='datetime64[D]')
+        columns['timestamp'] = np.array(timestamps, dtype='datetime64[s]')
+        dictionaries = {name: list(lookup) for name, lookup in lookups.items()}
+        return cls(columns, dictionaries)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls.from_rows(csv.DictReader(f))
+
+    def categories(self, name):
+        """Decode a dictionary-encoded column back to its values."""
+        return np.array(self.dictionaries[name], dtype=object)[self.columns[name]]
+
+    def record(self, i):
+        """Return row i as a Listing."""
+        fields = {}
+        for name, column in self.columns.items():
+            value = column[i]
+            if name in self.dictionaries:
+                value = self.dictionaries[name][value] or None
+            elif name in ('list_date', 'timestamp'):
+                value = None if np.isnat(value) else value.item()
+            elif column.dtype != object:
+                value = None if value == MISSING else int(value)
+            fields[name] = value
+        return Listing(**fields)
+
+    def to_pandas(self):
+        """DataFrame with nullable integer columns and pandas Categoricals for the encoded columns."""
+        data = {}
+        for name, column in self.columns.items():
+            if name in self.dictionaries:
+                data[name] = pd.Categorical.from_codes(column, categories=self.dictionaries[name])
+            elif column.dtype.kind == 'i':
+                data[name] = pd.array(np.where(column == MISSING, None, column), dtype='Int64' if name == 'price' else 'Int16')
+            else:
+                data[name] = column
+        return pd.DataFrame(data)
+
+    def to_parquet(self, path):
+        """Write the batch to Parquet (needs pyarrow); categorical columns stay dictionary-encoded."""
+        self.to_pandas().to_parquet(path, index=False)
+
+    def nbytes(self):
+        """Approximate in-memory size of the batch, including string payloads."""
+        total = 0
+        for column in self.columns.values():
+            total += column.nbytes
+            if column.dtype == object:
+                total += sum(sys.getsizeof(value) for value in column)
+        for values in self.dictionaries.values():
+            total += sum(sys.getsizeof(value) for value in values)
+        return total
+
+
+if __name__ == "__main__":
+    # python schema.py brightmls_data.csv listings.parquet
+    if len(sys.argv) != 3:
+        print("Usage: python schema.py <input.csv> <output.parquet>")
+        sys.exit(1)
+    batch = ListingBatch.from_csv(sys.argv[1])
+    batch.to_parquet(sys.argv[2])
+    print(f"✅ Wrote {len(batch)} listings to {sys.argv[2]}")
@@ -0,0 +1,267 @@
+import math
+import queue
+import threading
+import time
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+import brightmls
+import browser_profile
+import metrics
+from waits import Readiness, results_snapshot, results_replaced, PAGER_CSS, RESULTS_ROW_XPATH
+
+# Cookie fields accepted by CDP Network.setCookies
+COOKIE_PARAM_KEYS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+
+def export_cookies(driver):
+    """Return every cookie in the browser (all domains) via CDP."""
+    return driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+
+
+def import_cookies(driver, cookies):
+    """Load cookies captured with export_cookies into another browser."""
+    params = []
+    for cookie in cookies:
+        param = {k: cookie[k] for k in COOKIE_PARAM_KEYS if k in cookie}
+        if cookie.get('session') or param.get('expires', -1) < 0:
+            param.pop('expires', None)
+        params.append(param)
+    driver.execute_cdp_cmd('Network.setCookies', {'cookies': params})
+
+
+def go_to_page(driver, ready, target_page, current_page=1):
+    """Jump forward through the pager to target_page using numbered links, falling back to Next."""
+    while current_page < target_page:
+        pager = driver.find_element(By.CSS_SELECTOR, PAGER_CSS)
+        numbered = {}
+        next_link = None
+        for a in pager.find_elements(By.TAG_NAME, 'a'):
+            text = a.text.strip()
+            if text.isdigit():
+                numbered[int(text)] = a
+            elif text.lower() == 'next':
+                next_link = a
+        reachable = [n for n in numbered if current_page < n <= target_page]
+        if reachable:
+            landing = max(reachable)
+            link = numbered[landing]
+        elif next_link is not None:
+            landing = current_page + 1
+            link = next_link
+        else:
+            raise RuntimeError(f"No pager link towards page {target_page} from page {current_page}")
+        old_tbody, old_pager_text = results_snapshot(driver)
+        driver.execute_script("arguments[0].click();", link)
+        ready.until('next_page', results_replaced(old_tbody, old_pager_text))
+        current_page = landing
+    return current_page
+
+
+class SessionFactory:
+    """Open authenticated browser sessions for pool workers."""
+
+    def __init__(self, driver_path=None, cookies=None):
+        self.driver_path = driver_path
+        self.cookies = cookies
+
+    def open(self):
+        driver = brightmls.create_driver(self.driver_path)
+        ready = Readiness(driver)
+        wait = WebDriverWait(driver, ready.timeout)
+        try:
+            if self.cookies:
+                import_cookies(driver, self.cookies)
+            else:
+                brightmls.login(driver, ready)
+        except Exception:
+            driver.quit()
+            raise
+        return driver, ready, wait
+
+
+class OrderedPageWriter:
+    """Single writer that saves pages to CSV in page order as workers deliver them."""
+
+    def __init__(self, save_page=None, first_page=1):
+        self.save_page = save_page or brightmls.save_page
+        self.pending = {}
+        self.skipped = set()
+        self.next_page = first_page
+        self.data = []
+        self.headers = None
+        self.pages_written = 0
+        self.lock = threading.Lock()
+
+    def _flush(self):
+        while self.next_page in self.pending or self.next_page in self.skipped:
+            if self.next_page in self.pending:
+                data, headers = self.pending.pop(self.next_page)
+                self._write(self.next_page, data, headers)
+            self.next_page += 1
+
+    def _write(self, page_num, data, headers):
+        if self.headers is None:
+            self.headers = headers
+        self.data.extend(data)
+        self.pages_written += 1
+        self.save_page(data, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), page_num)
+
+    def add(self, page_num, data, headers):
+        with self.lock:
+            self.pending[page_num] = (data, headers)
+            self._flush()
+
+    def skip(self, page_num):
+        with self.lock:
+            self.skipped.add(page_num)
+            self._flush()
+
+    def missing(self, first, last):
+        """Pages in first..last that have not been delivered yet."""
+        with self.lock:
+            return [p for p in range(first, last + 1) if p >= self.next_page and p not in self.pending]
+
+    def close(self):
+        """Write whatever is still buffered behind a gap, in page order."""
+        with self.lock:
+            for page_num in sorted(self.pending):
+                self._write(page_num, *self.pending[page_num])
+            self.pending.clear()
+
+
+class PagePool:
+    """Scrape result pages with N browser sessions, each jumping straight to its own page range."""
+
+    def __init__(self, factory, workers=4, pages_per_task=10, max_attempts=2, deadline=None, writer=None):
+        self.factory = factory
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.writer = writer or OrderedPageWriter()
+        self.tasks = queue.Queue()
+        self.failed_pages = []
+        self.lock = threading.Lock()
+
+    def _should_stop(self):
+        return brightmls.should_stop() or (self.deadline is not None and time.time() > self.deadline)
+
+    def _scrape_range(self, session, first, last):
+        """Scrape pages first..last; return the first page not scraped (last + 1 when done)."""
+        driver, ready, wait = session['driver'], session['ready'], session['wait']
+        if session['page'] is None or session['page'] > first:
+            session['page'] = None
+            if not brightmls.perform_search(driver, wait, ready):
+                raise RuntimeError("Search failed")
+            session['page'] = 1
+        for page_num in range(first, last + 1):
+            if self._should_stop():
+                return page_num
+            page_start = time.perf_counter()
+            session['page'] = go_to_page(driver, ready, page_num, session['page'])
+            data, headers = brightmls.scrape_data(driver, wait)
+            if not data:
+                raise RuntimeError(f"No data found on page {page_num}")
+            self.writer.add(page_num, data, headers)
+            metrics.page(page_num, time.perf_counter() - page_start, len(data), 'pool')
+            browser_profile.page_loaded(driver)
+        return last + 1
+
+    def _worker(self, worker_id):
+        session = None
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                self.tasks.task_done()
+                break
+            first, last, attempt = task
+            try:
+                resume_at = first
+                if not self._should_stop():
+                    if session is None:
+                        driver, ready, wait = self.factory.open()
+                        session = {'driver': driver, 'ready': ready, 'wait': wait, 'page': None}
+                    resume_at = self._scrape_range(session, first, last)
+                for page_num in range(resume_at, last + 1):
+                    self.writer.skip(page_num)
+            except Exception as e:
+                print(f"❌ Worker {worker_id} failed on pages {first}-{last} (attempt {attempt}): {e}")
+                if session is not None:
+                    try:
+                        session['driver'].quit()
+                    except Exception:
+                        pass
+                session = None
+                self._retry_or_give_up(first, last, attempt)
+            finally:
+                self.tasks.task_done()
+        if session is not None:
+            try:
+                session['driver'].quit()
+            except Exception:
+                pass
+
+    def _retry_or_give_up(self, first, last, attempt):
+        # Pages the writer already holds are not scraped again
+        remaining = self.writer.missing(first, last)
+        if not remaining:
+            return
+        if attempt < self.max_attempts and not self._should_stop():
+            self.tasks.put((remaining[0], remaining[-1], attempt + 1))
+            return
+        print(f"⚠️ Giving up on pages {remaining[0]}-{remaining[-1]}")
+        metrics.inc('brightmls_failed_pages_total', len(remaining), engine='pool')
+        with self.lock:
+            self.failed_pages.extend(remaining)
+        for page_num in remaining:
+            self.writer.skip(page_num)
+
+    def run(self, total_pages, first_page=1):
+        """Scrape pages first_page..total_pages and return (data, headers, stats) in page order."""
+        start = time.time()
+        self.writer.next_page = first_page
+        for first in range(first_page, total_pages + 1, self.pages_per_task):
+            self.tasks.put((first, min(first + self.pages_per_task - 1, total_pages), 1))
+        threads = [threading.Thread(target=self._worker, args=(i + 1,), daemon=True)
+                   for i in range(min(self.workers, self.tasks.qsize()))]
+        for thread in threads:
+            thread.start()
+        self.tasks.join()
+        for _ in threads:
+            self.tasks.put(None)
+        for thread in threads:
+            thread.join()
+        self.writer.close()
+        elapsed = time.time() - start
+        stats = {
+            'workers': len(threads),
+            'pages_written': self.writer.pages_written,
+            'failed_pages': sorted(self.failed_pages),
+            'pages_per_minute': round(self.writer.pages_written / elapsed * 60, 1) if elapsed else 0.0,
+        }
+        return self.writer.data, self.writer.headers, stats
+
+
+def scrape_all_pages_parallel(driver, workers, max_pages=200, timeout_minutes=30,
+                              session_mode=brightmls.SESSION_MODE, driver_path=None, start_page=1):
+    """Scrape the search already open in driver with a pool of sessions.
+
+    Returns (data, headers, stats), or None when the result count cannot be read
+    and the caller should fall back to scrape_all_pages.
+    """
+    total_results = brightmls.get_result_count(driver)
+    per_page = len(driver.find_elements(By.XPATH, RESULTS_ROW_XPATH))
+    if not total_results or not per_page:
+        print("⚠️ Could not read the result count; falling back to a single session.")
+        return None
+    total_pages = min(max_pages, math.ceil(total_results / per_page))
+    cookies = export_cookies(driver) if session_mode == 'cookies' else None
+    print(f"🔄 Scraping {total_pages} pages with {workers} sessions ({session_mode} mode)...")
+    pool = PagePool(SessionFactory(driver_path, cookies), workers=workers,
+                    deadline=time.time() + timeout_minutes * 60)
+    data, headers, stats = pool.run(total_pages, start_page)
+    stats['total_pages'] = total_pages
+    print(f"✅ Pool scraped {stats['pages_written']}/{total_pages} pages at {stats['pages_per_minute']} pages/min")
+    return data, headers, stats
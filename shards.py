@@ -0,0 +1,231 @@
+import os
+import queue
+import threading
+import time
+from selenium.webdriver.common.by import By
+
+import brightmls
+from session_pool import SessionFactory, export_cookies
+from waits import search_form_ready
+
+# "" runs one search; "county" or "price" splits the sweep into shards
+SHARD_BY = os.getenv("BRIGHTMLS_SHARD_BY", "")
+SHARD_WORKERS = int(os.getenv("BRIGHTMLS_SHARD_WORKERS", "2"))
+# Shards with more results than this are split again (the pager stops at MAX_PAGES pages)
+SHARD_MAX_RESULTS = int(os.getenv("BRIGHTMLS_SHARD_MAX_RESULTS", "4500"))
+# Starting list price bands for price sharding; the last band has no upper bound
+PRICE_BAND_EDGES = [0, 300_000, 600_000, 1_000_000]
+# Price bands narrower than this are not split further
+MIN_PRICE_BAND = 10_000
+# Where an open-ended band starting at 0 is first cut
+OPEN_BAND_SPLIT = 500_000
+
+
+class Shard:
+    """One slice of the search (a county and/or list price band) and what scraping it covered."""
+
+    def __init__(self, county=None, min_price=None, max_price=None, depth=0):
+        self.county = county
+        self.min_price = min_price
+        self.max_price = max_price
+        self.depth = depth
+        self.status = 'pending'
+        self.result_count = None
+        self.rows = 0
+        self.unique_rows = 0
+        self.seconds = 0.0
+        self.error = None
+
+    @property
+    def name(self):
+        parts = [self.county] if self.county else []
+        if self.min_price is not None or self.max_price is not None:
+            high = f"${self.max_price:,}" if self.max_price is not None else "+"
+            parts.append(f"${self.min_price or 0:,}-{high}")
+        return " ".join(parts) or "all"
+
+    def criteria(self):
+        return {'county': self.county, 'min_price': self.min_price, 'max_price': self.max_price}
+
+    def split(self):
+        """Halve the price band (a county shard is cut into two bands); [] when it is too narrow."""
+        low = self.min_price or 0
+        if self.max_price is None:
+            middle = max(low * 2, OPEN_BAND_SPLIT)
+        elif self.max_price - low < MIN_PRICE_BAND:
+            return []
+        else:
+            middle = (low + self.max_price) // 2
+        return [Shard(self.county, low, middle, self.depth + 1),
+                Shard(self.county, middle + 1, self.max_price, self.depth + 1)]
+
+    def coverage(self):
+        return {
+            'shard': self.name,
+            'criteria': self.criteria(),
+            'status': self.status,
+            'depth': self.depth,
+            'result_count': self.result_count,
+            'rows': self.rows,
+            'unique_rows': self.unique_rows,
+            'coverage': round(self.rows / self.result_count, 3) if self.result_count else None,
+            'seconds': round(self.seconds, 1),
+            'error': self.error,
+        }
+
+
+def price_shards(county=None):
+    edges = PRICE_BAND_EDGES
+    shards = [Shard(county, low, high - 1) for low, high in zip(edges, edges[1:])]
+    shards.append(Shard(county, edges[-1], None))
+    return shards
+
+
+def list_counties(driver, ready):
+    """Read the county options from the search form."""
+    driver.get(brightmls.SEARCH_URL)
+    ready.until('search_form', search_form_ready)
+    options = driver.find_elements(By.XPATH, f"//select[@id='{brightmls.COUNTY_SELECT_ID}']/option")
+    return [o.text.strip() for o in options if o.text.strip()]
+
+
+class ShardPlanner:
+    """Run shards with N browser sessions, splitting any shard whose result count is over the limit."""
+
+    def __init__(self, factory, shards, workers=SHARD_WORKERS, max_results=SHARD_MAX_RESULTS,
+                 max_pages=brightmls.MAX_PAGES, deadline=None):
+        self.factory = factory
+        self.workers = workers
+        self.max_results = max_results
+        self.max_pages = max_pages
+        self.deadline = deadline
+        self.tasks = queue.Queue()
+        self.lock = threading.Lock()
+        self.shards = []
+        for shard in shards:
+            self._add(shard)
+        self.seen = set()
+        self.data = []
+        self.headers = None
+        self.duplicates = 0
+
+    def _add(self, shard):
+        self.shards.append(shard)
+        self.tasks.put(shard)
+
+    def _should_stop(self):
+        return brightmls.should_stop() or (self.deadline is not None and time.time() > self.deadline)
+
+    def _collect(self, shard, data, headers):
+        """Keep the first copy of each MLS # across shards."""
+        with self.lock:
+            if self.headers is None:
+                self.headers = headers
+            shard.rows = len(data)
+            for row in data:
+                mls = row.get('MLS #')
+                if mls and mls in self.seen:
+                    self.duplicates += 1
+                    continue
+                if mls:
+                    self.seen.add(mls)
+                self.data.append(row)
+                shard.unique_rows += 1
+
+    def _run_shard(self, session, shard):
+        driver, ready, wait = session
+        if not brightmls.perform_search(driver, wait, ready, shard.criteria()):
+            raise RuntimeError("Search failed")
+        shard.result_count = brightmls.get_result_count(driver)
+        if shard.result_count is not None and shard.result_count > self.max_results:
+            children = shard.split()
+            if children:
+                print(f"🔀 Shard {shard.name} has {shard.result_count} results; splitting")
+                shard.status = 'split'
+                with self.lock:
+                    for child in children:
+                        self._add(child)
+                return
+            print(f"⚠️ Shard {shard.name} has {shard.result_count} results and cannot be split further")
+        remaining_minutes = (self.deadline - time.time()) / 60 if self.deadline else 30
+        data, headers = brightmls.scrape_all_pages(driver, wait, self.max_pages, remaining_minutes, ready=ready)
+        self._collect(shard, data, headers)
+        complete = shard.result_count is None or shard.rows >= shard.result_count
+        shard.status = 'done' if complete else 'partial'
+        print(f"✅ Shard {shard.name}: {shard.rows}/{shard.result_count} rows, {shard.unique_rows} new")
+
+    def _worker(self, worker_id):
+        session = None
+        while True:
+            shard = self.tasks.get()
+            if shard is None:
+                self.tasks.task_done()
+                break
+            start = time.time()
+            try:
+                if self._should_stop():
+                    shard.status = 'skipped'
+                    continue
+                if session is None:
+                    session = self.factory.open()
+                shard.status = 'running'
+                self._run_shard(session, shard)
+            except Exception as e:
+                print(f"❌ Worker {worker_id} failed on shard {shard.name}: {e}")
+                shard.status = 'failed'
+                shard.error = str(e)
+                if session is not None:
+                    try:
+                        session[0].quit()
+                    except Exception:
+                        pass
+                session = None
+            finally:
+                shard.seconds += time.time() - start
+                self.tasks.task_done()
+        if session is not None:
+            try:
+                session[0].quit()
+            except Exception:
+                pass
+
+    def run(self):
+        """Scrape every shard and return (data, headers, stats) with rows deduplicated by MLS #."""
+        start = time.time()
+        threads = [threading.Thread(target=self._worker, args=(i + 1,), daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        # Split shards queue their children before task_done, so join waits for them too
+        self.tasks.join()
+        for _ in threads:
+            self.tasks.put(None)
+        for thread in threads:
+            thread.join()
+        stats = {
+            'shards': [shard.coverage() for shard in self.shards],
+            'unique_rows': len(self.data),
+            'duplicates': self.duplicates,
+            'failed_shards': [shard.name for shard in self.shards if shard.status in ('failed', 'partial', 'skipped')],
+            'seconds': round(time.time() - start, 1),
+        }
+        return self.data, self.headers, stats
+
+
+def scrape_sharded(driver, ready, shard_by=SHARD_BY, workers=SHARD_WORKERS, timeout_minutes=30,
+                   session_mode=brightmls.SESSION_MODE, driver_path=None):
+    """Sweep the search as shards (by county or price band) with a pool of sessions; returns (data, headers, stats)."""
+    if shard_by == 'county':
+        counties = list_counties(driver, ready)
+        shards = [Shard(county=county) for county in counties] or price_shards()
+    else:
+        shards = price_shards()
+    cookies = export_cookies(driver) if session_mode == 'cookies' else None
+    print(f"🔄 Scraping {len(shards)} {shard_by} shards with {workers} sessions...")
+    planner = ShardPlanner(SessionFactory(driver_path, cookies), shards, workers=workers,
+                           deadline=time.time() + timeout_minutes * 60)
+    data, headers, stats = planner.run()
+    stats['shard_by'] = shard_by
+    print(f"✅ {len(stats['shards'])} shards: {stats['unique_rows']} unique listings, "
+          f"{stats['duplicates']} duplicates dropped")
+    return data, headers, stats
@@ -0,0 +1,410 @@
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+from aggregates import DIMENSIONS, MEASURES, add_deltas, group_stats
+from schema import ListingBatch, parse_price
+
+# === File paths ===
+DB_FILE = os.getenv("BRIGHTMLS_DB_FILE", "brightmls.db")
+CSV_FILE = "brightmls_data.csv"
+# FULL fsyncs the WAL on every commit, so each saved page is on disk before the next is scraped
+SYNCHRONOUS = os.getenv("BRIGHTMLS_DB_SYNCHRONOUS", "FULL")
+
+# Scraped column -> listings table column
+COLUMNS = [
+    ('MLS #', 'mls'),
+    ('Type', 'type'),
+    ('Status', 'status'),
+    ('Address', 'address'),
+    ('City', 'city'),
+    ('County', 'county'),
+    ('Beds', 'beds'),
+    ('Baths', 'baths'),
+    ('Structure Type', 'structure_type'),
+    ('Date', 'list_date'),
+    ('List Office Name', 'list_office'),
+    ('Price', 'price'),
+    ('PriceChangeType', 'price_change_type'),
+    ('PriceChangeTitle', 'price_change_title'),
+]
+DB_COLUMNS = [column for _, column in COLUMNS]
+# Header of the exported CSV, matching what the scraper used to append
+CSV_HEADERS = [''] + [field for field, _ in COLUMNS] + ['Timestamp']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    mls TEXT PRIMARY KEY,
+    type TEXT,
+    status TEXT,
+    address TEXT,
+    city TEXT,
+    county TEXT,
+    beds TEXT,
+    baths TEXT,
+    structure_type TEXT,
+    list_date TEXT,
+    list_office TEXT,
+    price TEXT,
+    price_value INTEGER,
+    price_change_type TEXT,
+    price_change_title TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS listing_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mls TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    price TEXT,
+    price_value INTEGER,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+    search_key TEXT PRIMARY KEY,
+    criteria TEXT NOT NULL,
+    expected_rows INTEGER,
+    last_page INTEGER NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint_pages (
+    search_key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    page_hash TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    PRIMARY KEY (search_key, page)
+);
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS listing_stats (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    listings INTEGER NOT NULL DEFAULT 0,
+    priced INTEGER NOT NULL DEFAULT 0,
+    price_sum INTEGER NOT NULL DEFAULT 0,
+    price_drops INTEGER NOT NULL DEFAULT 0,
+    price_increases INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+CREATE INDEX IF NOT EXISTS idx_listings_city ON listings(city);
+CREATE INDEX IF NOT EXISTS idx_listings_county ON listings(county);
+CREATE INDEX IF NOT EXISTS idx_listings_status ON listings(status);
+CREATE INDEX IF NOT EXISTS idx_listings_price ON listings(price_value);
+CREATE INDEX IF NOT EXISTS idx_history_mls ON listing_history(mls, timestamp);
+"""
+
+UPSERT_SQL = f"""
+INSERT INTO listings ({', '.join(DB_COLUMNS)}, price_value, first_seen, last_seen)
+VALUES ({', '.join('?' for _ in DB_COLUMNS)}, ?, ?, ?)
+ON CONFLICT(mls) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in DB_COLUMNS[1:])},
+    price_value = excluded.price_value,
+    last_seen = excluded.last_seen
+"""
+
+
+# One CSV export at a time per process
+_export_lock = threading.Lock()
+
+# Columns of a listing that its history and rollup contributions depend on
+PREVIOUS_COLUMNS = ['price', 'status', 'price_value', 'price_change_type'] + [
+    column for column in DIMENSIONS.values() if column != 'status']
+PREVIOUS_SQL = f"SELECT {', '.join(PREVIOUS_COLUMNS)} FROM listings WHERE mls = ?"
+STATS_SQL = f"""
+INSERT INTO listing_stats (dimension, value, {', '.join(MEASURES)})
+VALUES (?, ?, {', '.join('?' for _ in MEASURES)})
+ON CONFLICT(dimension, value) DO UPDATE SET
+    {', '.join(f'{m} = {m} + excluded.{m}' for m in MEASURES)}
+"""
+
+
+class ListingStore:
+    """SQLite (WAL) store of the latest row per MLS # plus a price/status history."""
+
+    def __init__(self, path=None):
+        self.path = path or DB_FILE
+        self._local = threading.local()
+        self.created = not os.path.exists(self.path)
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+        self.rebuild_stats(only_if_missing=True)
+
+    def connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={SYNCHRONOUS}")
+            self._local.conn = conn
+        return conn
+
+    def upsert_page(self, rows, timestamp, checkpoint=None):
+        """Upsert one page of scraped rows in a single transaction; return the number stored.
+
+        checkpoint (from Checkpoint.entry) is saved in the same transaction, so the
+        crawl's progress never runs ahead of or behind the stored rows.
+        """
+        stored = 0
+        conn = self.connect()
+        with conn:
+            if checkpoint is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoint_pages (search_key, page, page_hash, row_count, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (checkpoint['key'], checkpoint['page'], checkpoint['hash'], checkpoint['rows'], timestamp))
+                conn.execute(
+                    "UPDATE scrape_checkpoints SET last_page = ?, row_count = ?, updated_at = ? "
+                    "WHERE search_key = ?",
+                    (checkpoint['last_page'], checkpoint['row_count'], timestamp, checkpoint['key']))
+            deltas = {}
+            for row in rows:
+                mls = row.get('MLS #')
+                if not mls:
+                    continue
+                values = [row.get(field, '') for field, _ in COLUMNS]
+                price_value = parse_price(row.get('Price'))
+                previous = conn.execute(PREVIOUS_SQL, (mls,)).fetchone()
+                if previous is None or previous['price'] != row.get('Price', '') or previous['status'] != row.get('Status', ''):
+                    conn.execute(
+                        "INSERT INTO listing_history (mls, timestamp, price, price_value, status) VALUES (?, ?, ?, ?, ?)",
+                        (mls, timestamp, row.get('Price', ''), price_value, row.get('Status', '')))
+                conn.execute(UPSERT_SQL, values + [price_value, timestamp, timestamp])
+                current = dict(zip(DB_COLUMNS, values), price_value=price_value,
+                               first_seen=previous['first_seen'] if previous is not None else timestamp)
+                add_deltas(deltas, previous, current)
+                stored += 1
+            self._apply_stats(conn, deltas)
+        return stored
+
+    @staticmethod
+    def _apply_stats(conn, deltas):
+        """Add per-(dimension, value) measure deltas to the rollups, dropping groups left empty."""
+        changed = [key + tuple(measures) for key, measures in deltas.items() if any(measures)]
+        if not changed:
+            return
+        conn.executemany(STATS_SQL, changed)
+        conn.execute("DELETE FROM listing_stats WHERE listings <= 0")
+
+    def rebuild_stats(self, only_if_missing=False):
+        """Recompute the rollups from the listings table (once for databases created before them)."""
+        conn = self.connect()
+        with conn:
+            if only_if_missing and (conn.execute("SELECT 1 FROM listing_stats LIMIT 1").fetchone()
+                                    or not conn.execute("SELECT 1 FROM listings LIMIT 1").fetchone()):
+                return False
+            conn.execute("DELETE FROM listing_stats")
+            deltas = {}
+            for record in conn.execute(f"SELECT {', '.join(PREVIOUS_COLUMNS)} FROM listings"):
+                add_deltas(deltas, None, record)
+            self._apply_stats(conn, deltas)
+        return True
+
+    def stats(self, dimension=None, top=None):
+        """Rollups by dimension ('all' holds the totals), largest groups first."""
+        sql = "SELECT * FROM listing_stats"
+        params = []
+        if dimension is not None:
+            sql += " WHERE dimension IN ('all', ?)"
+            params.append(dimension)
+        sql += " ORDER BY dimension, listings DESC, value"
+        result = {}
+        for row in self.connect().execute(sql, params):
+            groups = result.setdefault(row['dimension'], [])
+            if top is None or len(groups) < top or row['dimension'] == 'all':
+                groups.append(group_stats(row))
+        return result
+
+    def load_checkpoint(self, key):
+        """Return the saved crawl progress for a search key, with its page hashes, or None."""
+        conn = self.connect()
+        record = conn.execute("SELECT * FROM scrape_checkpoints WHERE search_key = ?", (key,)).fetchone()
+        if record is None:
+            return None
+        checkpoint = dict(record)
+        checkpoint['completed'] = bool(checkpoint['completed'])
+        cursor = conn.execute("SELECT page, page_hash FROM checkpoint_pages WHERE search_key = ?", (key,))
+        checkpoint['pages'] = {page: page_hash for page, page_hash in cursor}
+        return checkpoint
+
+    def start_checkpoint(self, key, criteria, expected_rows, timestamp):
+        """Reset a search's progress for a crawl starting at page 1 (page hashes are kept for comparison)."""
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO scrape_checkpoints (search_key, criteria, expected_rows, last_page, row_count, "
+                "completed, started_at, updated_at) VALUES (?, ?, ?, 0, 0, 0, ?, ?) "
+                "ON CONFLICT(search_key) DO UPDATE SET criteria = excluded.criteria, "
+                "expected_rows = excluded.expected_rows, last_page = 0, row_count = 0, completed = 0, "
+                "started_at = excluded.started_at, updated_at = excluded.updated_at",
+                (key, json.dumps(criteria, sort_keys=True), expected_rows, timestamp, timestamp))
+
+    def finish_checkpoint(self, key, completed, timestamp):
+        with self.connect() as conn:
+            conn.execute("UPDATE scrape_checkpoints SET completed = ?, updated_at = ? WHERE search_key = ?",
+                         (int(completed), timestamp, key))
+
+    def record_run(self, mode, started_at, finished_at, pages, rows, seconds, completed):
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO scrape_runs (mode, started_at, finished_at, pages, rows, seconds, completed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (mode, started_at, finished_at, pages, rows, seconds, int(completed)))
+
+    def last_run(self, mode, completed=True):
+        """Return the latest run of a mode ("full" or "delta") as a dict, or None."""
+        sql = "SELECT * FROM scrape_runs WHERE mode = ?" + (" AND completed = 1" if completed else "")
+        record = self.connect().execute(sql + " ORDER BY id DESC LIMIT 1", (mode,)).fetchone()
+        return dict(record) if record else None
+
+    def count(self):
+        return self.connect().execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    @staticmethod
+    def _row(record):
+        row = {'': ''}
+        for field, column in COLUMNS:
+            row[field] = record[column] if record[column] is not None else ''
+        row['Timestamp'] = record['last_seen']
+        return row
+
+    def iter_rows(self):
+        """Yield every listing as a dict keyed by the scraped CSV headers."""
+        cursor = self.connect().execute(f"SELECT {', '.join(DB_COLUMNS)}, last_seen FROM listings ORDER BY last_seen, mls")
+        for record in cursor:
+            yield self._row(record)
+
+    def query(self, city=None, county=None, status=None, min_price=None, max_price=None, beds=None,
+              after=None, limit=100):
+        """Return up to limit listings matching the filters, ordered by MLS #, starting after the cursor."""
+        clauses = []
+        params = []
+        for column, value in (('city', city), ('county', county), ('status', status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if min_price is not None:
+            clauses.append("price_value >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price_value <= ?")
+            params.append(max_price)
+        if beds is not None:
+            clauses.append("CAST(beds AS INTEGER) >= ?")
+            params.append(beds)
+        if after is not None:
+            clauses.append("mls > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {', '.join(DB_COLUMNS)}, last_seen FROM listings {where} ORDER BY mls LIMIT ?"
+        cursor = self.connect().execute(sql, params + [limit])
+        return [self._row(record) for record in cursor]
+
+    def history(self, mls):
+        cursor = self.connect().execute(
+            "SELECT timestamp, price, price_value, status FROM listing_history WHERE mls = ? ORDER BY id", (mls,))
+        return [dict(record) for record in cursor]
+
+    def last_modified(self):
+        """Latest modification time of the database, including its WAL file."""
+        paths = [self.path, self.path + '-wal']
+        return max(os.path.getmtime(p) for p in paths if os.path.exists(p))
+
+    def export_csv(self, path=CSV_FILE):
+        """Write the latest row per MLS # to path atomically and return the row count.
+
+        Exports are serialized, so a run's snapshot and an API request's re-export
+        never share the temp file.
+        """
+        tmp_path = f"{path}.tmp"
+        count = 0
+        with _export_lock:
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_HEADERS, extrasaction='ignore')
+                writer.writeheader()
+                for row in self.iter_rows():
+                    writer.writerow(row)
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        return count
+
+    def export_parquet(self, path):
+        """Write the current listings to Parquet with typed, dictionary-encoded columns."""
+        batch = ListingBatch.from_rows(self.iter_rows())
+        batch.to_parquet(path)
+        return len(batch)
+
+    def export_csv_if_stale(self, path=CSV_FILE):
+        """Re-export the CSV only when the store changed after the last export."""
+        if os.path.exists(path) and os.path.getmtime(path) >= self.last_modified():
+            return False
+        self.export_csv(path)
+        return True
+
+    def import_csv(self, path=CSV_FILE):
+        """One-time import of the legacy append-only CSV, replayed in timestamp order."""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        rows.sort(key=lambda row: row.get('Timestamp') or '')
+        imported = 0
+        batch = []
+        for row in rows:
+            if batch and batch[-1].get('Timestamp') != row.get('Timestamp'):
+                imported += self.upsert_page(batch, batch[-1].get('Timestamp') or '')
+                batch = []
+            batch.append(row)
+        if batch:
+            imported += self.upsert_page(batch, batch[-1].get('Timestamp') or '')
+        return imported
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """Return the shared store for path, importing the legacy CSV when the database is new."""
+    path = path or DB_FILE
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = ListingStore(path)
+            if store.created and os.path.exists(CSV_FILE):
+                imported = store.import_csv(CSV_FILE)
+                print(f"✅ Imported {imported} rows from {CSV_FILE} into {path}")
+            _stores[path] = store
+        return store
+
+
+if __name__ == "__main__":
+    # python store.py import [csv_path] | python store.py export [csv_path|parquet_path]
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    target = sys.argv[2] if len(sys.argv) > 2 else CSV_FILE
+    if command == 'import':
+        count = ListingStore().import_csv(target)
+        print(f"✅ Imported {count} rows from {target} into {DB_FILE}")
+    elif command == 'export' and target.endswith('.parquet'):
+        count = ListingStore().export_parquet(target)
+        print(f"✅ Exported {count} listings to {target}")
+    elif command == 'export':
+        count = ListingStore().export_csv(target)
+        print(f"✅ Exported {count} listings to {target}")
+    else:
+        print("Usage: python store.py import [csv_path] | export [csv_path|parquet_path]")
+        sys.exit(1)
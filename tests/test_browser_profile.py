@@ -0,0 +1,62 @@
+from selenium.webdriver.chrome.options import Options
+
+import browser_profile
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current = handle
+
+
+class FakeDriver:
+    def __init__(self, handles):
+        self.window_handles = list(handles)
+        self.current = handles[0]
+        self.switch_to = FakeSwitch(self)
+        self.calls = []
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+    def execute_script(self, script, *args):
+        self.calls.append(('script', args))
+        return 3
+
+    def execute_cdp_cmd(self, command, params):
+        self.calls.append(('cdp', command))
+
+
+def test_blocked_url_patterns_cover_queries_and_subdomains():
+    patterns = browser_profile.blocked_url_patterns(['woff2'], ['hotjar.com'])
+    assert patterns == ['*.woff2', '*.woff2?*', '*://hotjar.com/*', '*://*.hotjar.com/*']
+
+
+def test_network_logging_is_off_unless_tracking_bytes(monkeypatch):
+    options = browser_profile.configure_options(Options(), 'lite')
+    assert 'goog:loggingPrefs' not in options.to_capabilities()
+    monkeypatch.setattr(browser_profile, 'TRACK_BYTES', True)
+    options = browser_profile.configure_options(Options(), 'full')
+    assert options.to_capabilities()['goog:loggingPrefs'] == {'performance': 'ALL'}
+
+
+def test_trim_keeps_the_main_tab_and_clears_dom_cache_and_garbage():
+    driver = FakeDriver(['main', 'popup'])
+    driver.brightmls_profile = browser_profile.ProfileSession('lite')
+    driver.brightmls_profile.main_window = 'main'
+    browser_profile.trim(driver)
+    assert (driver.window_handles, driver.current) == (['main'], 'main')
+    assert driver.calls == [('script', (browser_profile.RESULTS_TABLE_XPATH,)),
+                            ('cdp', 'Network.clearBrowserCache'), ('cdp', 'HeapProfiler.collectGarbage')]
+
+
+def test_lite_pages_trim_every_few_pages(monkeypatch):
+    monkeypatch.setattr(browser_profile, 'TRIM_EVERY_PAGES', 2)
+    monkeypatch.setattr(browser_profile, 'browser_rss_mb', lambda driver: None)
+    driver = FakeDriver(['main'])
+    driver.brightmls_profile = browser_profile.ProfileSession('lite')
+    for _ in range(5):
+        browser_profile.page_loaded(driver)
+    assert driver.calls.count(('cdp', 'Network.clearBrowserCache')) == 2
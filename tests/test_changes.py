@@ -0,0 +1,80 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import scheduler
+from changes import CHANGES_FILE, ChangeTracker, load_changes_since, load_index
+
+EVENTS = [
+    {'timestamp': '2025-07-01 11:00:00', 'mls': 'VAFX1', 'change': 'added', 'fields': {}},
+    {'timestamp': '2025-07-01 13:00:00', 'mls': 'VAFX2', 'change': 'added', 'fields': {}},
+]
+# Noon local time, between the two events
+NOON = datetime(2025, 7, 1, 12, 0, 0)
+
+
+def write_events(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in EVENTS:
+            f.write(json.dumps(event) + '\n')
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_events(CHANGES_FILE)
+    with open('searches.json', 'w', encoding='utf-8') as f:
+        json.dump([{'name': 'fairfax', 'criteria': {'county': 'Fairfax'}}], f)
+    write_events(os.path.join('searches', 'fairfax', 'listing_changes.jsonl'))
+    import main
+    yield TestClient(main.app)
+    scheduler.shutdown_scheduler()
+
+
+@pytest.mark.parametrize('since', [
+    NOON,
+    NOON.astimezone(),
+    NOON.astimezone(timezone.utc),
+])
+def test_load_changes_since_naive_and_aware(tmp_path, since):
+    path = str(tmp_path / 'changes.jsonl')
+    write_events(path)
+    assert [event['mls'] for event in load_changes_since(since, path=path)] == ['VAFX2']
+
+
+@pytest.mark.parametrize('since', [
+    NOON.isoformat(),
+    NOON.astimezone().isoformat(),
+    NOON.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+])
+@pytest.mark.parametrize('url', ['/changes', '/searches/fairfax/changes'])
+def test_changes_endpoints_accept_offsets(client, url, since):
+    response = client.get(url, params={'since': since})
+    assert response.status_code == 200
+    assert [event['mls'] for event in response.json()['changes']] == ['VAFX2']
+
+
+def test_changes_rejects_invalid_since(client):
+    assert client.get('/changes', params={'since': 'yesterday'}).status_code == 400
+
+
+def test_tracker_writes_the_index_once_per_run(tmp_path):
+    index_file, changes_file = str(tmp_path / 'index.json'), str(tmp_path / 'changes.jsonl')
+    row = {'MLS #': 'VAFX1', 'Price': '$500,000', 'Status': 'ACT'}
+    tracker = ChangeTracker(index_file, changes_file)
+    assert [event['change'] for event in tracker.update_page([row], '2025-07-01 11:00:00')] == ['added']
+    assert not os.path.exists(index_file)
+    tracker.expected_rows = 1
+    tracker.finish('2025-07-01 11:00:01')
+    assert load_index(index_file)['VAFX1']['fields']['Price'] == '$500,000'
+
+    # An interrupted run saves what it saw, so the next run does not report it again
+    tracker = ChangeTracker(index_file, changes_file)
+    tracker.update_page([dict(row, Price='$480,000')], '2025-07-02 11:00:00')
+    tracker.save()
+    tracker = ChangeTracker(index_file, changes_file)
+    assert tracker.update_page([dict(row, Price='$480,000')], '2025-07-03 11:00:00') == []
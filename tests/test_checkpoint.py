@@ -0,0 +1,107 @@
+import pytest
+
+from benchmarks.synthetic import synthetic_rows
+from checkpoint import Checkpoint
+from store import ListingStore
+
+CRITERIA = {'structure_type': 'Detached'}
+PER_PAGE = 20
+PAGES = 5
+ROWS = list(synthetic_rows(PER_PAGE * PAGES))
+TIMESTAMP = '2025-07-01 12:00:00'
+
+
+def page_rows(page):
+    return ROWS[(page - 1) * PER_PAGE:page * PER_PAGE]
+
+
+def save(store, checkpoint, page, rows=None):
+    """What brightmls.save_page does with a page: upsert it with its checkpoint entry, then note it saved."""
+    rows = page_rows(page) if rows is None else rows
+    entry = checkpoint.entry(page, rows)
+    store.upsert_page(rows, TIMESTAMP, checkpoint=entry)
+    checkpoint.saved(entry)
+
+
+def crawl(store, pages, expected_rows=len(ROWS), **kwargs):
+    """Run one crawl that saves pages (in the given order) from where the checkpoint resumes."""
+    checkpoint = Checkpoint(store, CRITERIA, expected_rows, max_pages=PAGES, **kwargs)
+    start_page = checkpoint.resume_page()
+    checkpoint.start(start_page)
+    for page in pages(start_page) if callable(pages) else pages:
+        save(store, checkpoint, page)
+        if checkpoint.caught_up:
+            break
+    return start_page, checkpoint.finish()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ListingStore(str(tmp_path / 'listings.db'))
+
+
+def test_interrupted_crawl_resumes_at_the_next_page(store):
+    start, summary = crawl(store, [1, 2, 3])
+    assert (start, summary['last_page'], summary['completed']) == (1, 3, False)
+    start, summary = crawl(store, lambda start: range(start, PAGES + 1))
+    assert (start, summary['resumed_from_page']) == (4, 4)
+    assert (summary['last_page'], summary['row_count'], summary['completed']) == (5, len(ROWS), True)
+    # A completed crawl is not resumed
+    assert Checkpoint(store, CRITERIA, len(ROWS), max_pages=PAGES).resume_page() == 1
+
+
+def test_changed_result_count_restarts_the_crawl(store):
+    crawl(store, [1, 2, 3])
+    start, summary = crawl(store, [1, 2], expected_rows=len(ROWS) + 1)
+    assert (start, summary['last_page'], summary['row_count']) == (1, 2, 2 * PER_PAGE)
+    assert store.load_checkpoint(Checkpoint(store, CRITERIA).key)['expected_rows'] == len(ROWS) + 1
+
+
+def test_stale_or_other_search_checkpoints_are_not_resumed(store):
+    crawl(store, [1, 2, 3])
+    assert Checkpoint(store, CRITERIA, len(ROWS), max_pages=PAGES, max_age_hours=0).resume_page() == 1
+    assert Checkpoint(store, {'structure_type': 'Townhouse'}, len(ROWS), max_pages=PAGES).resume_page() == 1
+
+
+def test_pages_after_a_failed_page_do_not_move_the_resume_point(store):
+    # Page 3 failed in the pool; the writer still saved 4 and 5 behind the gap
+    start, summary = crawl(store, [1, 2, 4, 5])
+    assert (summary['last_page'], summary['row_count']) == (2, 2 * PER_PAGE)
+    assert (summary['pages_after_gap'], summary['completed']) == ([4, 5], False)
+    saved = store.load_checkpoint(Checkpoint(store, CRITERIA).key)
+    assert (saved['last_page'], saved['row_count'], saved['completed']) == (2, 2 * PER_PAGE, False)
+    start, summary = crawl(store, lambda start: range(start, PAGES + 1))
+    assert start == 3
+    assert (summary['last_page'], summary['row_count'], summary['completed']) == (5, len(ROWS), True)
+
+
+def test_out_of_order_pages_fill_the_gap(store):
+    checkpoint = Checkpoint(store, CRITERIA, len(ROWS), max_pages=PAGES)
+    checkpoint.start(1)
+    for page in (2, 3, 1):
+        save(store, checkpoint, page)
+    assert (checkpoint.last_page, checkpoint.row_count, checkpoint.ahead) == (3, 3 * PER_PAGE, {})
+
+
+def test_a_failed_save_leaves_a_gap(store):
+    checkpoint = Checkpoint(store, CRITERIA, len(ROWS), max_pages=PAGES)
+    checkpoint.start(1)
+    save(store, checkpoint, 1)
+    checkpoint.entry(2, page_rows(2))  # built, but the upsert failed and saved() was never called
+    save(store, checkpoint, 3)
+    assert checkpoint.finish()['last_page'] == 1
+
+
+def test_early_stop_on_unchanged_pages_is_not_a_completed_crawl(store):
+    crawl(store, range(1, PAGES + 1))
+    start, summary = crawl(store, range(1, PAGES + 1), unchanged_stop=2)
+    assert (start, summary['stopped_early'], summary['last_page']) == (1, True, 2)
+    assert summary['completed'] is False
+    # The open checkpoint lets the next run carry on from the next page
+    assert Checkpoint(store, CRITERIA, len(ROWS), max_pages=PAGES).resume_page() == 3
+
+
+def test_early_stop_is_off_by_default(store):
+    crawl(store, range(1, PAGES + 1))
+    _, summary = crawl(store, range(1, PAGES + 1))
+    assert (summary['stopped_early'], summary['unchanged_pages'], summary['completed']) == (False, PAGES, True)
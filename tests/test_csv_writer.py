@@ -0,0 +1,58 @@
+import csv
+import time
+
+import pytest
+
+from benchmarks.synthetic import synthetic_rows
+from csv_writer import CsvWriter
+from store import ListingStore
+
+T1 = '2025-07-01 11:00:00'
+ROWS = list(synthetic_rows(100, timestamp=T1))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ListingStore(str(tmp_path / 'listings.db'))
+
+
+def save(store, writer, rows):
+    store.upsert_page(rows, T1)
+    writer.write_page(rows)
+
+
+def exported(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_snapshot_once_enough_rows_are_saved(store, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    writer = CsvWriter(store, path, flush_rows=50, flush_seconds=3600)
+    save(store, writer, ROWS[:25])
+    assert writer.snapshots == 0
+    save(store, writer, ROWS[25:50])
+    assert (writer.snapshots, len(exported(path))) == (1, 50)
+    save(store, writer, ROWS[50:60])
+    assert writer.close() == {'snapshots': 2, 'listings': 60}
+    assert not writer.timer.is_alive()
+
+
+def test_timer_snapshots_pending_rows_between_pages(store, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    writer = CsvWriter(store, path, flush_rows=10_000, flush_seconds=0.05)
+    save(store, writer, ROWS[:20])
+    deadline = time.monotonic() + 5
+    while writer.snapshots == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.stop()
+    assert writer.snapshots == 1 and writer.pending == 0
+    assert len(exported(path)) == 20
+
+
+def test_stop_leaves_the_last_snapshot(store, tmp_path):
+    path = str(tmp_path / 'export.csv')
+    writer = CsvWriter(store, path, flush_rows=10_000, flush_seconds=3600)
+    save(store, writer, ROWS[:20])
+    writer.stop()
+    assert writer.snapshots == 0 and not (tmp_path / 'export.csv').exists()
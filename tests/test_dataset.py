@@ -0,0 +1,49 @@
+import pytest
+
+from dataset import parse_range
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-99', (0, 99)),
+    ('bytes=100-', (100, 999)),
+    ('bytes=-100', (900, 999)),
+    ('bytes=-5000', (0, 999)),
+    ('bytes=900-5000', (900, 999)),
+    ('bytes=0-9, 20-29', (0, 9)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=50-10', 'bytes=-0', 'bytes=abc-', 'bytes=', None, ''])
+def test_unsatisfiable_ranges(header):
+    assert parse_range(header, SIZE) is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import store
+    from benchmarks.synthetic import synthetic_rows
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store, 'DB_FILE', str(tmp_path / 'listings.db'))
+    store.get_store().upsert_page(list(synthetic_rows(50)), '2025-07-01 12:00:00')
+    import main
+    return TestClient(main.app)
+
+
+def test_csv_download_ranges(client):
+    full = client.get('/csv')
+    assert full.status_code == 200
+    size = len(full.content)
+    part = client.get('/csv', headers={'Range': 'bytes=0-9'})
+    assert (part.status_code, part.content) == (206, full.content[:10])
+    assert part.headers['content-range'] == f'bytes 0-9/{size}'
+    assert client.get('/csv', headers={'Range': f'bytes={size}-'}).status_code == 416
+    assert client.get('/csv', headers={'If-None-Match': full.headers['etag']}).status_code == 304
+    # Other range units are ignored (RFC 9110)
+    other = client.get('/csv', headers={'Range': 'items=0-5'})
+    assert (other.status_code, other.content) == (200, full.content)
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pytest
+
+import brightmls
+
+DAY = date(2025, 7, 1)
+ROWS = [{'MLS #': f'VA{i}', 'Date': (DAY - timedelta(days=i % 9)).strftime('%m/%d/%y'),
+         'Modified': (DAY - timedelta(days=i % 5)).strftime('%m/%d/%y 10:15 AM')} for i in range(60)]
+PER_PAGE = 20
+
+
+class FakeGrid:
+    """A results grid whose header link cycles the rows through the given orders."""
+
+    def __init__(self, orders, headers=('Date',)):
+        self.orders = orders
+        self.headers = headers
+        self.current = 0
+        self.clicks = 0
+
+    def find_elements(self, by, xpath):
+        return [object()] if any(f"='{column}'" in xpath for column in self.headers) else []
+
+    def execute_script(self, script, link):
+        self.clicks += 1
+        self.current = min(self.current + 1, len(self.orders) - 1)
+
+    def first_page(self):
+        return [dict(row) for row in self.orders[self.current][:PER_PAGE]], ['MLS #', 'Date', 'Modified']
+
+
+class FakeReady:
+    def until(self, step, condition):
+        return True
+
+
+def by_date(rows, newest_first, column='Date'):
+    return sorted(rows, key=lambda row: (row[column][6:8], row[column][:5]), reverse=newest_first)
+
+
+@pytest.fixture(autouse=True)
+def fake_matrix(monkeypatch):
+    monkeypatch.setattr(brightmls, 'scrape_data', lambda driver, wait: driver.first_page())
+    monkeypatch.setattr(brightmls, 'results_snapshot', lambda driver: (None, ''))
+
+
+def test_sort_toggles_until_newest_first():
+    grid = FakeGrid([ROWS, by_date(ROWS, False), by_date(ROWS, True)])
+    assert brightmls.sort_results(grid, FakeReady()) == 'Date'
+    assert grid.clicks == 2
+
+
+def test_sort_prefers_a_modification_date_column():
+    grid = FakeGrid([ROWS, by_date(ROWS, True, 'Modified')], headers=('Date', 'Modified'))
+    assert brightmls.sort_results(grid, FakeReady()) == 'Modified'
+    assert grid.clicks == 1
+
+
+def test_click_that_does_not_reorder_is_not_a_sort():
+    # Every date on the page is equal, so the order alone cannot tell newest first from oldest first
+    same_day = [dict(row, Date='07/01/25') for row in ROWS]
+    assert brightmls.sort_results(FakeGrid([same_day, same_day]), FakeReady()) is None
+
+
+def test_oldest_first_after_both_clicks_is_not_a_sort():
+    grid = FakeGrid([by_date(ROWS, True), by_date(ROWS, False), list(reversed(ROWS))])
+    assert brightmls.sort_results(grid, FakeReady()) is None
+
+
+def test_missing_sort_column():
+    assert brightmls.sort_results(FakeGrid([ROWS], headers=('Price',)), FakeReady()) is None
@@ -0,0 +1,60 @@
+import pytest
+
+import brightmls
+from benchmarks.matrix_pages import paginate, results_page_html
+from benchmarks.synthetic import synthetic_rows
+from http_engine import scrape_all_pages_http
+
+PAGES = paginate(list(synthetic_rows(60)), per_page=20)
+
+
+class StubFetcher:
+    """Serves result pages like HttpPageFetcher; next_page raises or returns an empty grid from fail_at on."""
+
+    def __init__(self, fail_at=None, empty_at=None, page=1):
+        self.page = page
+        self.fail_at = fail_at
+        self.empty_at = empty_at
+        self.html = self._html()
+
+    def _html(self):
+        rows = [] if self.page == self.empty_at else PAGES[self.page - 1]
+        return results_page_html(rows, self.page, len(PAGES), 60)
+
+    def next_page(self):
+        if self.page >= len(PAGES):
+            return None
+        self.page += 1
+        if self.page == self.fail_at:
+            raise ConnectionError("connection reset")
+        self.html = self._html()
+        return self.html
+
+
+@pytest.fixture
+def saved(monkeypatch):
+    pages = []
+    monkeypatch.setattr(brightmls, 'save_page', lambda data, timestamp, page=None: pages.append(page))
+    monkeypatch.setattr(brightmls, 'should_stop', lambda: False)
+    return pages
+
+
+def test_all_pages(saved):
+    data, headers, failed_page = scrape_all_pages_http(StubFetcher())
+    assert (len(data), failed_page, saved) == (60, None, [1, 2, 3])
+    assert 'MLS #' in headers
+
+
+def test_failed_fetch_reports_the_page_it_was_for(saved):
+    data, _, failed_page = scrape_all_pages_http(StubFetcher(fail_at=2))
+    assert (len(data), failed_page, saved) == (20, 2, [1])
+
+
+def test_failed_parse_reports_that_page(saved):
+    data, _, failed_page = scrape_all_pages_http(StubFetcher(empty_at=3))
+    assert (len(data), failed_page, saved) == (40, 3, [1, 2])
+
+
+def test_resumed_run_reports_the_page_after_the_last_saved(saved):
+    data, _, failed_page = scrape_all_pages_http(StubFetcher(fail_at=3, page=2), start_page=2)
+    assert (len(data), failed_page, saved) == (20, 3, [2])
@@ -0,0 +1,20 @@
+from metrics import Registry
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.inc('brightmls_search_runs_total', search='a"b\\c\nd', status='failed')
+    lines = registry.render().splitlines()
+    assert 'brightmls_search_runs_total{search="a\\"b\\\\c\\nd",status="failed"} 1' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    for seconds in (0.02, 0.2, 20.0):
+        registry.observe('brightmls_page_seconds', seconds, engine='http')
+    lines = registry.render().splitlines()
+    assert 'brightmls_page_seconds_bucket{engine="http",le="0.05"} 1' in lines
+    assert 'brightmls_page_seconds_bucket{engine="http",le="0.25"} 2' in lines
+    assert 'brightmls_page_seconds_bucket{engine="http",le="+Inf"} 3' in lines
+    assert 'brightmls_page_seconds_count{engine="http"} 3' in lines
+
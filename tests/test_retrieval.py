@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from retrieval import ChatRetriever
+
+LISTINGS = [
+    # MLS #, City, County, Beds, Baths, Price
+    ('VAFX1', 'Fairfax', 'Fairfax, VA', '2', '1', '$350,000'),
+    ('VAFX2', 'Fairfax', 'Fairfax, VA', '3', '2', '$480,000'),
+    ('VAFX3', 'Fairfax', 'Fairfax, VA', '4', '3/1', '$760,000'),
+    ('VAFX4', 'Fairfax', 'Fairfax, VA', '5', '4', '$1,250,000'),
+    ('VAPW1', 'Woodbridge', 'Prince William, VA', '3', '2/1', '$499,999'),
+]
+
+
+class StubClient:
+    """Stands in for openai.OpenAI: records the prompts and answers with a fixed text."""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=f"answer {len(self.calls)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame([{
+        'MLS #': mls, 'Status': 'ACT', 'Address': f'{i} Main St', 'City': city, 'County': county,
+        'Beds': beds, 'Baths': baths, 'Structure Type': 'Detached', 'Date': '07/01/25',
+        'List Office Name': 'Office', 'Price': price, 'PriceChangeType': '',
+    } for i, (mls, city, county, beds, baths, price) in enumerate(LISTINGS)])
+
+
+@pytest.fixture
+def client():
+    return StubClient()
+
+
+@pytest.fixture
+def retriever(client):
+    return ChatRetriever(lambda: client)
+
+
+def ask(retriever, df, question):
+    context, info = retriever.build_context(df, 'v1', question)
+    answer, cached = retriever.answer(question, context, 'v1')
+    return context, info, answer, cached
+
+
+def sent_mls(client):
+    prompt = client.calls[-1]['messages'][-1]['content']
+    return sorted(mls for mls, *_ in LISTINGS if mls in prompt)
+
+
+@pytest.mark.parametrize('question, filters, mls', [
+    ("Show homes with up to 3 bedrooms in Fairfax",
+     {'City': ['Fairfax'], 'max_beds': 3}, ['VAFX1', 'VAFX2']),
+    ("Which homes have under 4 beds?", {'max_beds': 3}, ['VAFX1', 'VAFX2', 'VAPW1']),
+    ("List homes with over 2 baths", {}, [mls for mls, *_ in LISTINGS]),
+    ("Homes at least 4 bedrooms", {'min_beds': 4}, ['VAFX3', 'VAFX4']),
+    ("Homes under $500k", {'max_price': 500_000}, ['VAFX1', 'VAFX2', 'VAPW1']),
+    ("Homes over 700,000 in Fairfax", {'City': ['Fairfax'], 'min_price': 700_000}, ['VAFX3', 'VAFX4']),
+    ("Homes between 400 and 800k", {'min_price': 400_000, 'max_price': 800_000},
+     ['VAFX2', 'VAFX3', 'VAPW1']),
+    ("3+ bedrooms under 1.2m with over 2 baths", {'min_beds': 3, 'max_price': 1_200_000},
+     ['VAFX2', 'VAFX3', 'VAPW1']),
+])
+def test_question_filters_select_rows_sent_to_the_model(retriever, client, df, question, filters, mls):
+    _, info, answer, cached = ask(retriever, df, question)
+    assert info['filters'] == filters
+    assert info['matching_rows'] == len(mls)
+    assert sent_mls(client) == mls
+    assert (answer, cached) == ("answer 1", False)
+
+
+def test_small_numbers_are_not_prices(retriever, df):
+    for question in ("Show homes under 4 in Fairfax", "Anything over 2?", "up to 3 bedrooms", "under 2.5 baths"):
+        filters = retriever.build_context(df, 'v1', question)[1]['filters']
+        assert 'min_price' not in filters and 'max_price' not in filters, question
+
+
+def test_answers_are_cached_per_dataset_version(retriever, client, df):
+    question = "Show homes with up to 3 bedrooms in Fairfax"
+    assert ask(retriever, df, question)[2:] == ("answer 1", False)
+    assert ask(retriever, df, question)[2:] == ("answer 1", True)
+    assert len(client.calls) == 1
+    context, _ = retriever.build_context(df, 'v2', question)
+    assert retriever.answer(question, context, 'v2') == ("answer 2", False)
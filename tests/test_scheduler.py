@@ -0,0 +1,152 @@
+import json
+import threading
+
+import pytest
+
+import metrics
+import scheduler
+from metrics import Registry
+from scheduler import SavedSearch, Scheduler, load_searches
+
+
+class FakeFactory:
+    def __init__(self):
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+        driver = type('FakeDriver', (), {'quit': lambda self: None})()
+        return driver, None, None
+
+
+class Runner:
+    """Records the order searches ran in; fails the searches in fail; blocks while gate is clear."""
+
+    def __init__(self, fail=()):
+        self.order = []
+        self.fail = set(fail)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, session, search, should_stop):
+        self.gate.wait(5)
+        self.order.append(search.name)
+        with metrics.span('search'):
+            metrics.page(1, 0.01, 20, 'selenium')
+        if search.name in self.fail:
+            raise RuntimeError("search failed")
+        return {'rows': 20, 'pages': 1, 'changes': {'added': 20, 'changed': 0}}
+
+
+def make_scheduler(tmp_path, runner, priorities, workers=1):
+    searches = [SavedSearch(name, priority=priority, data_dir=str(tmp_path)) for name, priority in priorities.items()]
+    return Scheduler(searches, workers=workers, factory=FakeFactory(), runner=runner, tick=0.01)
+
+
+def test_queued_runs_leave_by_priority(tmp_path):
+    runner = Runner()
+    sched = make_scheduler(tmp_path, runner, {'low': 0, 'high': 10, 'mid': 5})
+    runs = [sched.request(name)[0] for name in ('low', 'mid', 'high')]
+    assert sched.queued() == ['high', 'mid', 'low']
+    sched.start(periodic=False)
+    for run in runs:
+        assert run.wait(5)
+    sched.shutdown()
+    assert runner.order == ['high', 'mid', 'low']
+    assert all(run.status == 'succeeded' for run in runs)
+
+
+def test_requests_for_a_queued_or_running_search_join_its_run(tmp_path):
+    runner = Runner()
+    runner.gate.clear()
+    sched = make_scheduler(tmp_path, runner, {'a': 0})
+    first, merged = sched.request('a')
+    assert not merged
+    sched.start(periodic=False)
+    second, merged = sched.request('a')
+    assert merged and second is first and first.requests == 2
+    runner.gate.set()
+    assert first.wait(5)
+    third, merged = sched.request('a')
+    assert not merged and third is not first
+    assert third.wait(5)
+    sched.shutdown()
+    assert runner.order == ['a', 'a']
+
+
+def test_failures_back_off_exponentially_and_reset_on_success(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, 'BACKOFF_MINUTES', 5)
+    monkeypatch.setattr(scheduler, 'BACKOFF_MAX_MINUTES', 12)
+    runner = Runner(fail={'a'})
+    sched = make_scheduler(tmp_path, runner, {'a': 0})
+    sched.start(periodic=False)
+    search = sched.searches['a']
+    backoffs = []
+    for _ in range(3):
+        run = sched.request('a')[0]
+        assert run.wait(5) and run.status == 'failed'
+        backoffs.append(round(search.next_due - run.finished))
+    assert backoffs == [300, 600, 720]
+    runner.fail.clear()
+    run = sched.request('a')[0]
+    assert run.wait(5) and run.status == 'succeeded'
+    sched.shutdown()
+    assert search.failures == 0
+    assert round(search.next_due - run.finished) == search.interval_minutes * 60
+    # A failed run closes its session; the next run opens a fresh one
+    assert sched.factory.opened == 4
+
+
+def test_each_run_keeps_its_own_report(tmp_path):
+    sched = make_scheduler(tmp_path, Runner(), {'a': 0, 'b': 0}, workers=2)
+    metrics.registry.start_run()
+    sched.start(periodic=False)
+    runs = [sched.request(name)[0] for name in ('a', 'b')]
+    for run in runs:
+        assert run.wait(5)
+    sched.shutdown()
+    job = metrics.registry.finish_run()
+    assert job['stages'] == {} and job['page_seconds']['count'] == 0
+    for run in runs:
+        assert run.report['stages']['search']['count'] == 1
+        assert run.report['page_seconds']['count'] == 1
+        assert run.snapshot()['report'] == run.report
+
+
+def test_load_searches(tmp_path):
+    path = tmp_path / 'searches.json'
+    assert load_searches(str(path)) == []
+    path.write_text(json.dumps([{'name': 'fairfax', 'criteria': {'county': 'Fairfax'}, 'priority': 2}]))
+    [search] = load_searches(str(path), data_dir=str(tmp_path))
+    assert (search.name, search.priority, search.criteria) == ('fairfax', 2, {'county': 'Fairfax'})
+    path.write_text(json.dumps([{'name': 'a'}, {'name': 'a'}]))
+    with pytest.raises(ValueError):
+        load_searches(str(path))
+    with pytest.raises(ValueError):
+        SavedSearch('Not Valid')
+
+
+def test_thread_run_reports_are_kept_apart_from_the_run_in_progress():
+    registry = Registry()
+    registry.start_run()
+    with registry.span('login'):
+        pass
+    reports = {}
+
+    def scheduled_run():
+        with registry.run_report() as report:
+            with registry.span('search'):
+                registry.page(1, 0.1, 20, 'selenium')
+            registry.peak('browser_rss_mb', 300)
+        reports['search'] = report.summary()
+
+    thread = threading.Thread(target=scheduled_run)
+    thread.start()
+    thread.join()
+    job = registry.finish_run()
+    assert set(job['stages']) == {'login'} and job['page_seconds']['count'] == 0 and job['peaks'] == {}
+    assert set(reports['search']['stages']) == {'search'}
+    assert reports['search']['counters'] == {'brightmls_pages_scraped_total': 1, 'brightmls_rows_scraped_total': 20}
+    assert reports['search']['peaks'] == {'browser_rss_mb': 300}
+    # The process-wide counters see both
+    assert registry.counters[('brightmls_pages_scraped_total', (('engine', 'selenium'),))] == 1
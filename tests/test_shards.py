@@ -0,0 +1,113 @@
+import random
+import threading
+
+import pytest
+
+import brightmls
+from shards import MIN_PRICE_BAND, OPEN_BAND_SPLIT, Shard, ShardPlanner, price_shards
+
+rng = random.Random(0)
+LISTINGS = [{'MLS #': f'VA{i}', 'County': rng.choice(['Fairfax', 'Arlington']),
+             'Price': rng.randrange(50_000, 2_500_000)} for i in range(400)]
+
+
+def matching(criteria):
+    low, high = criteria['min_price'], criteria['max_price']
+    return [row for row in LISTINGS
+            if (criteria['county'] is None or row['County'] == criteria['county'])
+            and (low is None or row['Price'] >= low) and (high is None or row['Price'] <= high)]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.criteria = None
+
+    def quit(self):
+        pass
+
+
+class FakeFactory:
+    def __init__(self):
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        with self.lock:
+            self.opened += 1
+        return FakeDriver(), None, None
+
+
+@pytest.fixture
+def fake_matrix(monkeypatch):
+    """Searches and scrapes LISTINGS instead of Matrix; the search fails for failing_counties."""
+    failing_counties = set()
+
+    def perform_search(driver, wait, ready, criteria):
+        if criteria['county'] in failing_counties:
+            return False
+        driver.criteria = criteria
+        return True
+
+    def scrape_all_pages(driver, wait, max_pages, timeout_minutes, ready=None):
+        return [dict(row) for row in matching(driver.criteria)], ['MLS #', 'County', 'Price']
+
+    monkeypatch.setattr(brightmls, 'perform_search', perform_search)
+    monkeypatch.setattr(brightmls, 'get_result_count', lambda driver: len(matching(driver.criteria)))
+    monkeypatch.setattr(brightmls, 'scrape_all_pages', scrape_all_pages)
+    monkeypatch.setattr(brightmls, 'should_stop', lambda: False)
+    return failing_counties
+
+
+def test_split_halves_bounded_bands():
+    low, high = Shard('Fairfax', 100_000, 299_999, depth=1).split()
+    assert (low.county, low.min_price, low.max_price, low.depth) == ('Fairfax', 100_000, 199_999, 2)
+    assert (high.min_price, high.max_price) == (200_000, 299_999)
+
+
+def test_split_open_ended_and_county_shards():
+    low, high = Shard(None, 1_000_000, None).split()
+    assert (low.max_price, high.min_price, high.max_price) == (2_000_000, 2_000_001, None)
+    low, high = Shard('Fairfax').split()
+    assert (low.min_price, low.max_price, high.min_price, high.max_price) == (0, OPEN_BAND_SPLIT,
+                                                                              OPEN_BAND_SPLIT + 1, None)
+
+
+def test_narrow_band_is_not_split():
+    assert Shard(None, 100_000, 100_000 + MIN_PRICE_BAND - 1).split() == []
+
+
+def test_price_shards_cover_every_price_once():
+    shards = price_shards()
+    assert shards[0].min_price == 0 and shards[-1].max_price is None
+    for before, after in zip(shards, shards[1:]):
+        assert after.min_price == before.max_price + 1
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_planner_splits_large_shards_and_covers_every_listing(fake_matrix, workers):
+    factory = FakeFactory()
+    planner = ShardPlanner(factory, price_shards(), workers=workers, max_results=40)
+    data, headers, stats = planner.run()
+    assert sorted(row['MLS #'] for row in data) == sorted(row['MLS #'] for row in LISTINGS)
+    assert stats['failed_shards'] == [] and stats['duplicates'] == 0
+    statuses = {shard['status'] for shard in stats['shards']}
+    assert statuses == {'done', 'split'}
+    assert all(shard['result_count'] <= 40 for shard in stats['shards'] if shard['status'] == 'done')
+    assert factory.opened <= workers
+
+
+def test_planner_drops_duplicates_across_overlapping_shards(fake_matrix):
+    # The county shard and the all-county band overlap on Fairfax listings
+    planner = ShardPlanner(FakeFactory(), [Shard('Fairfax'), Shard(None, 0, None)], workers=2, max_results=10_000)
+    data, _, stats = planner.run()
+    fairfax = sum(1 for row in LISTINGS if row['County'] == 'Fairfax')
+    assert len(data) == len(LISTINGS)
+    assert stats['duplicates'] == fairfax
+
+
+def test_planner_reports_failed_shards(fake_matrix):
+    fake_matrix.add('Arlington')
+    planner = ShardPlanner(FakeFactory(), [Shard('Fairfax'), Shard('Arlington')], workers=2, max_results=10_000)
+    data, _, stats = planner.run()
+    assert stats['failed_shards'] == ['Arlington']
+    assert {row['County'] for row in data} == {'Fairfax'}
@@ -0,0 +1,101 @@
+import csv
+import random
+
+import pytest
+
+from benchmarks.synthetic import synthetic_rows
+from store import CSV_HEADERS, ListingStore
+
+T1, T2, T3 = '2025-07-01 11:00:00', '2025-07-02 11:00:00', '2025-07-03 11:00:00'
+
+
+def listing(mls='VAFX1', price='$500,000', status='ACT', **fields):
+    row = {'': '', 'MLS #': mls, 'Type': 'RES', 'Status': status, 'Address': '1 Main St', 'City': 'Fairfax',
+           'County': 'Fairfax, VA', 'Beds': '3', 'Baths': '2', 'Structure Type': 'Detached', 'Date': '07/01/25',
+           'List Office Name': 'Office', 'Price': price, 'PriceChangeType': '', 'PriceChangeTitle': ''}
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ListingStore(str(tmp_path / 'listings.db'))
+
+
+def stored(store, mls):
+    return dict(store.connect().execute("SELECT * FROM listings WHERE mls = ?", (mls,)).fetchone())
+
+
+def test_upsert_inserts_then_updates_in_place(store):
+    assert store.upsert_page([listing(), listing('VAFX2'), listing(mls='')], T1) == 2
+    assert store.upsert_page([listing(price='$480,000', City='Vienna')], T2) == 1
+    assert store.count() == 2
+    record = stored(store, 'VAFX1')
+    assert (record['price'], record['price_value'], record['city']) == ('$480,000', 480000, 'Vienna')
+    assert (record['first_seen'], record['last_seen']) == (T1, T2)
+    assert stored(store, 'VAFX2')['last_seen'] == T1
+
+
+def test_history_records_price_and_status_transitions_only(store):
+    store.upsert_page([listing()], T1)
+    store.upsert_page([listing(Address='1 Main Street')], T2)
+    store.upsert_page([listing(price='$480,000')], T2)
+    store.upsert_page([listing(price='$480,000', status='PND')], T3)
+    assert [(h['timestamp'], h['price_value'], h['status']) for h in store.history('VAFX1')] == [
+        (T1, 500000, 'ACT'), (T2, 480000, 'ACT'), (T3, 480000, 'PND')]
+    assert store.history('VAFX9') == []
+
+
+def test_query_filters_and_pages_by_mls(store):
+    store.upsert_page([listing('A1'), listing('A2', price='$900,000', Beds='5'), listing('A3', status='PND')], T1)
+    assert [row['MLS #'] for row in store.query(status='ACT')] == ['A1', 'A2']
+    assert [row['MLS #'] for row in store.query(min_price=600_000)] == ['A2']
+    assert [row['MLS #'] for row in store.query(beds=4)] == ['A2']
+    assert [row['MLS #'] for row in store.query(after='A1', limit=1)] == ['A2']
+
+
+def test_incremental_stats_match_a_rebuild(store):
+    rows = list(synthetic_rows(300, seed=1, timestamp=T1))
+    for start in range(0, len(rows), 50):
+        store.upsert_page(rows[start:start + 50], T1)
+    # A second sweep changes prices, statuses, cities and price change flags of some listings
+    rng = random.Random(2)
+    for row in rng.sample(rows, 120):
+        row['Price'] = f"${rng.randrange(200, 2000) * 1000:,}"
+        row['Status'] = rng.choice(['ACT', 'PND', 'A/C'])
+        row['PriceChangeType'] = rng.choice(['', 'down', 'up'])
+        if rng.random() < 0.3:
+            row['City'] = 'Elsewhere'
+    store.upsert_page(rows[:150], T2)
+    store.upsert_page(rows[150:], T2)
+    incremental = store.stats()
+    assert incremental['all'][0]['listings'] == 300
+    assert store.rebuild_stats() is True
+    assert store.stats() == incremental
+
+
+def test_rebuild_stats_only_if_missing(store):
+    assert store.rebuild_stats(only_if_missing=True) is False
+    store.upsert_page([listing()], T1)
+    assert store.rebuild_stats(only_if_missing=True) is False
+    store.connect().execute("DELETE FROM listing_stats")
+    store.connect().commit()
+    assert store.rebuild_stats(only_if_missing=True) is True
+    assert store.stats('city')['city'][0]['value'] == 'Fairfax'
+
+
+def test_import_csv_replays_in_timestamp_order_and_exports_latest(store, tmp_path):
+    legacy = str(tmp_path / 'legacy.csv')
+    with open(legacy, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+        writer.writeheader()
+        writer.writerow(dict(listing(price='$480,000'), Timestamp=T2))
+        writer.writerow(dict(listing(), Timestamp=T1))
+        writer.writerow(dict(listing('VAFX2'), Timestamp=T2))
+    assert store.import_csv(legacy) == 3
+    assert [h['price_value'] for h in store.history('VAFX1')] == [500000, 480000]
+    exported = str(tmp_path / 'export.csv')
+    assert store.export_csv(exported) == 2
+    with open(exported, newline='', encoding='utf-8') as f:
+        rows = {row['MLS #']: row for row in csv.DictReader(f)}
+    assert (rows['VAFX1']['Price'], rows['VAFX1']['Timestamp']) == ('$480,000', T2)
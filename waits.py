@@ -0,0 +1,99 @@
+import os
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+
+import metrics
+from parsing import RESULTS_TABLE_XPATH
+
+# Ceiling for any single readiness wait, in seconds
+WAIT_TIMEOUT = float(os.getenv("BRIGHTMLS_WAIT_TIMEOUT", "20"))
+POLL_FREQUENCY = 0.1
+
+RESULTS_ROW_XPATH = RESULTS_TABLE_XPATH + "//tbody//tr"
+PAGER_CSS = "span.pagingLinks"
+
+
+def document_ready(driver):
+    """The current document has finished loading."""
+    try:
+        return driver.execute_script("return document.readyState") == "complete"
+    except WebDriverException:
+        return False
+
+
+def login_complete(login_url):
+    """The browser has left the login page and the redirected page has loaded."""
+    def condition(driver):
+        return not driver.current_url.startswith(login_url) and document_ready(driver)
+    return condition
+
+
+def search_form_ready(driver):
+    """The Matrix search form has rendered its Select All link and Results button."""
+    if not document_ready(driver):
+        return False
+    if not driver.find_elements(By.XPATH, "//a[contains(text(), 'Select All')]"):
+        return False
+    buttons = driver.find_elements(By.ID, "m_ucSearchButtons_m_lbSearch")
+    return buttons[0] if buttons else False
+
+
+def results_ready(driver):
+    """The results grid is on the page with at least one body row."""
+    if not document_ready(driver):
+        return False
+    rows = driver.find_elements(By.XPATH, RESULTS_ROW_XPATH)
+    return bool(rows)
+
+
+def pager_text(driver):
+    """Return the pager's text, or '' when there is no pager."""
+    try:
+        pagers = driver.find_elements(By.CSS_SELECTOR, PAGER_CSS)
+        return pagers[0].text.strip() if pagers else ''
+    except StaleElementReferenceException:
+        return ''
+
+
+def results_snapshot(driver):
+    """Capture what results_replaced compares against before clicking Next."""
+    tbodies = driver.find_elements(By.XPATH, RESULTS_TABLE_XPATH + "//tbody")
+    return tbodies[0] if tbodies else None, pager_text(driver)
+
+
+def results_replaced(old_tbody, old_pager_text):
+    """The grid was swapped out after a pager postback and the new rows are present."""
+    def condition(driver):
+        if old_tbody is not None and EC.staleness_of(old_tbody)(driver):
+            return results_ready(driver)
+        current = pager_text(driver)
+        return bool(current) and current != old_pager_text and results_ready(driver)
+    return condition
+
+
+class Readiness:
+    """Wait on real page conditions instead of fixed sleeps and record the time spent per step."""
+
+    def __init__(self, driver, timeout=WAIT_TIMEOUT, poll_frequency=POLL_FREQUENCY):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = {}
+
+    def until(self, step, condition, timeout=None):
+        """Block until condition holds (raising TimeoutException at the ceiling) and record the wait."""
+        start = time.time()
+        try:
+            wait = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.poll_frequency)
+            return wait.until(condition)
+        finally:
+            elapsed = time.time() - start
+            self.timings[step] = round(self.timings.get(step, 0.0) + elapsed, 3)
+            metrics.observe('brightmls_wait_seconds', elapsed, step=step)
+
+    def total(self):
+        """Total seconds spent waiting across all steps."""
+        return round(sum(self.timings.values()), 3)